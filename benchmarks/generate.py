@@ -0,0 +1,405 @@
+"""Generate synthetic StatsBomb data in the open-data directory layout.
+
+The files contain the union of the fields in every supported data version
+(competitions v4, matches v3/v6, events v4/v8, lineups v2/v4 and 360 v1/v2),
+so the same files can be parsed with any combination of versions.
+
+Usage: python benchmarks/generate.py <directory> --matches 20 --events 3500
+"""
+
+import argparse
+import json
+import os
+import random
+import uuid
+
+COMPETITION_ID = 55
+SEASON_ID = 282
+FIRST_MATCH_ID = 4000000
+
+# (type id, type name, relative frequency) similar to a real match
+EVENT_TYPES = [
+    (30, 'Pass', 30),
+    (42, 'Ball Receipt*', 28),
+    (43, 'Carry', 24),
+    (17, 'Pressure', 9),
+    (2, 'Ball Recovery', 2),
+    (4, 'Duel', 1.5),
+    (9, 'Clearance', 1),
+    (10, 'Interception', 0.5),
+    (14, 'Dribble', 0.6),
+    (39, 'Dribbled Past', 0.5),
+    (16, 'Shot', 0.8),
+    (23, 'Goal Keeper', 0.8),
+    (22, 'Foul Committed', 0.7),
+    (21, 'Foul Won', 0.7),
+    (38, 'Miscontrol', 0.6),
+    (6, 'Block', 0.8),
+    (3, 'Dispossessed', 0.6),
+]
+POSITIONS = [
+    'Goalkeeper',
+    'Right Back',
+    'Right Center Back',
+    'Left Center Back',
+    'Left Back',
+    'Right Defensive Midfield',
+    'Left Defensive Midfield',
+    'Right Wing',
+    'Center Attacking Midfield',
+    'Left Wing',
+    'Center Forward',
+]
+PLAYERS_PER_TEAM = 18
+
+
+def _named(id_, name):
+    return {'id': id_, 'name': name}
+
+
+def _team(team_id):
+    return _named(team_id, f'Team {team_id}')
+
+
+def _player(player_id):
+    return _named(player_id, f'Player {player_id}')
+
+
+def _location(rng):
+    return [round(rng.uniform(0, 120), 1), round(rng.uniform(0, 80), 1)]
+
+
+def _timestamp(seconds):
+    return f'{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}.{seconds * 7 % 1000:03d}'
+
+
+def _starting_xi(rng, index, team_id, possession_team_id):
+    return {
+        'id': str(uuid.UUID(int=rng.getrandbits(128))),
+        'index': index,
+        'period': 1,
+        'timestamp': '00:00:00.000',
+        'minute': 0,
+        'second': 0,
+        'type': _named(35, 'Starting XI'),
+        'possession': 1,
+        'possession_team': _team(possession_team_id),
+        'play_pattern': _named(1, 'Regular Play'),
+        'team': _team(team_id),
+        'duration': 0.0,
+        'tactics': {
+            'formation': 4231,
+            'lineup': [
+                {
+                    'player': _player(team_id * 100 + i),
+                    'position': _named(i + 1, position),
+                    'jersey_number': i + 1,
+                }
+                for i, position in enumerate(POSITIONS)
+            ],
+        },
+    }
+
+
+def events(rng, home_team_id, away_team_id, n_events):
+    """Generate the events for one match."""
+    types = [event_type[:2] for event_type in EVENT_TYPES]
+    weights = [event_type[2] for event_type in EVENT_TYPES]
+    data = [
+        _starting_xi(rng, 1, home_team_id, home_team_id),
+        _starting_xi(rng, 2, away_team_id, home_team_id),
+    ]
+    possession, possession_team_id = 1, home_team_id
+    previous = None
+    for index in range(3, n_events + 1):
+        if rng.random() < 0.06:
+            possession += 1
+            possession_team_id = away_team_id if possession_team_id == home_team_id else home_team_id
+        type_id, type_name = rng.choices(types, weights)[0]
+        other_team_id = away_team_id if possession_team_id == home_team_id else home_team_id
+        team_id = possession_team_id if rng.random() < 0.8 else other_team_id
+        seconds = index * 5700 // n_events
+        event = {
+            'id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'index': index,
+            'period': 1 if index < n_events // 2 else 2,
+            'timestamp': _timestamp(seconds % 2850),
+            'minute': seconds // 60,
+            'second': seconds % 60,
+            'type': _named(type_id, type_name),
+            'possession': possession,
+            'possession_team': _team(possession_team_id),
+            'play_pattern': _named(1, 'Regular Play'),
+            'team': _team(team_id),
+            'player': _player(team_id * 100 + rng.randrange(len(POSITIONS))),
+            'position': _named(rng.randint(1, 25), rng.choice(POSITIONS)),
+            'location': _location(rng),
+            'duration': round(rng.random() * 2, 6),
+            'obv_for_after': rng.random() / 10,
+            'obv_for_before': rng.random() / 10,
+            'obv_for_net': rng.random() / 100,
+            'obv_against_after': rng.random() / 10,
+            'obv_against_before': rng.random() / 10,
+            'obv_against_net': rng.random() / 100,
+            'obv_total_net': rng.random() / 100,
+        }
+        if rng.random() < 0.15:
+            event['under_pressure'] = True
+        if type_name == 'Pass':
+            event['pass'] = {
+                'recipient': _player(team_id * 100 + rng.randrange(len(POSITIONS))),
+                'length': round(rng.uniform(1, 60), 6),
+                'angle': round(rng.uniform(-3.14, 3.14), 6),
+                'height': _named(1, 'Ground Pass'),
+                'end_location': _location(rng),
+                'body_part': _named(40, 'Right Foot'),
+                'pass_cluster_id': rng.randint(1, 60),
+                'pass_cluster_label': 'Cluster',
+                'pass_cluster_probability': rng.random(),
+                'pass_success_probability': rng.random(),
+            }
+            if rng.random() < 0.2:
+                event['pass']['outcome'] = _named(9, 'Incomplete')
+        elif type_name == 'Carry':
+            event['carry'] = {'end_location': _location(rng)}
+        elif type_name == 'Shot':
+            event['shot'] = {
+                'statsbomb_xg': round(rng.random() * 0.5, 8),
+                'end_location': [120.0, round(rng.uniform(30, 50), 1), round(rng.random() * 3, 1)],
+                'outcome': _named(98, 'Off T'),
+                'type': _named(87, 'Open Play'),
+                'body_part': _named(40, 'Right Foot'),
+                'technique': _named(93, 'Normal'),
+                'freeze_frame': [
+                    {
+                        'location': _location(rng),
+                        'player': _player(rng.randint(100, 2500)),
+                        'position': _named(3, rng.choice(POSITIONS)),
+                        'teammate': rng.random() < 0.5,
+                    }
+                    for _ in range(rng.randint(8, 18))
+                ],
+            }
+        elif type_name == 'Duel':
+            event['duel'] = {'type': _named(11, 'Tackle'), 'outcome': _named(4, 'Won')}
+        elif type_name == 'Goal Keeper':
+            event['goalkeeper'] = {'type': _named(33, 'Shot Faced'), 'position': _named(44, 'Set')}
+        elif type_name == 'Foul Committed':
+            event['foul_committed'] = {'advantage': rng.random() < 0.3}
+        if previous is not None:
+            event['related_events'] = [previous]
+        previous = event['id']
+        data.append(event)
+    return data
+
+
+def lineups(rng, team_ids):
+    """Generate the lineups for one match."""
+    data = []
+    for team_id in team_ids:
+        players = []
+        for i in range(PLAYERS_PER_TEAM):
+            player_id = team_id * 100 + i
+            starter = i < len(POSITIONS)
+            players.append(
+                {
+                    'player_id': player_id,
+                    'player_name': f'Player {player_id}',
+                    'player_nickname': None,
+                    'player_gender': 'male',
+                    'player_height': round(rng.uniform(165, 200), 1),
+                    'player_weight': round(rng.uniform(60, 95), 1),
+                    'birth_date': f'199{rng.randint(0, 9)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}',
+                    'jersey_number': i + 1,
+                    'country': _named(68, 'England'),
+                    'cards': [],
+                    'stats': {'goals': rng.randint(0, 1), 'own_goals': 0, 'assists': rng.randint(0, 1)},
+                    'positions': (
+                        [
+                            {
+                                'position_id': i + 1,
+                                'position': POSITIONS[i],
+                                'from': '00:00',
+                                'to': None,
+                                'from_period': 1,
+                                'to_period': None,
+                                'start_reason': 'Starting XI',
+                                'end_reason': 'Final Whistle',
+                            }
+                        ]
+                        if starter
+                        else []
+                    ),
+                }
+            )
+        data.append(
+            {
+                'team_id': team_id,
+                'team_name': f'Team {team_id}',
+                'lineup': players,
+                'events': [
+                    {
+                        'player_id': team_id * 100 + rng.randrange(len(POSITIONS)),
+                        'player_name': 'Player',
+                        'period': 2,
+                        'timestamp': '00:21:10.000',
+                        'type': 'Yellow Card',
+                        'outcome': None,
+                    }
+                ],
+                'formations': [
+                    {'period': 1, 'timestamp': '00:00:00.000', 'reason': 'Starting XI', 'formation': '4231'}
+                ],
+            }
+        )
+    return data
+
+
+def threesixty(rng, match_events):
+    """Generate the 360 frames for one match (for about 85% of the events with a location)."""
+    data = []
+    for event in match_events:
+        if 'location' not in event or rng.random() > 0.85:
+            continue
+        data.append(
+            {
+                'event_uuid': event['id'],
+                'visible_area': [round(rng.uniform(0, 120), 6) for _ in range(10)],
+                'line_breaking_pass': rng.random() < 0.1,
+                'num_defenders_on_goal_side_of_actor': rng.randint(0, 10),
+                'distance_to_nearest_defender': round(rng.uniform(0, 20), 6),
+                'ball_receipt_in_space': rng.random() < 0.3,
+                'ball_receipt_exceeds_distance': rng.randint(0, 3),
+                'freeze_frame': [
+                    {'teammate': rng.random() < 0.5, 'actor': i == 0, 'keeper': False, 'location': _location(rng)}
+                    for i in range(rng.randint(6, 20))
+                ],
+                'visible_player_counts': [
+                    {'team_id': team, 'count': rng.randint(2, 11)} for team in (1, 2)
+                ],
+                'distances_from_edge_of_visible_area': [
+                    {'point_id': point, 'distance': round(rng.uniform(0, 30), 6)} for point in range(1, 4)
+                ],
+            }
+        )
+    return data
+
+
+def _match(rng, match_id, home_team_id, away_team_id):
+    def team(side, team_id):
+        return {
+            f'{side}_team_id': team_id,
+            f'{side}_team_name': f'Team {team_id}',
+            f'{side}_team_gender': 'male',
+            f'{side}_team_youth': False,
+            f'{side}_team_group': None,
+            'country': _named(68, 'England'),
+            'managers': [
+                {
+                    'id': team_id,
+                    'name': f'Manager {team_id}',
+                    'nickname': None,
+                    'dob': '1970-01-01',
+                    'country': _named(68, 'England'),
+                }
+            ],
+        }
+
+    return {
+        'match_id': match_id,
+        'match_date': f'2024-{8 + match_id % 5:02d}-{1 + match_id % 28:02d}',
+        'kick_off': '20:00:00.000',
+        'competition': {
+            'competition_id': COMPETITION_ID,
+            'country_name': 'Europe',
+            'competition_name': 'Synthetic League',
+        },
+        'season': {'season_id': SEASON_ID, 'season_name': '2024/2025'},
+        'home_team': team('home', home_team_id),
+        'away_team': team('away', away_team_id),
+        'home_score': rng.randint(0, 4),
+        'away_score': rng.randint(0, 4),
+        'attendance': rng.randint(5000, 60000),
+        'behind_closed_doors': False,
+        'neutral_ground': False,
+        'collection_status': 'Complete',
+        'play_status': 'Normal',
+        'match_status': 'available',
+        'match_status_360': 'available',
+        'last_updated': '2025-01-01T10:00:00.000',
+        'last_updated_360': '2025-01-01T10:00:00.000',
+        'metadata': {'data_version': '1.1.0', 'shot_fidelity_version': '2', 'xy_fidelity_version': '2'},
+        'match_week': 1 + match_id % 38,
+        'competition_stage': _named(1, 'Regular Season'),
+        'stadium': {'id': home_team_id, 'name': f'Stadium {home_team_id}', 'country': _named(68, 'England')},
+        'referee': {'id': 1, 'name': 'Referee', 'country': _named(68, 'England')},
+    }
+
+
+def generate(directory, n_matches=20, n_events=3500, seed=0):
+    """Write the competitions, matches, events, lineups and 360 files to directory/data.
+
+    Parameters
+    ----------
+    directory : str
+    n_matches : int, default 20
+    n_events : int, default 3500
+        The number of events per match.
+    seed : int, default 0
+
+    Returns
+    -------
+    match_ids : list of int
+    """
+    rng = random.Random(seed)
+    data = os.path.join(directory, 'data')
+    for folder in ['events', 'lineups', 'three-sixty', f'matches/{COMPETITION_ID}']:
+        os.makedirs(os.path.join(data, folder), exist_ok=True)
+
+    def dump(obj, *path):
+        with open(os.path.join(data, *path), 'w') as f:
+            json.dump(obj, f)
+
+    dump(
+        [
+            {
+                'competition_id': COMPETITION_ID,
+                'season_id': SEASON_ID,
+                'country_name': 'Europe',
+                'competition_name': 'Synthetic League',
+                'competition_gender': 'male',
+                'competition_youth': False,
+                'competition_international': False,
+                'season_name': '2024/2025',
+                'match_updated': '2025-01-01T10:00:00.000',
+                'match_updated_360': '2025-01-01T10:00:00.000',
+                'match_available_360': '2025-01-01T10:00:00.000',
+                'match_available': '2025-01-01T10:00:00.000',
+            }
+        ],
+        'competitions.json',
+    )
+    matches = []
+    for match_id in range(FIRST_MATCH_ID, FIRST_MATCH_ID + n_matches):
+        home_team_id, away_team_id = rng.sample(range(1, 21), 2)
+        matches.append(_match(rng, match_id, home_team_id, away_team_id))
+        match_events = events(rng, home_team_id, away_team_id, n_events)
+        dump(match_events, 'events', f'{match_id}.json')
+        dump(lineups(rng, (home_team_id, away_team_id)), 'lineups', f'{match_id}.json')
+        dump(threesixty(rng, match_events), 'three-sixty', f'{match_id}.json')
+    dump(matches, 'matches', str(COMPETITION_ID), f'{SEASON_ID}.json')
+    return [match['match_id'] for match in matches]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory')
+    parser.add_argument('--matches', type=int, default=20)
+    parser.add_argument('--events', type=int, default=3500, help='events per match')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    generate(args.directory, args.matches, args.events, args.seed)
+
+
+if __name__ == '__main__':
+    main()
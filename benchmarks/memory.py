@@ -0,0 +1,116 @@
+"""Load a synthetic competition that is bigger than the duckdb memory budget.
+
+The data for a competition (see generate.py and server.py) is loaded with a memory_limit smaller than its
+JSON files, both into memory and into a table of a database file with competition_data(table=...). Each load
+runs in a new python process, and the row counts are checked against a load without a memory_limit.
+The wall time, peak resident memory and the size of the spill directory are reported for each load.
+
+Usage: python benchmarks/memory.py --matches 60 --events 3500 --memory-limit 250MB --kinds events threesixty_frames
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from duckstatsbomb import Sbopen  # noqa: E402
+from generate import COMPETITION_ID, SEASON_ID, generate  # noqa: E402
+from run import peak_rss_mb  # noqa: E402
+from server import point_parser, serve  # noqa: E402
+
+
+def measure(kind, url, cache_name, database, memory_limit, temp_directory, table):
+    """Load one kind of data for the competition in this process and return the rows, time and peak memory."""
+    parser = point_parser(
+        Sbopen(
+            cache_name=cache_name,
+            expire_after=-1,
+            database=database,
+            memory_limit=memory_limit,
+            temp_directory=temp_directory,
+        ),
+        url,
+    )
+    start = time.perf_counter()
+    data = parser.competition_data(COMPETITION_ID, SEASON_ID, kind=kind, table=table)
+    rows = data.aggregate('count(*)').fetchone()[0] if table else len(data)
+    seconds = time.perf_counter() - start
+    spill_mb = sum(
+        os.path.getsize(path) for path in glob.glob(os.path.join(temp_directory or '', '**'), recursive=True)
+        if os.path.isfile(path)
+    ) / 1024**2 if temp_directory else 0
+    parser.close_connection()
+    return {'rows': rows, 'seconds': seconds, 'peak_rss_mb': peak_rss_mb(), 'spill_mb': spill_mb}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--matches', type=int, default=40)
+    parser.add_argument('--events', type=int, default=3500, help='events per match')
+    parser.add_argument('--memory-limit', default='250MB', help='the duckdb memory_limit, e.g. 250MB')
+    parser.add_argument('--kinds', nargs='*', default=['events', 'threesixty_frames'])
+    parser.add_argument('--data-dir', help='reuse or create the synthetic data in this directory')
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(**json.loads(args.measure))))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.data_dir or os.path.join(tmp, 'statsbomb')
+        if not os.path.exists(os.path.join(directory, 'data', 'competitions.json')):
+            generate(directory, args.matches, args.events)
+        server, url = serve(directory)
+        cache_name = os.path.join(tmp, 'cache')
+        # fill the cache so only the parsing is measured
+        sb = point_parser(Sbopen(cache_name=cache_name, expire_after=-1, database=':memory:'), url)
+        for kind in args.kinds:
+            sb.competition_data(COMPETITION_ID, SEASON_ID, kind=kind, columns=['match_id'])
+        sb.close_connection()
+        json_mb = sum(
+            os.path.getsize(path) for path in glob.glob(os.path.join(directory, 'data', '**', '*.json'), recursive=True)
+        ) / 1024**2
+        print(f'{args.matches} matches, {json_mb:.0f}MB of JSON, memory_limit {args.memory_limit}')
+        print(f'{"kind":<20} {"load":<14} {"rows":>9} {"seconds":>8} {"peak MB":>8} {"spill MB":>9}')
+        for kind in args.kinds:
+            expected = None
+            for load, memory_limit, table in [
+                ('unbounded', None, None),
+                ('budget', args.memory_limit, None),
+                ('budget+table', args.memory_limit, f'{kind}_table'),
+            ]:
+                child = dict(
+                    kind=kind,
+                    url=url,
+                    cache_name=cache_name,
+                    database=os.path.join(tmp, f'{kind}_{load}.duckdb'),
+                    memory_limit=memory_limit,
+                    temp_directory=os.path.join(tmp, f'spill_{kind}_{load}') if memory_limit else None,
+                    table=table,
+                )
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--measure', json.dumps(child)],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout
+                r = json.loads(output.strip().splitlines()[-1])
+                expected = expected or r['rows']
+                assert r['rows'] == expected, f'{kind} {load}: {r["rows"]} rows, expected {expected}'
+                print(
+                    f'{kind:<20} {load:<14} {r["rows"]:>9} {r["seconds"]:>8.2f} '
+                    f'{r["peak_rss_mb"]:>8.0f} {r["spill_mb"]:>9.1f}'
+                )
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
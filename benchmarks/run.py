@@ -0,0 +1,222 @@
+"""Benchmark parsing every kind of StatsBomb data with every supported data version.
+
+Synthetic data (see generate.py) is parsed from local files with Sblocal, and from the
+requests-cache cache of a local stand-in server (see server.py) with Sbopen and Sbapi.
+Each kind is measured in a new python process, recording the wall time, rows per second
+and peak resident memory, so the results can be saved and compared across commits.
+
+Usage: python benchmarks/run.py --matches 20 --events 3500 --output results.json --compare old.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from duckstatsbomb import Sbapi, Sblocal, Sbopen  # noqa: E402
+from generate import COMPETITION_ID, SEASON_ID, generate  # noqa: E402
+from server import point_parser, serve  # noqa: E402
+
+# every supported version is covered by the two sets of versions, as each SQL file only depends on one version
+VERSIONS = {
+    'c4-m3-e4-l2-t1': dict(
+        competitions_version=4,
+        matches_version=3,
+        events_version=4,
+        lineup_version=2,
+        threesixty_version=1,
+    ),
+    'c4-m6-e8-l4-t2': dict(
+        competitions_version=4,
+        matches_version=6,
+        events_version=8,
+        lineup_version=4,
+        threesixty_version=2,
+    ),
+}
+# the open-data is only available in the older versions
+CASES = [
+    ('Sblocal', 'c4-m3-e4-l2-t1'),
+    ('Sblocal', 'c4-m6-e8-l4-t2'),
+    ('Sbopen', 'c4-m3-e4-l2-t1'),
+    ('Sbapi', 'c4-m3-e4-l2-t1'),
+    ('Sbapi', 'c4-m6-e8-l4-t2'),
+]
+FOLDERS = {'lineup': 'lineups', 'threesixty': 'three-sixty'}
+
+
+def make_parser(name, versions, url, cache_name, **kwargs):
+    """Create a parser pointed at the local server with a cache that doesn't expire."""
+    if name == 'Sblocal':
+        return Sblocal(**VERSIONS[versions], **kwargs)
+    cls = {'Sbopen': Sbopen, 'Sbapi': Sbapi}[name]
+    if name == 'Sbapi':
+        kwargs.update(sb_username='username', sb_password='password')
+    parser = cls(**VERSIONS[versions], cache_name=cache_name, expire_after=-1, **kwargs)
+    return point_parser(parser, url)
+
+
+def load(parser, name, kind, directory):
+    """Parse one kind of data for all the matches."""
+    data = os.path.join(directory, 'data')
+    if name == 'Sblocal':
+        if kind == 'competitions':
+            return parser.competitions(os.path.join(data, 'competitions.json'))
+        if kind == 'matches':
+            return parser.matches(os.path.join(data, 'matches', str(COMPETITION_ID), f'{SEASON_ID}.json'))
+        folder = FOLDERS.get(kind.split('_')[0], 'events')
+        return parser.match_data(sorted(glob.glob(os.path.join(data, folder, '*.json'))), kind)
+    if kind == 'competitions':
+        return parser.competitions()
+    if kind == 'matches':
+        return parser.matches(COMPETITION_ID, SEASON_ID)
+    return parser.competition_data(COMPETITION_ID, SEASON_ID, kind=kind)
+
+
+def measure(name, versions, kind, directory, url, cache_name, repeat):
+    """Time parsing one kind of data in this process (after one warm up run)."""
+    parser = make_parser(name, versions, url, cache_name)
+    load(parser, name, kind, directory)
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = load(parser, name, kind, directory)
+        seconds.append(time.perf_counter() - start)
+    return {
+        'parser': name,
+        'versions': versions,
+        'kind': kind,
+        'rows': len(df),
+        'seconds': min(seconds),
+        'rows_per_second': len(df) / min(seconds),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def peak_rss_mb():
+    """Return the peak resident memory of this process in MB."""
+    try:
+        # on Linux ru_maxrss includes the memory of the parent before the process was started,
+        # whereas VmHWM is reset when the new program is executed
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak_rss / 1024**2 if sys.platform == 'darwin' else peak_rss / 1024
+
+
+def git_commit():
+    """Return the current git commit hash, or None if it isn't available."""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def compare(results, filename):
+    """Print the change in wall time compared to the results in a previous output file."""
+    with open(filename) as f:
+        previous = json.load(f)
+    print(f'\ncompared to {filename} (commit {previous["metadata"]["commit"]})')
+    old = {(r['parser'], r['versions'], r['kind']): r for r in previous['results']}
+    for r in results:
+        key = (r['parser'], r['versions'], r['kind'])
+        if key in old:
+            ratio = r['seconds'] / old[key]['seconds']
+            print(f'{r["parser"]:<8} {r["versions"]:<15} {r["kind"]:<28} {ratio:6.2f}x time')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--matches', type=int, default=20)
+    parser.add_argument('--events', type=int, default=3500, help='events per match')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per kind (the fastest is kept)')
+    parser.add_argument('--data-dir', help='reuse or create the synthetic data in this directory')
+    parser.add_argument('--kinds', nargs='*', help='only benchmark these kinds')
+    parser.add_argument('--output', help='save the results to this JSON file')
+    parser.add_argument('--compare', help='compare with the results in this JSON file')
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(**json.loads(args.measure))))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.data_dir or os.path.join(tmp, 'statsbomb')
+        if not os.path.exists(os.path.join(directory, 'data', 'competitions.json')):
+            generate(directory, args.matches, args.events)
+        server, url = serve(directory)
+        cache_name = os.path.join(tmp, 'cache')
+        results = []
+        print(f'{"parser":<8} {"versions":<15} {"kind":<28} {"rows":>8} {"seconds":>8} {"rows/s":>10} {"peak MB":>8}')
+        for name, versions in CASES:
+            case_parser = make_parser(name, versions, url, cache_name)
+            kinds = ['competitions', 'matches'] + case_parser.valid_data()
+            if name == 'Sblocal':
+                # the combined kinds (e.g. 'events_360') need match identifiers rather than files
+                kinds = [kind for kind in kinds if kind not in case_parser.combined_map]
+            if args.kinds:
+                kinds = [kind for kind in kinds if kind in args.kinds]
+            for kind in kinds:
+                if name != 'Sblocal':
+                    # fill the cache so only the cached path is timed
+                    load(case_parser, name, kind, directory)
+                child = dict(
+                    name=name,
+                    versions=versions,
+                    kind=kind,
+                    directory=directory,
+                    url=url,
+                    cache_name=cache_name,
+                    repeat=args.repeat,
+                )
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--measure', json.dumps(child)],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout
+                r = json.loads(output.strip().splitlines()[-1])
+                results.append(r)
+                print(
+                    f'{name:<8} {versions:<15} {kind:<28} {r["rows"]:>8} {r["seconds"]:>8.3f} '
+                    f'{r["rows_per_second"]:>10.0f} {r["peak_rss_mb"]:>8.0f}'
+                )
+            case_parser.close_connection()
+        server.shutdown()
+
+    if args.output:
+        metadata = {
+            'commit': git_commit(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'duckdb': __import__('duckdb').__version__,
+            'matches': args.matches,
+            'events': args.events,
+            'repeat': args.repeat,
+        }
+        with open(args.output, 'w') as f:
+            json.dump({'metadata': metadata, 'results': results}, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
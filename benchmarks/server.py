@@ -0,0 +1,83 @@
+"""A local stand-in for the StatsBomb open-data and API servers.
+
+The files written by generate.py are served from <url>/data in the open-data layout
+and from <url>/api in the StatsBomb API layout, e.g. <url>/api/v8/events/<match_id>.
+"""
+
+import functools
+import http.server
+import os
+import re
+import threading
+
+# StatsBomb API paths and the open-data file they are served from
+API_ROUTES = [
+    (re.compile(r'^/api/v\d+/competitions$'), 'competitions.json'),
+    (
+        re.compile(r'^/api/v\d+/competitions/(\d+)/seasons/(\d+)/matches$'),
+        'matches/{0}/{1}.json',
+    ),
+    (re.compile(r'^/api/v\d+/events/(\d+)$'), 'events/{0}.json'),
+    (re.compile(r'^/api/v\d+/lineups/(\d+)$'), 'lineups/{0}.json'),
+    (re.compile(r'^/api/v\d+/360-frames/(\d+)$'), 'three-sixty/{0}.json'),
+]
+
+
+class StatsBombHandler(http.server.SimpleHTTPRequestHandler):
+    """Serve the open-data files as JSON, mapping the API paths to the open-data files."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def guess_type(self, path):
+        # requests-cache only decodes the content of JSON responses
+        return 'application/json'
+
+    def translate_path(self, path):
+        path = path.split('?', 1)[0]
+        for pattern, filename in API_ROUTES:
+            match = pattern.match(path)
+            if match:
+                path = '/data/' + filename.format(*match.groups())
+                break
+        return super().translate_path(path)
+
+
+def serve(directory):
+    """Serve a directory created by generate.py in a background thread.
+
+    Parameters
+    ----------
+    directory : str
+
+    Returns
+    -------
+    server : http.server.ThreadingHTTPServer
+        Call server.shutdown() to stop the server.
+    url : str
+        The base url of the server, e.g. 'http://127.0.0.1:8000'.
+    """
+    handler = functools.partial(StatsBombHandler, directory=os.path.abspath(directory))
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def point_parser(parser, url):
+    """Point a Sbopen or Sbapi parser at the local server instead of the StatsBomb servers.
+
+    Parameters
+    ----------
+    parser : Sbopen or Sbapi
+    url : str
+        The base url returned by serve.
+
+    Returns
+    -------
+    parser : Sbopen or Sbapi
+    """
+    base = f'{url}/data' if parser.url_ending == '.json' else f'{url}/api'
+    old = parser.url
+    parser.url = base
+    parser.url_map = {kind: url_slug.replace(old, base) for kind, url_slug in parser.url_map.items()}
+    return parser
@@ -0,0 +1,108 @@
+"""Benchmark the time to import duckstatsbomb, create a parser and clean a large cache.
+
+Each step is timed in a new python process so the imports are not already cached.
+The cache is filled with copies of one expired requests-cache response.
+
+Usage: python benchmarks/startup.py --responses 20000
+"""
+
+import argparse
+import functools
+import http.server
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def timed(code):
+    """Run code in a new python process and return the time it prints in seconds."""
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def fill_cache(cache_name, responses, directory):
+    """Fill a filesystem cache with copies of one expired response served from directory."""
+    from requests_cache import CachedSession
+
+    class Quiet(http.server.SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    handler = functools.partial(Quiet, directory=directory)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    session = CachedSession(cache_name=cache_name, backend='filesystem', expire_after=1)
+    resp = session.get(f'http://127.0.0.1:{server.server_port}/response.json')
+    server.shutdown()
+    path = os.path.join(session.cache.cache_dir, f'{resp.cache_key}.json')
+    old = time.time() - 3600
+    for i in range(responses):
+        copy = os.path.join(session.cache.cache_dir, f'{i:016x}.json')
+        shutil.copyfile(path, copy)
+        os.utime(copy, (old, old))
+    os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--responses', type=int, default=20000)
+    args = parser.parse_args()
+
+    steps = {
+        'import duckstatsbomb': (
+            'import time; t = time.perf_counter(); import duckstatsbomb; '
+            'print(time.perf_counter() - t)'
+        ),
+        'Sblocal()': (
+            'import time; from duckstatsbomb import Sblocal; t = time.perf_counter(); '
+            'Sblocal(); print(time.perf_counter() - t)'
+        ),
+        'Sbopen()': (
+            'import time; from duckstatsbomb import Sbopen; t = time.perf_counter(); '
+            'Sbopen(cache_name={cache!r}); print(time.perf_counter() - t)'
+        ),
+        'Sbopen() + first session use': (
+            'import time; from duckstatsbomb import Sbopen; t = time.perf_counter(); '
+            'Sbopen(cache_name={cache!r}).session; print(time.perf_counter() - t)'
+        ),
+        'Sbopen().remove_expired_responses()': (
+            'import time; from duckstatsbomb import Sbopen; t = time.perf_counter(); '
+            'Sbopen(cache_name={cache!r}, remove_expired_responses=False).remove_expired_responses(); '
+            'print(time.perf_counter() - t)'
+        ),
+        'requests-cache remove_expired_responses': (
+            'import time; from requests_cache import CachedSession; t = time.perf_counter(); '
+            'CachedSession(cache_name={cache!r}, backend="filesystem").cache.remove_expired_responses(); '
+            'print(time.perf_counter() - t)'
+        ),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, 'response.json'), 'w') as f:
+            json.dump([{'id': i, 'name': f'event {i}'} for i in range(100)], f)
+        template = os.path.join(tmp, 'template')
+        fill_cache(template, args.responses, tmp)
+        print(f'{args.responses} expired responses in the cache')
+        for step, code in steps.items():
+            cache = os.path.join(tmp, 'cache')
+            shutil.rmtree(cache, ignore_errors=True)
+            shutil.copytree(template, cache, copy_function=shutil.copy2)
+            seconds = timed(code.format(cache=cache))
+            print(f'{step:<45} {seconds:8.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Stress test a thread_safe parser called from several threads at once, like a web service.
+
+One Sbopen parser with thread_safe=True is shared by every thread. Each thread calls match_data for
+random matches from a warm requests-cache cache of synthetic data (see generate.py and server.py),
+and the row counts are checked against a single-threaded run. The throughput is reported for each
+number of threads, so it can be compared with the number of cores.
+
+Usage: python benchmarks/threads.py --matches 20 --events 3500 --threads 1 2 4 8 --calls 40
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from duckstatsbomb import Sbopen  # noqa: E402
+from generate import generate  # noqa: E402
+from server import point_parser, serve  # noqa: E402
+
+
+def stress(parser, match_ids, expected, kind, threads, calls, seed=0):
+    """Make calls match_data calls from threads threads and return the calls per second.
+
+    Raises an AssertionError if a call returns the wrong number of rows.
+    """
+    rng = random.Random(seed)
+    requests = [rng.choice(match_ids) for _ in range(calls)]
+    errors = []
+    lock = threading.Lock()
+
+    def call(match_id):
+        rows = len(parser.match_data(match_id, kind))
+        if rows != expected[match_id]:
+            with lock:
+                errors.append((match_id, rows, expected[match_id]))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(call, requests))
+    seconds = time.perf_counter() - start
+    assert not errors, f'wrong row counts (match_id, rows, expected): {errors[:5]}'
+    return calls / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--matches', type=int, default=20)
+    parser.add_argument('--events', type=int, default=3500, help='events per match')
+    parser.add_argument('--threads', type=int, nargs='*', default=[1, 2, 4, 8])
+    parser.add_argument('--calls', type=int, default=40, help='match_data calls per thread count')
+    parser.add_argument('--kind', default='events')
+    parser.add_argument('--data-dir', help='reuse or create the synthetic data in this directory')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.data_dir or os.path.join(tmp, 'statsbomb')
+        if not os.path.exists(os.path.join(directory, 'data', 'competitions.json')):
+            generate(directory, args.matches, args.events)
+        server, url = serve(directory)
+        sb = point_parser(
+            Sbopen(cache_name=os.path.join(tmp, 'cache'), expire_after=-1, thread_safe=True), url
+        )
+        match_ids = [int(name[:-5]) for name in os.listdir(os.path.join(directory, 'data', 'events'))]
+        # fill the cache and record the expected row counts single-threaded
+        expected = {match_id: len(sb.match_data(match_id, args.kind)) for match_id in match_ids}
+        print(f'{os.cpu_count()} cores, {len(match_ids)} matches, {args.calls} calls of match_data({args.kind!r})')
+        print(f'{"threads":>8} {"calls/s":>10} {"speed-up":>9}')
+        baseline = None
+        for threads in args.threads:
+            rate = stress(sb, match_ids, expected, args.kind, threads, args.calls)
+            baseline = baseline or rate
+            print(f'{threads:>8} {rate:>10.2f} {rate / baseline:>8.2f}x')
+        sb.close_connection()
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
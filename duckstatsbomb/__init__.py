@@ -1,4 +1,4 @@
 " duckstatsbomb imports."
 
 from .__about__ import __version__
-from .parser import Sbopen, Sbapi, Sblocal
+from .parser import Sbopen, Sbapi, Sblocal, CallStats
@@ -0,0 +1,7 @@
+"""Run the duckstatsbomb command line with python -m duckstatsbomb."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,339 @@
+"""`duckstatsbomb.cli` is the duckstatsbomb command line for prefetching and exporting StatsBomb data.
+
+The prefetch command downloads the responses for competitions into the cache, and the export command
+also parses them and writes a Parquet or Arrow file for each kind, competition and season. Both download
+with a bounded number of threads, collect the urls that fail rather than stopping, report the throughput,
+and keep a checkpoint manifest so an interrupted or failed run resumes where it stopped. Matches without
+360 data are skipped for the kinds that read the 360 files, with a warning.
+
+Examples
+--------
+duckstatsbomb prefetch --competition-id 11 --kinds events lineup_players threesixty
+duckstatsbomb export --competition-id 11 --season-id 1 90 --kinds events frames --output statsbomb_export
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from .parser import Sbapi, Sbopen
+
+__all__ = ['main']
+
+EXPORT_FORMATS = ['parquet', 'arrow']
+
+
+class _Manifest:
+    """A checkpoint of the work that is done, the urls that failed and the matches that were skipped,
+    saved as a JSON file.
+
+    The manifest is only reused by a run with the same arguments, which skips the work that is done and
+    retries the failed urls. It's removed when a run finishes without failures, so the next run
+    (e.g. from cron) starts again.
+
+    Parameters
+    ----------
+    path : str
+    arguments : dict
+        The arguments of the run, which are compared with the arguments saved in the manifest.
+    restart : bool, default False
+        If True, an existing manifest is ignored.
+    """
+
+    def __init__(self, path, arguments, restart=False):
+        self.path = path
+        self.arguments = arguments
+        self.done = {}
+        self.failed = {}
+        self.skipped = {}
+        if not restart and os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            if saved.get('arguments') == arguments:
+                self.done = saved['done']
+
+    def save(self):
+        """Write the manifest to a temporary file and rename it, so an interrupted write keeps the old manifest."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(f'{self.path}.tmp', 'w') as f:
+            json.dump(
+                {'arguments': self.arguments, 'done': self.done, 'failed': self.failed, 'skipped': self.skipped},
+                f,
+                indent=1,
+            )
+        os.replace(f'{self.path}.tmp', self.path)
+
+    def finish(self):
+        """Remove the manifest if nothing failed, otherwise save it for the next run."""
+        if self.failed:
+            self.save()
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class _Throughput:
+    """Count the urls, bytes and rows of a part of the run and report them per second."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.urls = self.bytes = self.rows = self.failed = 0
+
+    def add(self, other):
+        self.urls += other.urls
+        self.bytes += other.bytes
+        self.rows += other.rows
+        self.failed += other.failed
+
+    def report(self, label):
+        seconds = max(time.perf_counter() - self.start, 1e-9)
+        mb = self.bytes / 1024**2
+        line = (
+            f'{label}: {self.urls} urls, {mb:.1f}MB in {seconds:.1f}s '
+            f'({self.urls / seconds:.1f} urls/s, {mb / seconds:.1f}MB/s'
+        )
+        if self.rows:
+            line += f', {self.rows / seconds:.0f} rows/s'
+        print(f'{line}), {self.failed} failed', flush=True)
+
+
+def _parser(args):
+    """Create the Sbopen or Sbapi parser for the command line arguments."""
+    kws = {
+        'database': ':memory:',
+        'output_format': 'arrow',
+        'cache_name': args.cache_name,
+        'cache_backend': args.cache_backend,
+        'expire_after': args.expire_after,
+        'requests_max_workers': args.workers,
+        'cache_payload': args.cache_payload,
+        'max_retries': args.max_retries,
+        'rate_limit': args.rate_limit,
+    }
+    if args.api:
+        return Sbapi(**kws)
+    return Sbopen(**kws)
+
+
+def _seasons(parser, competition_ids, season_ids, kinds, manifest):
+    """Yield the competition_id, season_id and the urls of each match for each kind (see SbBase.match_urls)
+    of each season. A competition or season whose matches can't be requested is added to the failed urls.
+    """
+    for competition_id in competition_ids:
+        seasons = {}
+        try:
+            for kind in kinds:
+                for season_id in season_ids or [None]:
+                    for match_season_id, urls in parser.match_urls(competition_id, season_id, kind).items():
+                        seasons.setdefault(match_season_id, {})[kind] = urls
+        except Exception as err:
+            manifest.failed[f'competition_id={competition_id}'] = repr(err)
+            continue
+        for season_id, urls in seasons.items():
+            yield competition_id, season_id, urls
+
+
+def _skip(urls, key, manifest):
+    """Return the urls of the matches that have urls for a kind. The matches without any (no 360 data for
+    a kind that reads the 360 files) are recorded as skipped in the manifest with a warning.
+    """
+    skipped = [match_id for match_id, match_urls in urls.items() if not match_urls]
+    if skipped:
+        manifest.skipped[key] = skipped
+        print(f'warning: {key} skips {len(skipped)} matches without 360 data', file=sys.stderr, flush=True)
+    return {match_id: match_urls for match_id, match_urls in urls.items() if match_urls}
+
+
+def _download(parser, urls, workers, manifest, throughput):
+    """Download the urls with up to workers threads (see SbBase.prefetch), recording each url as done or
+    failed in the manifest.
+
+    Returns
+    -------
+    failed : set of str
+    """
+    paths, failed = parser.prefetch(urls, max_workers=workers)
+    throughput.urls += len(paths) + len(failed)
+    throughput.failed += len(failed)
+    for url, path in paths.items():
+        size = os.path.getsize(path) if os.path.isfile(path) else 0
+        throughput.bytes += size
+        manifest.done[url] = size
+        manifest.failed.pop(url, None)
+    for url, err in failed.items():
+        manifest.failed[url] = repr(err)
+    return set(failed)
+
+
+def _write(table, path, export_format):
+    """Write a pyarrow.Table to a Parquet or Arrow IPC file via a temporary file, so a file is only
+    at its path once it's complete.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if export_format == 'parquet':
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, f'{path}.tmp')
+    else:
+        import pyarrow.feather as feather
+
+        feather.write_feather(table, f'{path}.tmp')
+    os.replace(f'{path}.tmp', path)
+
+
+def prefetch(parser, args):
+    """Download the files for the kinds of data of each competition and season into the cache."""
+    manifest = _Manifest(args.manifest or f'{args.cache_name}_prefetch.json', _arguments(args), args.restart)
+    total = _Throughput()
+    try:
+        seasons = _seasons(parser, args.competition_id, args.season_id, args.kinds, manifest)
+        for competition_id, season_id, season_urls in seasons:
+            throughput = _Throughput()
+            todo = []
+            for kind, urls in season_urls.items():
+                for match_urls in _skip(urls, f'{kind}/{competition_id}/{season_id}', manifest).values():
+                    todo.extend(url for url in match_urls if url not in manifest.done)
+            _download(parser, list(dict.fromkeys(todo)), args.workers, manifest, throughput)
+            manifest.save()
+            throughput.report(f'competition {competition_id} season {season_id}')
+            total.add(throughput)
+    finally:
+        manifest.save()
+        parser.close_connection()
+    return _finish(manifest, total)
+
+
+def export(parser, args):
+    """Download and parse the kinds of data of each competition and season, and write a file for each
+    kind, competition and season to <output>/<kind>/competition_id=<id>/season_id=<id>/data.<format>.
+
+    A file is written without the matches whose urls failed, and it's only recorded as done in the
+    manifest if none of its urls failed, so it's written again by the next run. The urls shared by several
+    kinds (e.g. the events files for 'events' and 'events_360') are only downloaded once for each season,
+    so a url that fails is only retried and counted once.
+    """
+    manifest = _Manifest(
+        args.manifest or os.path.join(args.output, 'manifest.json'), _arguments(args), args.restart
+    )
+    total = _Throughput()
+    try:
+        seasons = _seasons(parser, args.competition_id, args.season_id, args.kinds, manifest)
+        for competition_id, season_id, season_urls in seasons:
+            throughput = _Throughput()
+            # kinds that read the same files are parsed in one call, so the files are only parsed once
+            groups = {}
+            for kind, urls in season_urls.items():
+                key = f'{kind}/{competition_id}/{season_id}'
+                if key in manifest.done:
+                    continue
+                urls = _skip(urls, key, manifest)
+                group_key = tuple((match_id, tuple(match_urls)) for match_id, match_urls in urls.items())
+                groups.setdefault(group_key, {'kinds': [], 'urls': urls})['kinds'].append(kind)
+            requested = set()
+            failed = set()
+            for group in groups.values():
+                urls = group['urls']
+                group_urls = [url for match_urls in urls.values() for url in match_urls]
+                todo = [url for url in dict.fromkeys(group_urls) if url not in requested]
+                failed |= _download(parser, todo, args.workers, manifest, throughput)
+                requested.update(todo)
+                match_ids = [match_id for match_id, match_urls in urls.items() if failed.isdisjoint(match_urls)]
+                try:
+                    data = parser.match_data(match_ids, group['kinds']) if match_ids else {}
+                except Exception as err:
+                    for kind in group['kinds']:
+                        manifest.failed[f'{kind}/{competition_id}/{season_id}'] = repr(err)
+                    throughput.failed += 1
+                    continue
+                for kind in group['kinds']:
+                    key = f'{kind}/{competition_id}/{season_id}'
+                    manifest.failed.pop(key, None)
+                    if kind not in data:
+                        manifest.done[key] = {'path': None, 'matches': 0, 'rows': 0}
+                        continue
+                    path = os.path.join(
+                        args.output, kind, f'competition_id={competition_id}', f'season_id={season_id}',
+                        f'data.{args.format}',
+                    )
+                    _write(data[kind], path, args.format)
+                    throughput.rows += data[kind].num_rows
+                    if len(match_ids) == len(urls):
+                        manifest.done[key] = {'path': path, 'matches': len(match_ids), 'rows': data[kind].num_rows}
+                manifest.save()
+            throughput.report(f'competition {competition_id} season {season_id}')
+            total.add(throughput)
+    finally:
+        manifest.save()
+        parser.close_connection()
+    return _finish(manifest, total)
+
+
+def _arguments(args):
+    """The arguments that identify a run in its manifest."""
+    return {
+        key: value for key, value in vars(args).items()
+        if key in ('command', 'api', 'competition_id', 'season_id', 'kinds', 'output', 'format')
+    }
+
+
+def _finish(manifest, total):
+    """Report the total throughput and the failures, and return the exit status."""
+    total.report('total')
+    for url, err in manifest.failed.items():
+        print(f'failed: {url} {err}', file=sys.stderr)
+    manifest.finish()
+    if manifest.failed:
+        print(f'{len(manifest.failed)} failed, rerun the command to retry them ({manifest.path})', file=sys.stderr)
+        return 1
+    return 0
+
+
+def _argument_parser():
+    parser = argparse.ArgumentParser(prog='duckstatsbomb', description='Prefetch and export StatsBomb data.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for command, function, help in [
+        ('prefetch', prefetch, 'download the data into the cache'),
+        ('export', export, 'download and parse the data and write a file for each kind, competition and season'),
+    ]:
+        sub = subparsers.add_parser(command, help=help, description=help)
+        sub.set_defaults(function=function)
+        sub.add_argument('--competition-id', type=int, nargs='+', required=True)
+        sub.add_argument(
+            '--season-id', type=int, nargs='*', help='the seasons of the competitions, the default is every season'
+        )
+        sub.add_argument('--kinds', nargs='+', default=['events'], help="the kinds of data, default 'events'")
+        sub.add_argument('--api', action='store_true', help='use the StatsBomb API (SB_USERNAME/SB_PASSWORD)')
+        sub.add_argument('--workers', type=int, default=8, help='the number of download threads, default 8')
+        sub.add_argument('--rate-limit', type=float, help='the maximum number of requests per second')
+        sub.add_argument('--max-retries', type=int, default=3, help='retries for each request, default 3')
+        sub.add_argument('--cache-name', default='statsbomb_cache')
+        sub.add_argument('--cache-backend', default='filesystem', choices=['filesystem', 'duckdb'])
+        sub.add_argument('--cache-payload', action='store_true', help='also save each response as a JSON file')
+        sub.add_argument(
+            '--expire-after', type=int, default=-1,
+            help='the number of seconds to keep cached responses, default -1 (never expire)',
+        )
+        sub.add_argument('--manifest', help='the checkpoint manifest path')
+        sub.add_argument('--restart', action='store_true', help='ignore the checkpoint manifest of an earlier run')
+        if command == 'export':
+            sub.add_argument('--output', default='statsbomb_export', help='the output directory')
+            sub.add_argument('--format', default='parquet', choices=EXPORT_FORMATS)
+    return parser
+
+
+def main(argv=None):
+    """Run the duckstatsbomb command line and return the exit status (1 if any url failed)."""
+    argument_parser = _argument_parser()
+    args = argument_parser.parse_args(argv)
+    parser = _parser(args)
+    invalid = [kind for kind in args.kinds if kind not in parser.valid_data()]
+    if invalid:
+        parser.close_connection()
+        argument_parser.error(f'invalid kinds {invalid}, the kinds should be in {parser.valid_data()}')
+    return args.function(parser, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
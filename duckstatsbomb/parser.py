@@ -1,14 +1,693 @@
 """`duckstatsbomb.parser` is a python module for loading StatsBomb open-data / API data."""
 
 import duckdb
-from requests_cache import CachedSession
 import collections
+import contextlib
+import functools
+import glob
+import hashlib
+import inspect
+import json
+import multiprocessing
+import numbers
 import pkgutil
 import os
+import random
+import re
+import shutil
+import tempfile
+import threading
+import time
 from abc import ABC, abstractmethod
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
-__all__ = ['Sbopen', 'Sbapi', 'Sblocal']
+__all__ = ['Sbopen', 'Sbapi', 'Sblocal', 'CallStats']
+
+OUTPUT_FORMATS = ['pandas', 'arrow', 'polars', 'numpy', 'relation']
+COMPACT_FORMATS = ['categorical', 'star']
+# the source of the responses in the queries for data cached by requests-cache ('sql/cache')
+_CACHED_RESPONSES = re.compile(
+    r"read_json\(\$filename, format = 'auto', columns = \{url: 'varchar', _decoded_content: 'json'\}[^)]*\)"
+)
+# the duckdb default maximum_object_size for read_json
+_MINIMUM_OBJECT_SIZE = 16777216
+
+
+def _object_size_parameters(sql, parameters):
+    """Add the $maximum_object_size parameter of the queries that read each cached 360 response as one
+    JSON object. It's the size of the largest file in the $filename (or $<kind>_filename) parameters,
+    so a response of any size can be read.
+
+    Parameters
+    ----------
+    sql : str
+    parameters : dict or None
+
+    Returns
+    -------
+    parameters : dict or None
+    """
+    if parameters is None or '$maximum_object_size' not in sql:
+        return parameters
+    sizes = [
+        os.path.getsize(path)
+        for name, paths in parameters.items()
+        if name.endswith('filename')
+        for path in ([paths] if isinstance(paths, str) else paths)
+    ]
+    return {**parameters, 'maximum_object_size': max(sizes + [_MINIMUM_OBJECT_SIZE])}
+
+
+def _replace_cte(sql, name, body):
+    """Replace the body of a common table expression in a SQL query.
+
+    Parameters
+    ----------
+    sql : str
+        A SQL query containing a common table expression, e.g. 'with raw_json as (...)'.
+    name : str
+        The name of the common table expression.
+    body : str
+        The SQL to use in place of the existing common table expression body.
+
+    Returns
+    -------
+    sql : str
+    """
+    start = re.search(rf'\b{name} as (materialized )?\(', sql).end()
+    depth = 1
+    for end in range(start, len(sql)):
+        if sql[end] == '(':
+            depth += 1
+        elif sql[end] == ')':
+            depth -= 1
+            if depth == 0:
+                break
+    return f'{sql[:start]}\n{body}\n{sql[end:]}'
+
+
+def _prune_select(sql, columns):
+    """Remove the columns that aren't needed from a query and the keys they use from its JSON schema.
+
+    The query must have a 'final as (select ... from raw_json)' common table expression that selects
+    one column per line, and a JSON schema (the read_json columns or the from_json structure)
+    with one key per line.
+
+    Parameters
+    ----------
+    sql : str
+    columns : list of str
+        The columns that are needed from the final common table expression.
+
+    Returns
+    -------
+    sql : str
+    """
+    lines = sql.splitlines()
+    start = next(i for i, line in enumerate(lines) if line.strip() == 'final as (') + 2
+    end = next(i for i in range(start, len(lines)) if lines[i].strip() == 'from')
+    # group the lines into select items, which can span several lines, keyed by their last line
+    items = {}
+    item_lines = []
+    for i in range(start, end):
+        item_lines.append(i)
+        item = ' '.join(lines[j].strip() for j in item_lines).rstrip(',')
+        if item.count('(') != item.count(')'):
+            continue
+        alias = re.search(r'\s+as\s+(\w+)$', item)
+        if alias is None:
+            items[i] = (re.findall(r'\w+', item)[-1], item, item_lines)
+        else:
+            items[i] = (alias.group(1), item[: alias.start()], item_lines)
+        item_lines = []
+    keep_items = [i for i, (alias, _, _) in items.items() if alias in columns]
+
+    pattern = re.compile(r'^(?P<prefix>.*?)"(?P<key>\w+)": (?P<type>".*"|\'.*\'),?\s*$')
+    schema = {i: pattern.match(line) for i, line in enumerate(lines[:start])}
+    schema = {i: match for i, match in schema.items() if match is not None}
+    keep_schema = [
+        i
+        for i, match in schema.items()
+        if any(
+            re.search(rf'(?<![\w.])(json\.)?"?{match.group("key")}"?(?!\w)', items[j][1])
+            for j in keep_items
+        )
+    ]
+    # the schema can't be empty, so keep the first key
+    keep_schema = keep_schema or [min(schema)]
+
+    prefix = schema[min(schema)].group('prefix')
+    for i, match in schema.items():
+        start_of_line = prefix if i == keep_schema[0] else ' ' * len(prefix)
+        comma = '' if i == keep_schema[-1] else ','
+        lines[i] = f'{start_of_line}"{match.group("key")}": {match.group("type")}{comma}'
+    for i in items:
+        lines[i] = lines[i].rstrip().rstrip(',') + ('' if i == keep_items[-1] else ',')
+    remove = {j for i, (_, _, item_lines) in items.items() if i not in keep_items for j in item_lines}
+    remove |= set(schema) - set(keep_schema)
+    return '\n'.join(line for i, line in enumerate(lines) if i not in remove)
+
+
+# the compact types depend only on the column names, so the chunks and batches of a result share a schema
+_COMPACT_INTEGERS = {
+    'uint8': (
+        'period', 'minute', 'second', 'start_minute', 'start_second', 'jersey_number', 'home_score', 'away_score',
+        'match_week',
+    ),
+    'uint16': ('index', 'index_related', 'possession', 'event_count', 'pass_count', 'shot_count'),
+}
+# the suffixes of the repetitive string columns, e.g. the player, team and type names
+_COMPACT_CATEGORICALS = (
+    '_name', '_name_related', '_nickname', '_gender', '_group', '_status', '_status_360', 'formation', '_version',
+)
+
+
+def _compact_table(table):
+    """Dictionary-encode the repetitive string columns and downcast the integer columns of a pyarrow.Table.
+
+    The types only depend on the column names: the names (and the other string columns with a suffix in
+    _COMPACT_CATEGORICALS, or the 'type' column of the star schema types) are dictionary-encoded, the identifiers
+    (e.g. 'player_id') are cast to uint32, and the columns in _COMPACT_INTEGERS to uint8 or uint16.
+    The other columns are unchanged.
+
+    Parameters
+    ----------
+    table : pyarrow.Table
+
+    Returns
+    -------
+    pyarrow.Table
+    """
+    import pyarrow
+
+    integers = {name: dtype for dtype, names in _COMPACT_INTEGERS.items() for name in names}
+    columns = []
+    for name, column in zip(table.column_names, table.columns):
+        is_string = pyarrow.types.is_string(column.type) or pyarrow.types.is_large_string(column.type)
+        if is_string and (name == 'type' or name.endswith(_COMPACT_CATEGORICALS)):
+            column = column.dictionary_encode()
+        elif pyarrow.types.is_integer(column.type):
+            if name in integers:
+                column = column.cast(integers[name])
+            elif name == 'id' or name.endswith('_id'):
+                column = column.cast('uint32')
+        columns.append(column)
+    return pyarrow.table(columns, names=table.column_names)
+
+
+def _star_schema(table):
+    """Split a pyarrow.Table into a fact table and players, teams and types dimension tables.
+
+    Each <prefix>_name column with a matching <prefix>_id column is moved to a dimension:
+    teams (team_id, team_name) if the prefix contains 'team', players (player_id, player_name) if the
+    prefix refers to a player, e.g. 'pass_recipient', and otherwise types (type, id, name),
+    where type is the prefix, e.g. 'play_pattern'.
+
+    Parameters
+    ----------
+    table : pyarrow.Table
+
+    Returns
+    -------
+    dict of pyarrow.Table
+        The 'facts', 'players', 'teams' and 'types' tables.
+    """
+    import pyarrow
+
+    dimensions = {'players': [], 'teams': [], 'types': []}
+    names = []
+    for name in table.column_names:
+        prefix = name[: -len('_name')]
+        if not name.endswith('_name') or f'{prefix}_id' not in table.column_names:
+            continue
+        names.append(name)
+        pairs = pyarrow.table(
+            {'id': table[f'{prefix}_id'].cast(pyarrow.int64()), 'name': table[name].cast(pyarrow.string())}
+        )
+        pairs = pairs.filter(pairs['id'].is_valid()).group_by(['id', 'name']).aggregate([])
+        if 'team' in prefix:
+            dimensions['teams'].append(pairs.rename_columns(['team_id', 'team_name']))
+        elif any(word in prefix for word in ('player', 'recipient', 'replacement')):
+            dimensions['players'].append(pairs.rename_columns(['player_id', 'player_name']))
+        else:
+            types = pyarrow.array([prefix] * len(pairs), pyarrow.string())
+            dimensions['types'].append(pairs.add_column(0, 'type', types))
+    schemas = {
+        'players': pyarrow.schema([('player_id', pyarrow.int64()), ('player_name', pyarrow.string())]),
+        'teams': pyarrow.schema([('team_id', pyarrow.int64()), ('team_name', pyarrow.string())]),
+        'types': pyarrow.schema(
+            [('type', pyarrow.string()), ('id', pyarrow.int64()), ('name', pyarrow.string())]
+        ),
+    }
+    data = {'facts': table.drop(names)}
+    for dimension, tables in dimensions.items():
+        merged = pyarrow.concat_tables(tables) if tables else schemas[dimension].empty_table()
+        data[dimension] = merged.group_by(merged.column_names).aggregate([])
+    return data
+
+
+class _LazySql(dict):
+    """A dictionary of SQL queries that reads each SQL file the first time the query is used.
+
+    Parameters
+    ----------
+    get_sql : callable
+        A function that returns the SQL in a file given its path.
+    paths : dict
+        The paths to the SQL files in the duckstatsbomb package.
+    builders : dict, default None
+        Functions that build the queries combined from other queries (e.g. 'events_360'),
+        which are called in place of get_sql.
+    """
+
+    def __init__(self, get_sql, paths, builders=None):
+        super().__init__()
+        self.get_sql = get_sql
+        self.paths = paths
+        self.builders = builders or {}
+
+    def __missing__(self, key):
+        if key in self.builders:
+            sql = self.builders[key]()
+        else:
+            sql = self.get_sql(self.paths[key])
+        self[key] = sql
+        return sql
+
+    def __contains__(self, key):
+        return key in self.paths
+
+
+class _TokenBucket:
+    """A thread-safe token bucket that limits the rate of requests.
+
+    Parameters
+    ----------
+    rate : float
+        The number of tokens added per second.
+    capacity : float, default None
+        The maximum number of tokens, i.e. the size of a burst of requests. The default is max(rate, 1).
+    """
+
+    def __init__(self, rate, capacity=None):
+        if not rate > 0:
+            raise ValueError('rate should be above 0')
+        self.rate = rate
+        self.capacity = max(rate, 1) if capacity is None else capacity
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class _ThrottledAdapter:
+    """A requests transport adapter that rate limits and retries requests.
+
+    The adapter is only used for requests that aren't answered from the cache. It keeps up to
+    pool_maxsize connections alive per host, takes a token from the rate limiter before each attempt,
+    and retries connection errors and the retry_status codes with exponential backoff and full jitter.
+    The Retry-After header is respected if it is given in seconds.
+
+    Parameters
+    ----------
+    max_retries : int, default 3
+        The number of times a failed request is retried.
+    backoff_factor : float, default 0.5
+        The backoff before retry n is a random time up to backoff_factor * 2 ** n seconds.
+    rate_limit : float, default None
+        The maximum number of requests per second. The default doesn't limit the rate.
+    pool_maxsize : int, default 10
+        The number of connections to keep alive per host.
+    """
+
+    retry_status = (429, 500, 502, 503, 504)
+
+    def __init__(self, max_retries=3, backoff_factor=0.5, rate_limit=None, pool_maxsize=10):
+        # requests is imported here so importing duckstatsbomb stays fast
+        from requests.adapters import HTTPAdapter
+
+        self.adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+        self.retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.rate_limiter = None if rate_limit is None else _TokenBucket(rate_limit)
+
+    def _backoff(self, attempt, resp=None):
+        """Return the number of seconds to wait before retrying."""
+        retry_after = None if resp is None else resp.headers.get('Retry-After')
+        if retry_after is not None and retry_after.isdigit():
+            return float(retry_after)
+        return random.uniform(0, self.backoff_factor * 2**attempt)
+
+    def send(self, request, **kwargs):
+        for attempt in range(self.retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                resp = self.adapter.send(request, **kwargs)
+            except OSError:
+                # requests ConnectionError and Timeout are subclasses of OSError
+                if attempt == self.retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+            if resp.status_code not in self.retry_status or attempt == self.retries:
+                return resp
+            wait = self._backoff(attempt, resp)
+            resp.close()
+            time.sleep(wait)
+
+    def close(self):
+        self.adapter.close()
+
+
+def _arrow_table(result):
+    """Fetch a duckdb result as a pyarrow.Table. Newer duckdb versions deprecate fetch_arrow_table for
+    to_arrow_table (and arrow returns a RecordBatchReader), while older versions only have arrow.
+    """
+    if hasattr(result, 'to_arrow_table'):
+        return result.to_arrow_table()
+    return result.arrow()
+
+
+def _arrow_reader(result, rows_per_batch):
+    """Fetch a duckdb result as a pyarrow.RecordBatchReader of up to rows_per_batch rows per batch, with
+    to_arrow_reader where duckdb has it, as fetch_record_batch is deprecated in newer versions.
+    """
+    if hasattr(result, 'to_arrow_reader'):
+        return result.to_arrow_reader(rows_per_batch)
+    return result.fetch_record_batch(rows_per_batch)
+
+
+def _utcnow():
+    """Return the current UTC time as a naive datetime, which is how times are stored in the responses table."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# the fields of a requests-cache response file that hold its content, which are written after the metadata
+_CONTENT_FIELDS = (b'"_decoded_content"', b'"_content"')
+
+
+@functools.lru_cache(maxsize=65536)
+def _content_digest(path, size, modified):
+    """Return the md5 hex digest of the content of a file, which is only computed again if the file is rewritten.
+
+    For a requests-cache response file only the content is hashed, not the metadata before it (e.g. created_at,
+    expires and the Date header), which changes every time the response is stored again, e.g. after a 304.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    starts = [start for start in (data.find(field, 0, 65536) for field in _CONTENT_FIELDS) if start >= 0]
+    return hashlib.md5(data[min(starts):] if starts else data).hexdigest()
+
+
+def _file_signature(path):
+    """Return the (path, size, content digest, modification time in ns) of a file.
+
+    The first three only change if the content changes (see _content_digest), and the modification time
+    is when the file was last written.
+    """
+    stat = os.stat(path)
+    return path, stat.st_size, _content_digest(path, stat.st_size, stat.st_mtime_ns), stat.st_mtime_ns
+
+
+def _response_metadata(path):
+    """Read the metadata of a requests-cache response file (e.g. the expires and url fields) without decoding
+    its content, which the JSON serializer writes after the metadata.
+
+    Parameters
+    ----------
+    path : str
+
+    Returns
+    -------
+    metadata : dict or None
+        None if the metadata isn't at the start of the file.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(65536)
+    ends = [end for end in (head.find(field) for field in _CONTENT_FIELDS) if end >= 0]
+    if not ends:
+        return None
+    end = min(ends)
+    try:
+        metadata = json.loads(head[:end].rstrip().rstrip(b',') + b'}')
+    except ValueError:
+        return None
+    return metadata if 'url' in metadata else None
+
+
+def _quote_identifier(name):
+    """Quote a table name, which can be qualified with a schema (e.g. 'main.events'), for a SQL statement."""
+    return '.'.join('"' + part.replace('"', '""') + '"' for part in name.split('.'))
+
+
+def _quote_string(value):
+    """Quote a value, e.g. a setting or a file path that may contain quotes, as a SQL string literal."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _size_bytes(size):
+    """Return the number of bytes in a duckdb memory size, e.g. '4GB' (1000 ** 3 bytes) or '4GiB' (1024 ** 3 bytes)."""
+    match = re.fullmatch(r'\s*([\d.]+)\s*([kmgt]?)(i?)b?\s*', size.lower())
+    if match is None:
+        raise ValueError(f'Invalid memory size: {size!r}')
+    number, unit, binary = match.groups()
+    return float(number) * (1024 if binary else 1000) ** ' kmgt'.index(unit or ' ')
+
+
+class _ResultCache:
+    """A thread-safe least recently used cache of parsed data (pyarrow.Table) with a memory budget.
+
+    Each table is stored with the signature of the file it was parsed from (see _file_signature), which
+    is compared without the time the file was written, so a response stored again with the same content
+    (e.g. revalidated with a 304) keeps its tables.
+
+    Parameters
+    ----------
+    max_bytes : int
+        The maximum total size of the cached tables in bytes.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, signature=None, max_age=None):
+        """Return the table cached for key if it is valid, otherwise None.
+
+        Parameters
+        ----------
+        key : tuple
+        signature : tuple, default None
+            If given, the table is only valid if it was parsed from a file with this signature.
+        max_age : float, default None
+            If signature isn't given, the table is only valid if the file it was parsed from was written
+            less than max_age seconds ago (max_age < 0 never expires). The default is always invalid.
+
+        Returns
+        -------
+        pyarrow.Table or None
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            entry_signature, table = entry
+            if signature is not None:
+                if signature[:3] != entry_signature[:3]:
+                    return None
+                # the time the file was written is updated, so max_age counts from the last time it was stored
+                self.entries[key] = (signature, table)
+            elif max_age is None or (max_age >= 0 and time.time() - entry_signature[3] / 1e9 >= max_age):
+                return None
+            self.entries.move_to_end(key)
+            return table
+
+    def put(self, key, signature, table):
+        """Cache a table and evict the least recently used tables if the cache is over budget."""
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1].nbytes
+            if table.nbytes > self.max_bytes:
+                return
+            self.entries[key] = (signature, table)
+            self.nbytes += table.nbytes
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+    def count(self, hits=0, misses=0):
+        """Add to the hit and miss counters."""
+        with self.lock:
+            self.hits += hits
+            self.misses += misses
+
+    def clear(self):
+        """Remove all the cached tables (the counters are kept)."""
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+
+def _run_shard(statements, memory_limit=None, threads=None):
+    """Run the statements for one shard of the files on a new duckdb connection, in a worker process.
+
+    Parameters
+    ----------
+    statements : list of tuple
+        (sql, filename, path) tuples. filename is the $filename parameter, or None if the statement
+        has no parameters. If path isn't None, the result of the query is copied to a Parquet file at the path.
+    memory_limit : str, default None
+        The duckdb memory_limit, e.g. '2GB'. The default uses the duckdb default.
+    threads : int, default None
+        The number of threads used by duckdb. The default uses the duckdb default.
+    """
+    con = duckdb.connect()
+    try:
+        if memory_limit is not None:
+            con.execute(f'set memory_limit = {_quote_string(memory_limit)}')
+        if threads is not None:
+            con.execute(f'set threads to {threads}')
+        for sql, filename, path in statements:
+            parameters = _object_size_parameters(sql, None if filename is None else {'filename': filename})
+            if path is None:
+                con.execute(sql, parameters)
+            else:
+                con.execute(f"copy ({sql.rstrip().rstrip(';')}) to {_quote_string(path)} (format parquet)", parameters)
+    finally:
+        con.close()
+
+
+class CallStats:
+    """Statistics for one call of a public parser method, e.g. competition_data.
+
+    The times are wall times in seconds. For iter_competition_data, total_seconds
+    excludes the time spent by the caller between batches.
+
+    Attributes
+    ----------
+    method : str
+        The name of the method, e.g. 'competition_data'.
+    urls : int
+        The number of urls requested.
+    cache_hits, cache_misses : int
+        The number of requests answered from the cache (or a saved payload) and from the server.
+    revalidated : int
+        The number of cache hits that were revalidated with a conditional request (304 Not Modified).
+    result_cache_hits, result_cache_misses : int
+        The number of match and kind tables reused from and added to the in-memory result cache.
+    bytes_read : int
+        The size of the files parsed by duckdb, i.e. the cached responses or local files.
+    request_seconds : float
+        The time spent requesting the urls (_request_get).
+    query_seconds : float
+        The time spent executing the queries.
+    materialize_seconds : float
+        The time spent converting the query results to the output_format.
+    total_seconds : float
+        The time spent in the method.
+    profiles : list of dict
+        If profile is True, the duckdb profiling output of each query with the kind of data ('query')
+        and the kind's SQL file ('sql_file').
+    """
+
+    def __init__(self, method):
+        self.method = method
+        self.urls = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.revalidated = 0
+        self.result_cache_hits = 0
+        self.result_cache_misses = 0
+        self.bytes_read = 0
+        self.request_seconds = 0.0
+        self.query_seconds = 0.0
+        self.materialize_seconds = 0.0
+        self.total_seconds = 0.0
+        self.profiles = []
+        self._lock = threading.Lock()
+
+    def add(self, **values):
+        """Add to the statistics, e.g. add(urls=1, cache_hits=1). Safe to call from several threads."""
+        with self._lock:
+            for name, value in values.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def to_dict(self):
+        """Return the statistics as a dictionary that can be serialized to JSON."""
+        return {name: value for name, value in vars(self).items() if not name.startswith('_')}
+
+    def __repr__(self):
+        values = ', '.join(
+            f'{name}={value}' for name, value in self.to_dict().items() if name != 'profiles'
+        )
+        return f'CallStats({values})'
+
+
+def _instrumented(method):
+    """Decorate a public parser method to record a CallStats object for each call.
+
+    The statistics are recorded in self.last_stats and passed to self.stats_callback.
+    Calls made from inside another instrumented method are recorded in the outer call's statistics.
+    If thread_safe is True, each call runs its queries on its own cursor.
+    """
+    if inspect.isgeneratorfunction(method):
+
+        @functools.wraps(method)
+        def generator_wrapper(self, *args, **kwargs):
+            stats = CallStats(method.__name__)
+            cursor = self._call_cursor()
+            generator = method(self, *args, **kwargs)
+            try:
+                while True:
+                    # only record while the generator runs, as other calls can be made between batches
+                    with self._recording(stats, cursor):
+                        try:
+                            item = next(generator)
+                        except StopIteration:
+                            return
+                    yield item
+            finally:
+                with self._recording(stats, cursor):
+                    generator.close()
+                self._close_cursor(cursor)
+                self._finish_stats(stats)
+
+        return generator_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._stats is not None:
+            return method(self, *args, **kwargs)
+        stats = CallStats(method.__name__)
+        cursor = self._call_cursor()
+        try:
+            with self._recording(stats, cursor):
+                return method(self, *args, **kwargs)
+        finally:
+            self._close_cursor(cursor)
+            self._finish_stats(stats)
+
+    return wrapper
 
 
 class SbBase(ABC):
@@ -24,28 +703,122 @@ class SbBase(ABC):
         established, which will be created if it doesn't already exist.
     duckdb_threads, int, default None
         The number of threads used by duckdb. The default uses the duckdb default
+    match_index : bool, default False
+        If True, the match identifiers for competition_data, iter_competition_data and sync are looked up in
+        the match_index table of the duckdb database rather than requesting and parsing the competitions and
+        matches files on every call. A competition is indexed the first time it's used, and refresh_match_index
+        re-indexes the seasons whose match_updated time in the competitions data has changed.
+        Use a file path for the database argument to keep the index between sessions.
+    memory_limit : str, default None
+        The duckdb memory_limit, e.g. '4GB'. Queries and temporary tables that need more memory are spilled
+        to the temp_directory. If the JSON files for a call of match_data or competition_data are bigger than
+        a tenth of the limit, the matches are parsed a chunk at a time into a temporary table rather than
+        in one query. The default uses the duckdb default.
+    temp_directory : str, default None
+        The directory duckdb spills to when the memory_limit is exceeded. The default uses the duckdb default,
+        e.g. '<database>.tmp' (or '.tmp' for an in-memory database) in duckdb 0.10 or later.
     output_format : str, default 'pandas'
-        The format of data that is returned by the methods: match_data, competition_data, competitions, and match_data.
+        The format of data that is returned by the methods: match_data, competition_data, competitions, and matches.
+        One of 'pandas' (pandas.DataFrame), 'arrow' (pyarrow.Table), 'polars' (polars.DataFrame),
+        'numpy' (dict of numpy arrays) or 'relation' (a lazy duckdb.DuckDBPyRelation).
+    compact : str, default None
+        If set, the results use less memory (requires pyarrow). One of 'categorical', where repetitive string
+        columns such as the names are dictionary-encoded (pandas.Categorical) and integer columns such as the
+        identifiers are downcast to a fixed smaller type, so every batch has the same types, or 'star', where each result is also split into a dictionary
+        of a 'facts' table without the names that have an id column, and 'players', 'teams' and 'types'
+        (type, id, name) dimension tables. Batches from iter_competition_data are only made 'categorical'.
+        Can't be used with the 'relation' output_format.
     cache_name : str, default 'statsbomb_cache'
-        Base directory for cache files
+        Base directory for cache files (or the '<cache_name>.duckdb' database with the 'duckdb' cache_backend).
     cache_backend : str, default 'filesystem'
-        The requests-cache backend.
-    removed_expired_responses : bool, default True
-        If True, removes the expired cached responses when instantiating the class.
+        The requests-cache backend, or 'duckdb' to store the responses in a table of a duckdb database
+        ('<cache_name>.duckdb') keyed by url with their expiry time, which the queries read directly rather than
+        a JSON file per response. With duckdb 1.2 or later the content is compressed with zstd.
+        The database can only be opened by one process at a time, so the data isn't parsed in worker processes
+        (process_workers), and it can't be used with cache_payload.
+    remove_expired_responses : bool, default True
+        If True, removes the expired cached responses in a background thread when the requests-cache session
+        is first used (at most once every expire_after seconds).
     expire_after : int, default 360
         The number of seconds to store cached responses.
+    revalidate : bool, default False
+        If True, expired responses are kept in the cache rather than removed, so they are revalidated with a
+        conditional request (If-None-Match/If-Modified-Since from the ETag/Last-Modified headers) and only
+        downloaded again if they have changed. The cached responses for a match are also used without a request
+        if they were cached after the match's last_updated (last_updated_360 for the 360 data) timestamp in the
+        matches data (used by competition_data, iter_competition_data and sync), with cache_payload or the
+        'duckdb' cache_backend.
+    stale_while_revalidate : bool, default False
+        If True, expired responses are returned straight away and revalidated in the background,
+        so reads never wait for a refresh. Implies revalidate.
     requests_max_workers : default None
         The number of threads to use for requests. The default uses the
         concurrent.futures.ThreadPoolExecutor default.
+    cache_payload : bool, default False
+        If True, the content of each response is also saved as its own JSON file in the cache directory.
+        The files are parsed directly with the typed read_json queries ('sql/original') rather than
+        decoding the requests-cache response twice, which is faster at the cost of extra disk space.
+        Saved files younger than expire_after are read without looking up the cached response.
+        The saved 360 files are also read one frame at a time, whereas each requests-cache file is read as one
+        JSON object (the maximum_object_size is set from the size of the largest file). Only used with the
+        'filesystem' cache_backend.
+    parquet_store : bool, default False
+        If True, the parsed match data is saved to Parquet files in a directory next to the cache
+        ('<cache_name>_parquet'), partitioned by kind, competition_id, season_id and match_id.
+        Later calls read the Parquet files and only parse the JSON again if the cached response has changed.
+    pipeline_chunk_size : int, default None
+        If set, the data for multiple matches is downloaded and parsed at the same time. The responses are
+        parsed into a staging table pipeline_chunk_size matches at a time (in match order) while the remaining
+        downloads continue in the background. The default downloads all the matches before parsing.
+    result_cache_bytes : int, default None
+        If set, the parsed data for each match and kind is kept in memory as a pyarrow.Table (requires pyarrow)
+        up to this many bytes, evicting the least recently used tables first. Tables parsed from a cached
+        response younger than expire_after are reused without a request, otherwise the url is requested and
+        the table is reused if the cached response hasn't changed. Not used for the 'relation' output_format.
+    process_workers : int, default None
+        If set, the data for multiple matches is parsed by this many worker processes, each with its own
+        duckdb connection. The files are split into shards in match order, each shard is parsed to a temporary
+        Parquet file, and the files are read back as one result. The workers are started with the 'spawn'
+        method, so scripts need an if __name__ == '__main__' guard. Not used for the 'relation' output_format,
+        with the parquet_store or with the 'duckdb' cache_backend.
+    worker_memory_limit : str, default None
+        The duckdb memory_limit of each worker process, e.g. '2GB'. The default uses the duckdb default.
+    max_retries : int, default 3
+        The number of times a request that fails with a connection error or a 429/5xx status is retried.
+        The retries wait a random time up to backoff_factor * 2 ** retry seconds, or the Retry-After header.
+    backoff_factor : float, default 0.5
+        The base backoff in seconds between retries.
+    rate_limit : float, default None
+        The maximum number of requests per second sent to the server (cached responses are not limited).
+        The default doesn't limit the rate.
+    thread_safe : bool, default False
+        If True, the parser can be used from several threads at once, e.g. in a web service. Each call runs its
+        queries on its own duckdb cursor and its requests use a pool of sessions that share the cache and the
+        connection pool, while the configuration, the SQL and the caches are shared.
+    stats_callback : callable, default None
+        A function called with a CallStats object after each call of competitions, matches, match_data,
+        competition_data, iter_competition_data and sync, e.g. to export the statistics to a metrics system.
+        The statistics of the last call are also kept in the last_stats attribute.
+    profile : bool, default False
+        If True, the duckdb profiling output (per-operator timings) of each query is added to the CallStats.
     sql_dir : str, default None
         Automatically set to change the SQL parsing depending on whether the data
-        has been cached by requests-cache ('sql/cache') or is in the original format ('sql/original')
+        has been cached by requests-cache ('sql/cache') or is in the original format ('sql/original'),
+        i.e. local files or cached payloads.
     session_kws : dict, default None
         Additional keywords are passed to requests_cache.CachedSession.
     connection_kws : dict, default None
         Additional keywords are passed to duckdb.connect.
     """
 
+    _parquet_sql = 'select * from read_parquet($filename, hive_partitioning = false)'
+    # kinds whose query selects one column per line from the JSON, so unused columns can be pruned
+    _prunable_kinds = ('events',)
+    # the share of the memory_limit for the JSON files parsed in one query, which use up to ten times their size
+    _json_budget_fraction = 0.1
+    # kinds with a type_name column that can be filtered with event_types
+    _event_type_kinds = ('events', 'related_events', 'tactics', 'events_360')
+
     def __init__(
         self,
         competitions_version,
@@ -55,12 +828,30 @@ class SbBase(ABC):
         threesixty_version,
         database=':default:',
         duckdb_threads=None,
+        match_index=False,
+        memory_limit=None,
+        temp_directory=None,
         output_format='pandas',
+        compact=None,
         cache_name='statsbomb_cache',
         cache_backend='filesystem',
         remove_expired_responses=True,
         expire_after=360,
+        revalidate=False,
+        stale_while_revalidate=False,
         requests_max_workers=None,
+        cache_payload=False,
+        parquet_store=False,
+        pipeline_chunk_size=None,
+        result_cache_bytes=None,
+        process_workers=None,
+        worker_memory_limit=None,
+        max_retries=3,
+        backoff_factor=0.5,
+        rate_limit=None,
+        thread_safe=False,
+        stats_callback=None,
+        profile=False,
         sql_dir=None,
         session_kws=None,
         connection_kws=None,
@@ -71,6 +862,12 @@ class SbBase(ABC):
         self.lineup_version = lineup_version
         self.threesixty_version = threesixty_version
         self.output_format = output_format
+        self.compact = compact
+        self.match_index = match_index
+        self._match_index_created = False
+        self.cache_backend = cache_backend
+        self.cache_payload = cache_payload
+        self.rate_limit = rate_limit
         self._validation_value_error()
         if session_kws is None:
             session_kws = {}
@@ -79,53 +876,124 @@ class SbBase(ABC):
         self.con = duckdb.connect(database=database, **connection_kws)
         if duckdb_threads is not None:
             self.con.execute(f'set threads to {duckdb_threads}')
-        self.session = CachedSession(
-            cache_name=cache_name,
-            backend=cache_backend,
-            expire_after=expire_after,
+        self.memory_limit = memory_limit
+        if memory_limit is not None:
+            self.con.execute(f'set memory_limit = {_quote_string(memory_limit)}')
+        if temp_directory is not None:
+            self.con.execute(f'set temp_directory = {_quote_string(temp_directory)}')
+        # the name of the table of responses if they are cached in duckdb rather than by requests-cache
+        self._responses = None
+        if cache_backend == 'duckdb':
+            self._responses = self._attach_responses(f'{cache_name}.duckdb')
+        # the session is created the first time it is used (see the session property)
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._session_kws = {
+            'cache_name': cache_name,
+            'backend': cache_backend,
+            'expire_after': expire_after,
             **session_kws,
-        )
+        }
+        if stale_while_revalidate:
+            self._session_kws.setdefault('stale_while_revalidate', stale_while_revalidate)
+        # keep a connection alive for every worker thread (the ThreadPoolExecutor default number of workers)
+        self._adapter_kws = {
+            'max_retries': max_retries,
+            'backoff_factor': backoff_factor,
+            'rate_limit': rate_limit,
+            'pool_maxsize': requests_max_workers or min(32, (os.cpu_count() or 1) + 4),
+        }
         self.requests_max_workers = requests_max_workers
-        if remove_expired_responses:
-            self.remove_expired_responses()
-        # To complete in Sbopen/Sbapi
-        self.url = None
-        self.sql = None
-        self.url_map = None
-        self.valid_match_data = None
-        self.url_ending = None
-        self.sql = {
-            'competitions': self._get_sql(
-                f'{sql_dir}/competitions/v{competitions_version}/competitions.sql'
-            ),
-            'matches': self._get_sql(f'{sql_dir}/matches/v{matches_version}/matches.sql'),
-            'match_ids': self._get_sql(f'{sql_dir}/matches/match_ids.sql'),
-            'season_ids': self._get_sql(f'{sql_dir}/competitions/season_ids.sql'),
-            'lineup_players': self._get_sql(
-                f'{sql_dir}/lineups/v{lineup_version}/lineup_players.sql'
-            ),
-            'events': self._get_sql(f'{sql_dir}/events/v{events_version}/events.sql'),
-            'frames': self._get_sql(f'{sql_dir}/events/v{events_version}/freeze_frames.sql'),
-            'tactics': self._get_sql(f'{sql_dir}/events/v{events_version}/tactics.sql'),
-            'related_events': self._get_sql(
-                f'{sql_dir}/events/v{events_version}/related_events.sql'
-            ),
-            'threesixty_frames': self._get_sql(
-                f'{sql_dir}/threesixty/v{threesixty_version}/freeze_frames.sql'
-            ),
-            'threesixty': self._get_sql(
-                f'{sql_dir}/threesixty/v{threesixty_version}/threesixty.sql'
-            ),
+        self.expire_after = expire_after
+        self.revalidate = revalidate or bool(stale_while_revalidate)
+        self.stale_while_revalidate = stale_while_revalidate
+        # the last_updated time of the data at each match url, from the matches data (see _record_last_updated)
+        self._last_updated = {}
+        # the background refreshes of expired responses if stale_while_revalidate is True
+        self._refresh_executor = None
+        self._refreshing = set()
+        # the background thread that removes the expired responses when the session is created
+        self._sweeper = None
+        self._stop_sweep = threading.Event()
+        self.parquet_dir = f'{cache_name}_parquet' if parquet_store else None
+        self.pipeline_chunk_size = pipeline_chunk_size
+        self._result_cache = None if result_cache_bytes is None else _ResultCache(result_cache_bytes)
+        self.process_workers = process_workers
+        self.worker_memory_limit = worker_memory_limit
+        # share the cores between the workers unless the number of duckdb threads is set
+        self._worker_threads = duckdb_threads or max((os.cpu_count() or 1) // (process_workers or 1), 1)
+        self._process_pool = None
+        self._remove_expired = remove_expired_responses
+        self.stats_callback = stats_callback
+        self.profile = profile
+        self.last_stats = None
+        self.thread_safe = thread_safe
+        # the statistics and duckdb cursor of the call running in each thread
+        self._local = threading.local()
+        self._idle_sessions = []
+        # url, url_ending and url_map are set in Sbopen/Sbapi before calling SbBase.__init__
+        self.valid_match_data = [
+            'lineup_players',
+            'events',
+            'frames',
+            'tactics',
+            'related_events',
+            'threesixty_frames',
+            'threesixty',
+            'events_360',
+            'possessions',
+        ]
+        # the SQL files are read the first time each query is used
+        self.sql = _LazySql(
+            self._get_sql,
+            {
+                'competitions': f'{sql_dir}/competitions/v{competitions_version}/competitions.sql',
+                'matches': f'{sql_dir}/matches/v{matches_version}/matches.sql',
+                'match_ids': f'{sql_dir}/matches/match_ids.sql',
+                'season_ids': f'{sql_dir}/competitions/season_ids.sql',
+                'match_index': f'{sql_dir}/matches/match_index.sql',
+                'lineup_players': f'{sql_dir}/lineups/v{lineup_version}/lineup_players.sql',
+                'events': f'{sql_dir}/events/v{events_version}/events.sql',
+                'frames': f'{sql_dir}/events/v{events_version}/freeze_frames.sql',
+                'tactics': f'{sql_dir}/events/v{events_version}/tactics.sql',
+                'related_events': f'{sql_dir}/events/v{events_version}/related_events.sql',
+                'threesixty_frames': f'{sql_dir}/threesixty/v{threesixty_version}/freeze_frames.sql',
+                'threesixty': f'{sql_dir}/threesixty/v{threesixty_version}/threesixty.sql',
+                'events_staging': f'{sql_dir}/events/v{events_version}/staging.sql',
+                'threesixty_staging': f'{sql_dir}/threesixty/v{threesixty_version}/staging.sql',
+                # the templates of the combined and aggregated kinds don't read any files themselves,
+                # so the same template is filled with the queries for either format
+                'events_360': 'sql/events/events_360.sql',
+                'possessions': 'sql/events/possessions.sql',
+            },
+            {'events_360': self._events_360_sql, 'possessions': self._possessions_sql},
+        )
+        # kinds parsed from the same file share a staging query, which decodes
+        # the union of their schemas once when several of the kinds are requested together
+        self.staging_map = {
+            'events': 'events_staging',
+            'frames': 'events_staging',
+            'tactics': 'events_staging',
+            'related_events': 'events_staging',
+            'possessions': 'events_staging',
+            'threesixty_frames': 'threesixty_staging',
+            'threesixty': 'threesixty_staging',
         }
+        # kinds joined from the files of several kinds in one query, with the kinds of files they read
+        # (the first kind's files are the $filename parameter and the others' $<kind>_filename, see _parameters)
+        self.combined_map = {'events_360': ['events', 'threesixty']}
+        if 'events' in self.url_map:
+            self.url_map['events_360'] = self.url_map['events']
+            self.url_map['possessions'] = self.url_map['events']
 
         if lineup_version >= 4:
-            self.sql['lineup_events'] = self._get_sql(
+            self.sql.paths['lineup_events'] = (
                 f'{sql_dir}/lineups/v{lineup_version}/lineup_events.sql'
             )
-            self.sql['lineup_formations'] = self._get_sql(
+            self.sql.paths['lineup_formations'] = (
                 f'{sql_dir}/lineups/v{lineup_version}/lineup_formations.sql'
             )
-            self.sql['lineup_positions'] = self._get_sql(
+            self.sql.paths['lineup_positions'] = (
                 f'{sql_dir}/lineups/v{lineup_version}/lineup_positions.sql'
             )
             self.url_map['lineup_events'] = f'{self.url}/v{lineup_version}/lineups'
@@ -136,10 +1004,10 @@ class SbBase(ABC):
             )
 
         if threesixty_version >= 2:
-            self.sql['threesixty_visible_count'] = self._get_sql(
+            self.sql.paths['threesixty_visible_count'] = (
                 f'{sql_dir}/threesixty/v{threesixty_version}/visible_count.sql'
             )
-            self.sql['threesixty_visible_distance'] = self._get_sql(
+            self.sql.paths['threesixty_visible_distance'] = (
                 f'{sql_dir}/threesixty/v{threesixty_version}/visible_distance.sql'
             )
             self.url_map['threesixty_visible_count'] = (
@@ -148,19 +1016,96 @@ class SbBase(ABC):
             self.url_map['threesixty_visible_distance'] = (
                 f'{self.url}/v{threesixty_version}/360-frames'
             )
+            self.staging_map['threesixty_visible_count'] = 'threesixty_staging'
+            self.staging_map['threesixty_visible_distance'] = 'threesixty_staging'
             self.valid_match_data.extend(
                 ['threesixty_visible_count', 'threesixty_visible_distance']
             )
 
-        self.valid_match_data = [
-            'lineup_players',
-            'events',
-            'frames',
-            'tactics',
-            'related_events',
-            'threesixty_frames',
-            'threesixty',
-        ]
+    @property
+    def session(self):
+        """The requests_cache.CachedSession, which is created the first time it is used.
+
+        Expired responses are removed from the cache in a background thread when the session is created
+        if remove_expired_responses is True, revalidate is False and the cache hasn't been cleaned in the last
+        expire_after seconds.
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    if self._responses is not None:
+                        # the responses are cached in duckdb, so the session only sends the requests
+                        import requests
+
+                        session = requests.Session()
+                    else:
+                        # requests_cache is imported here so importing duckstatsbomb stays fast
+                        from requests_cache import CachedSession
+
+                        session = CachedSession(**self._session_kws)
+                    adapter = _ThrottledAdapter(**self._adapter_kws)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    # session_auth is set in Sbapi before calling SbBase.__init__
+                    session.auth = getattr(self, 'session_auth', None)
+                    # expired responses are kept to be revalidated if revalidate is True
+                    if self._remove_expired and not self.revalidate:
+                        # the cache is scanned in the background, so the first request doesn't wait for it
+                        self._sweeper = threading.Thread(
+                            target=self._remove_expired_responses, args=(session, True), daemon=True
+                        )
+                        self._sweeper.start()
+                    self._session = session
+        return self._session
+
+    @property
+    def process_pool(self):
+        """The concurrent.futures.ProcessPoolExecutor used if process_workers is set,
+        which is created the first time it is used and kept until the connection is closed.
+        """
+        if self._process_pool is None:
+            with self._session_lock:
+                if self._process_pool is None:
+                    # spawn rather than fork, as forking a process with running duckdb threads isn't safe
+                    self._process_pool = ProcessPoolExecutor(
+                        max_workers=self.process_workers, mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._process_pool
+
+    @contextlib.contextmanager
+    def _pooled_session(self):
+        """Check out a session for a request.
+
+        If thread_safe is True, each thread uses its own CachedSession from a pool. The sessions in the pool
+        share the cache backend and the transport adapter (its connection pool and rate limiter) of self.session.
+        Otherwise, self.session is used.
+        """
+        if not self.thread_safe:
+            yield self.session
+            return
+        with self._session_lock:
+            session = self._idle_sessions.pop() if self._idle_sessions else None
+        if session is None:
+            shared = self.session
+            if self._responses is not None:
+                import requests
+
+                session = requests.Session()
+            else:
+                from requests_cache import CachedSession
+
+                # only the backend instance is passed, as requests-cache warns that cache_name and the other
+                # backend arguments can't be applied to it, and the settings (expire_after, etc.) are shared
+                session = CachedSession(backend=shared.cache)
+                session.settings = shared.settings
+            for prefix in ('https://', 'http://'):
+                session.mount(prefix, shared.get_adapter(prefix))
+            session.auth = shared.auth
+        try:
+            yield session
+        finally:
+            with self._session_lock:
+                self._idle_sessions.append(session)
 
     def _get_sql(self, sql_path):
         """Return a SQL file in the package contents as a string.
@@ -169,7 +1114,107 @@ class SbBase(ABC):
         ----------
         sql_path : path to the SQL file in the duckstatsbomb package.
         """
-        return pkgutil.get_data(__package__, sql_path).decode('utf-8')
+        sql = pkgutil.get_data(__package__, sql_path).decode('utf-8')
+        if self._responses is not None:
+            # select the responses from the responses table rather than reading the requests-cache files
+            sql = _CACHED_RESPONSES.sub(
+                '(select responses.url, responses.content as _decoded_content '
+                'from (select unnest($filename) as url, generate_subscripts($filename, 1) as file_index) as files '
+                f'join {self._responses} as responses on responses.url = files.url order by files.file_index)',
+                sql,
+            )
+        return sql
+
+    def _events_360_sql(self):
+        """Build the events_360 query, which joins the events to the visible area and freeze frame of each event.
+
+        The template in 'sql/events/events_360.sql' is filled with the events, threesixty and threesixty_frames
+        queries. The 360 files are decoded once by the 360 staging query, which reads them from the
+        $threesixty_filename parameter, and the events files are read from $filename.
+
+        Returns
+        -------
+        sql : str
+        """
+        sql = self._get_sql(self.sql.paths['events_360'])
+        staging = self.sql['threesixty_staging'].replace('$filename', '$threesixty_filename')
+        sql = _replace_cte(sql, 'threesixty_json', staging.rstrip().rstrip(';'))
+        for name, kind in (('threesixty_rows', 'threesixty'), ('freeze_frame_rows', 'threesixty_frames')):
+            body = _replace_cte(self.sql[kind], 'raw_json', 'select * from threesixty_json')
+            sql = _replace_cte(sql, name, body.rstrip().rstrip(';'))
+        return _replace_cte(sql, 'event_rows', self.sql['events'].rstrip().rstrip(';'))
+
+    def _possessions_sql(self):
+        """Build the possessions query, which aggregates the events of each possession in one pass.
+
+        The template in 'sql/events/possessions.sql' is filled with the events query for the data version,
+        pruned to the columns it uses so the rest of the JSON isn't decoded.
+
+        Returns
+        -------
+        sql : str
+        """
+        sql = self._get_sql(self.sql.paths['possessions'])
+        columns = [
+            'match_id',
+            'index',
+            'period',
+            'timestamp',
+            'duration',
+            'minute',
+            'second',
+            'type_name',
+            'possession',
+            'possession_team_id',
+            'possession_team_name',
+            'play_pattern_id',
+            'play_pattern_name',
+            'x',
+            'end_x',
+            'shot_statsbomb_xg',
+        ]
+        events = _prune_select(self.sql['events'], columns)
+        return _replace_cte(sql, 'event_rows', events.rstrip().rstrip(';'))
+
+    def _attach_responses(self, path):
+        """Attach the duckdb database used to cache the responses with the 'duckdb' cache_backend,
+        and create the responses table if it doesn't exist.
+
+        Parameters
+        ----------
+        path : str
+            The path to the database file.
+
+        Returns
+        -------
+        table : str
+            The name of the responses table.
+        """
+        path = os.path.abspath(path)
+        # the database may already be attached, e.g. by another parser using the default connection
+        attached = dict(self.con.execute('select path, database_name from duckdb_databases()').fetchall())
+        name = attached.get(path)
+        if name is None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            name = 'statsbomb_responses'
+            while name in attached.values():
+                name = f'{name}_'
+            escaped = path.replace("'", "''")
+            try:
+                # the large strings of the content are compressed with zstd from the v1.2.0 storage format
+                self.con.execute(f"attach '{escaped}' as {name} (storage_version 'v1.2.0')")
+            except (duckdb.BinderException, duckdb.InvalidInputException):
+                # older duckdb versions can't write the v1.2.0 storage format
+                self.con.execute(f"attach '{escaped}' as {name}")
+        self.con.execute(
+            f'create table if not exists {name}.responses ('
+            'url varchar primary key, content varchar, created timestamp, expires timestamp, '
+            'etag varchar, last_modified varchar)'
+        )
+        # the lookups and inserts from the request threads share a cursor
+        self._responses_con = self.con.cursor()
+        self._responses_lock = threading.Lock()
+        return f'{name}.responses'
 
     def _validation_value_error(self):
         """Validates the data version numbers and the output format"""
@@ -193,9 +1238,156 @@ class SbBase(ABC):
             raise ValueError(
                 f"Invalid argument: currently supported threesixty_version are: [1, 2]"
             )
-        if self.output_format != 'pandas':
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Invalid argument: currently supported output_formats are: {OUTPUT_FORMATS}"
+            )
+        if self.compact is not None and self.compact not in COMPACT_FORMATS:
             raise ValueError(
-                f"Invalid argument: currently supported output_formats are: 'pandas'"
+                f"Invalid argument: currently supported compact formats are: {COMPACT_FORMATS}"
+            )
+        if self.compact is not None and self.output_format == 'relation':
+            raise ValueError("Invalid argument: compact can't be used with the 'relation' output_format")
+        if self.cache_payload and self.cache_backend != 'filesystem':
+            raise ValueError("Invalid argument: cache_payload can only be used with the 'filesystem' cache_backend")
+        if self.rate_limit is not None and not self.rate_limit > 0:
+            raise ValueError('Invalid argument: rate_limit should be a number of requests per second above 0')
+
+    @property
+    def _stats(self):
+        """The CallStats of the call running in this thread, or None outside of a call."""
+        return getattr(self._local, 'stats', None)
+
+    @_stats.setter
+    def _stats(self, stats):
+        self._local.stats = stats
+
+    @property
+    def _con(self):
+        """The duckdb connection used by the call running in this thread.
+        If thread_safe is True, each call uses its own cursor of self.con.
+        """
+        con = getattr(self._local, 'con', None)
+        return self.con if con is None else con
+
+    def _bind(self, function):
+        """Return the function wrapped to run with the statistics and cursor of the current call,
+        e.g. in the threads of a ThreadPoolExecutor.
+        """
+        stats, con = self._stats, getattr(self._local, 'con', None)
+
+        def bound(*args):
+            self._local.stats, self._local.con = stats, con
+            try:
+                return function(*args)
+            finally:
+                self._local.stats = self._local.con = None
+
+        return bound
+
+    @contextlib.contextmanager
+    def _recording(self, stats, con=None):
+        """Record the statistics of the code in the with block in stats, and run its queries on con if given."""
+        previous = self._stats, getattr(self._local, 'con', None)
+        self._stats = stats
+        if con is not None:
+            self._local.con = con
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.add(total_seconds=time.perf_counter() - start)
+            self._stats, self._local.con = previous
+
+    def _call_cursor(self):
+        """Return a new cursor for a call if thread_safe is True, otherwise None (the call uses self.con)."""
+        return self.con.cursor() if self.thread_safe else None
+
+    def _close_cursor(self, cursor):
+        """Close the cursor of a call. Cursors are left open for the 'relation' output_format,
+        as the lazy relations use them (they are closed when garbage collected).
+        """
+        if cursor is not None and self.output_format != 'relation':
+            cursor.close()
+
+    def _finish_stats(self, stats):
+        """Keep the statistics of a finished call and pass them to the stats_callback."""
+        self.last_stats = stats
+        if self.stats_callback is not None:
+            self.stats_callback(stats)
+
+    def _record_files(self, filenames):
+        """Add the size of the files (or glob patterns) that are parsed to the statistics."""
+        if self._stats is None:
+            return
+        filenames = [filenames] if isinstance(filenames, str) else filenames
+        size = 0
+        for pattern in filenames:
+            for path in glob.glob(pattern):
+                try:
+                    size += os.path.getsize(path)
+                except OSError:
+                    pass
+        self._stats.add(bytes_read=size)
+
+    def _profile_path(self, con):
+        """Return the file that duckdb writes the profiling output to for a connection or cursor."""
+        return os.path.join(tempfile.gettempdir(), f'duckstatsbomb_profile_{os.getpid()}_{id(con)}.json')
+
+    def _execute(self, kind, sql, parameters=None, con=None):
+        """Execute a query, recording the time spent in the statistics of the current call.
+
+        If profile is True, duckdb profiling is enabled for the query. The profiling output is
+        written by duckdb once the result has been fetched, after which _add_profile should be called.
+
+        Parameters
+        ----------
+        kind : str
+            The kind of data (or staging query) the query is for.
+        sql : str
+        parameters : dict, default None
+            Parameters for the prepared statement.
+        con : duckdb.DuckDBPyConnection, default None
+            The connection or cursor to use. The default is self._con.
+
+        Returns
+        -------
+        duckdb.DuckDBPyConnection
+        """
+        con = self._con if con is None else con
+        if self.profile and self._stats is not None:
+            con.execute("pragma enable_profiling = 'json'")
+            con.execute(f"pragma profiling_output = '{self._profile_path(con)}'")
+        start = time.perf_counter()
+        result = con.execute(sql, _object_size_parameters(sql, parameters))
+        if self._stats is not None:
+            self._stats.add(query_seconds=time.perf_counter() - start)
+        return result
+
+    def _add_profile(self, kind, con=None):
+        """Add the duckdb profiling output of the last query executed with _execute to the statistics.
+
+        Parameters
+        ----------
+        kind : str
+        con : duckdb.DuckDBPyConnection, default None
+            The connection or cursor the query was executed with. The default is self._con.
+        """
+        if not self.profile or self._stats is None:
+            return
+        con = self._con if con is None else con
+        path = self._profile_path(con)
+        try:
+            with open(path) as f:
+                profile = json.load(f)
+        except (OSError, ValueError):
+            return
+        finally:
+            con.execute('pragma disable_profiling')
+        os.remove(path)
+        with self._stats._lock:
+            self._stats.profiles.append(
+                {'query': kind, 'sql_file': self.sql.paths.get(kind), 'profile': profile}
             )
 
     def _request(self, url):
@@ -209,9 +1401,222 @@ class SbBase(ABC):
         -------
         path : str
         """
-        resp = self.session.get(url)
+        size = None
+        revalidated = False
+        if self._responses is not None:
+            path, from_cache, revalidated, size = self._request_stored(url)
+        elif self.cache_payload and self._payload_is_fresh(url):
+            path = self._payload_path(url)
+            from_cache = True
+        else:
+            with self._pooled_session() as session:
+                resp = session.get(url)
+            resp.raise_for_status()
+            path = self._cache_path(url, resp)
+            from_cache = getattr(resp, 'from_cache', False)
+            revalidated = getattr(resp, 'revalidated', False)
+        if self._stats is not None:
+            self._stats.add(
+                urls=1,
+                cache_hits=int(from_cache),
+                cache_misses=int(not from_cache),
+                revalidated=int(revalidated),
+                bytes_read=os.path.getsize(path) if size is None else size,
+            )
+        return path
+
+    def _request_stored(self, url):
+        """Request a url with the 'duckdb' cache_backend. The response is only requested and stored
+        in the responses table if there isn't a stored response that hasn't expired.
+
+        An expired response is revalidated with a conditional request using its ETag and Last-Modified headers,
+        and kept (with a new expiry time) if the server responds 304 Not Modified. If revalidate is True,
+        it is also kept without a request if it was stored after the match data was last updated.
+        If stale_while_revalidate is True, it is returned straight away and revalidated in the background.
+
+        Parameters
+        ----------
+        url : str
+
+        Returns
+        -------
+        url : str
+            The url, which selects the response from the responses table in place of a file path.
+        from_cache : bool
+        revalidated : bool
+        size : int
+            The size of the content in bytes.
+        """
+        with self._responses_lock:
+            row = self._responses_con.execute(
+                f'select strlen(content), expires, created, etag, last_modified from {self._responses} '
+                'where url = ?',
+                [url],
+            ).fetchone()
+        if row is None:
+            from_cache, size = self._download_stored(url)
+            return url, from_cache, False, size
+        size, expires, created, etag, last_modified = row
+        if expires is None or expires > _utcnow() or self._unchanged_since(url, created):
+            return url, True, False, size
+        if self.stale_while_revalidate:
+            self._refresh_later(url, functools.partial(self._download_stored, url, etag, last_modified))
+            return url, True, False, size
+        from_cache, size = self._download_stored(url, etag, last_modified)
+        return url, from_cache, from_cache, size
+
+    def _download_stored(self, url, etag=None, last_modified=None):
+        """Request a url and store the response in the responses table ('duckdb' cache_backend).
+
+        Parameters
+        ----------
+        url : str
+        etag, last_modified : str, default None
+            The ETag and Last-Modified headers of the stored response, which are sent as a conditional request.
+            If the server responds 304 Not Modified, only the expiry time of the stored response is updated.
+
+        Returns
+        -------
+        not_modified : bool
+        size : int
+            The size of the content in bytes.
+        """
+        headers = {}
+        if etag is not None:
+            headers['If-None-Match'] = etag
+        if last_modified is not None:
+            headers['If-Modified-Since'] = last_modified
+        with self._pooled_session() as session:
+            resp = session.get(url, headers=headers)
+        now = _utcnow()
+        if resp.status_code == 304 and headers:
+            with self._responses_lock:
+                self._responses_con.execute(
+                    f'update {self._responses} set expires = ? where url = ?', [self._expires(now), url]
+                )
+                (size,) = self._responses_con.execute(
+                    f'select strlen(content) from {self._responses} where url = ?', [url]
+                ).fetchone()
+            return True, size
         resp.raise_for_status()
-        return str(self.session.cache.cache_dir / f'{resp.cache_key}.json')
+        with self._responses_lock:
+            self._responses_con.execute(
+                f'insert or replace into {self._responses} values (?, ?, ?, ?, ?, ?)',
+                [
+                    url,
+                    resp.content.decode('utf-8'),
+                    now,
+                    self._expires(now),
+                    resp.headers.get('ETag'),
+                    resp.headers.get('Last-Modified'),
+                ],
+            )
+        return False, len(resp.content)
+
+    def _refresh_later(self, url, refresh):
+        """Call refresh() in a background thread to update the expired response for a url,
+        unless the url is already being refreshed. If it fails, the url is refreshed on a later request.
+
+        Parameters
+        ----------
+        url : str
+        refresh : callable
+        """
+        with self._session_lock:
+            if url in self._refreshing:
+                return
+            self._refreshing.add(url)
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(max_workers=self.requests_max_workers)
+
+        def run():
+            try:
+                refresh()
+            finally:
+                with self._session_lock:
+                    self._refreshing.discard(url)
+
+        self._refresh_executor.submit(run)
+
+    def _record_last_updated(self, matches):
+        """Keep the last_updated time of the data at each match url if revalidate is True (see _unchanged_since).
+
+        Parameters
+        ----------
+        matches : list of tuple
+            The (match_id, competition_id, season_id, last_updated, last_updated_360) of each match.
+        """
+        if not self.revalidate:
+            return
+        for row in matches:
+            for kind, url_slug in self.url_map.items():
+                value = row[4] if kind.startswith('threesixty') else row[3]
+                try:
+                    last_updated = datetime.fromisoformat(value)
+                except (TypeError, ValueError):
+                    continue
+                if last_updated.tzinfo is not None:
+                    last_updated = last_updated.astimezone(timezone.utc).replace(tzinfo=None)
+                self._last_updated[self._urls(row[0], url_slug)] = last_updated
+
+    def _unchanged_since(self, url, cached):
+        """Whether a response cached at a time was cached after the match data at the url was last updated,
+        according to the last_updated timestamps in the matches data.
+
+        Parameters
+        ----------
+        url : str
+        cached : datetime.datetime
+            The naive UTC time the response was cached.
+
+        Returns
+        -------
+        bool
+        """
+        last_updated = self._last_updated.get(url)
+        return last_updated is not None and cached >= last_updated
+
+    def _expires(self, created):
+        """Return the time a response stored at created expires, or None if it never expires.
+
+        Parameters
+        ----------
+        created : datetime.datetime
+            The naive UTC time the response was stored.
+
+        Returns
+        -------
+        datetime.datetime or None
+        """
+        if isinstance(self.expire_after, datetime):
+            if self.expire_after.tzinfo is None:
+                return self.expire_after
+            return self.expire_after.astimezone(timezone.utc).replace(tzinfo=None)
+        expire_after = self._expire_seconds()
+        if expire_after is None or expire_after < 0:
+            return None
+        return created + timedelta(seconds=expire_after)
+
+    def _signature(self, path):
+        """Return the signature of a cached response: the (path, size, content digest, time stored in ns)
+        of the file (see _file_signature), or of the url with the 'duckdb' cache_backend.
+        The first three only change if the content changes.
+
+        Parameters
+        ----------
+        path : str
+
+        Returns
+        -------
+        tuple
+        """
+        if self._responses is None:
+            return _file_signature(path)
+        with self._responses_lock:
+            size, digest, created = self._responses_con.execute(
+                f'select strlen(content), md5(content), created from {self._responses} where url = ?', [path]
+            ).fetchone()
+        return path, size, digest, round(created.replace(tzinfo=timezone.utc).timestamp() * 1e6) * 1000
 
     def _request_threaded(self, urls):
         """Request and cache multiple urls in parallel using requests-cache and
@@ -224,16 +1629,110 @@ class SbBase(ABC):
         Returns
         -------
         paths : list of str
+            The file paths in the same order as the urls.
         """
         with ThreadPoolExecutor(max_workers=self.requests_max_workers) as executor:
-            future_list = [executor.submit(self.session.get, url) for url in urls]
-            filepaths = []
-            for future in as_completed(future_list):
-                resp = future.result()
-                resp.raise_for_status()
-                filepath = str(self.session.cache.cache_dir / f'{resp.cache_key}.json')
-                filepaths.append(filepath)
-            return filepaths
+            return list(executor.map(self._bind(self._request), urls))
+
+    def _cache_path(self, url, resp):
+        """Return the file path of a cached response.
+
+        If cache_payload is True, the response content is saved to its own file (if it isn't already saved
+        or the cached response is newer) and the path to the content file is returned instead.
+
+        Parameters
+        ----------
+        url : str
+        resp : requests_cache.CachedResponse or requests.Response
+
+        Returns
+        -------
+        path : str
+        """
+        if not self.cache_payload:
+            return str(self.session.cache.cache_dir / f'{resp.cache_key}.json')
+        path = self._payload_path(url)
+        try:
+            saved = os.path.getmtime(path)
+        except OSError:
+            saved = None
+        created = getattr(resp, 'created_at', None)
+        if created is not None:
+            # the cached response may have been refreshed in the background (stale_while_revalidate)
+            created = created.replace(tzinfo=created.tzinfo or timezone.utc).timestamp()
+        if not getattr(resp, 'from_cache', False) or saved is None or (created is not None and created > saved):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # write to a temporary file first so a partially written file is never read
+            tmp_path = f'{path}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(resp.content)
+            os.replace(tmp_path, path)
+        elif getattr(resp, 'revalidated', False):
+            # the response hasn't changed, so the saved content is fresh for another expire_after seconds
+            os.utime(path)
+        return path
+
+    def _payload_path(self, url, session=None):
+        """Return the file path used to store the content of a response when cache_payload is True.
+        The path mirrors the url, e.g. '.../payload/<host>/<url path>/3788741.json', so the
+        match identifier can be read from the file name.
+
+        Parameters
+        ----------
+        url : str
+        session : requests_cache.CachedSession, default None
+            The session whose cache directory is used. The default is the session property.
+
+        Returns
+        -------
+        path : str
+        """
+        parsed = urlparse(url)
+        path = os.path.join(
+            (session or self.session).cache.cache_dir,
+            'payload',
+            parsed.netloc.replace(':', '_'),
+            *parsed.path.strip('/').split('/'),
+        )
+        if not path.endswith('.json'):
+            path = f'{path}.json'
+        return path
+
+    def _payload_is_fresh(self, url):
+        """Whether the saved content of a response is younger than expire_after (or was saved after the match
+        data was last updated), in which case the file can be read without looking up (and deserializing)
+        the cached response.
+
+        Parameters
+        ----------
+        url : str
+
+        Returns
+        -------
+        bool
+        """
+        try:
+            saved = os.path.getmtime(self._payload_path(url))
+        except OSError:
+            return False
+        if self._unchanged_since(url, datetime.fromtimestamp(saved, timezone.utc).replace(tzinfo=None)):
+            return True
+        expire_after = self._expire_seconds()
+        if expire_after is None:
+            return False
+        return expire_after < 0 or time.time() - saved < expire_after
+
+    def _expire_seconds(self):
+        """Return expire_after in seconds, -1 if responses never expire,
+        or None if the expiry can't be converted to seconds (e.g. a datetime).
+        """
+        if self.expire_after is None:
+            return -1
+        if isinstance(self.expire_after, timedelta):
+            return self.expire_after.total_seconds()
+        if isinstance(self.expire_after, (int, float)):
+            return self.expire_after
+        return None
 
     def _request_get(self, urls):
         """Request a list of urls with requests-cache.
@@ -249,9 +1748,14 @@ class SbBase(ABC):
         paths : list of str
             File paths of the cached responses.
         """
+        start = time.perf_counter()
         if isinstance(urls, str):
-            return [self._request(urls)]
-        return self._request_threaded(urls)
+            paths = [self._request(urls)]
+        else:
+            paths = self._request_threaded(urls)
+        if self._stats is not None:
+            self._stats.add(request_seconds=time.perf_counter() - start)
+        return paths
 
     def _urls(self, match_id, url_slug):
         """Creates a url string from a base url path and a match identifier.
@@ -274,12 +1778,886 @@ class SbBase(ABC):
     def _validate_kind(self, kind):
         """Validate that the kind of data e.g. 'events' is one of the valid StatsBomb data types.
 
+        Parameters
+        ----------
+        kind : str or list of str
+        """
+        kinds = [kind] if isinstance(kind, str) else kind
+        for k in kinds:
+            if k not in self.valid_match_data:
+                raise ValueError(f'kind should be one of {self.valid_match_data}')
+
+    def _file_kinds(self, kind):
+        """Return the kinds whose files are needed for one or more kinds of data,
+        which includes the kinds of files read by a combined kind (e.g. 'threesixty' for 'events_360').
+
+        Parameters
+        ----------
+        kind : str or list of str
+
+        Returns
+        -------
+        kinds : list of str
+        """
+        kinds = [kind] if isinstance(kind, str) else list(kind)
+        return list(dict.fromkeys(kinds + [k for kind in kinds for k in self.combined_map.get(kind, [])]))
+
+    def _parameters(self, kind, filenames):
+        """Return the query parameters for a kind of data: the files in $filename,
+        and the files of the other kinds read by a combined kind, e.g. $threesixty_filename for 'events_360'.
+
+        Parameters
+        ----------
+        kind : str
+        filenames : dict
+            The file paths for each kind.
+
+        Returns
+        -------
+        parameters : dict
+        """
+        parameters = {'filename': filenames[kind]}
+        for k in self.combined_map.get(kind, [])[1:]:
+            parameters[f'{k}_filename'] = filenames[k]
+        return parameters
+
+    def _match_filenames(self, match_id, kind):
+        """Request the data for the given match identifiers and return the file paths for each kind.
+        Kinds that share a url, e.g. 'events' and 'tactics', are only requested once.
+
+        Parameters
+        ----------
+        match_id : int or list of int
+        kind : str or list of str
+
+        Returns
+        -------
+        filenames : dict
+            The file paths for each kind, including the kinds of files read by combined kinds (see _file_kinds).
+        """
+        kinds = self._file_kinds(kind)
+        filenames = {}
+        for url_slug in dict.fromkeys(self.url_map[k] for k in kinds):
+            filenames[url_slug] = self._request_get(self._urls(match_id, url_slug))
+        return {k: filenames[self.url_map[k]] for k in kinds}
+
+    def _fetch(self, kind, sql, parameters=None):
+        """Execute a query and return the result in the output_format.
+
         Parameters
         ----------
         kind : str
+        sql : str
+        parameters : dict, default None
+            Parameters for the prepared statement.
+
+        Returns
+        -------
+        pandas.DataFrame, pyarrow.Table, polars.DataFrame, dict of numpy.ndarray or duckdb.DuckDBPyRelation
+            A dictionary of the 'facts', 'players', 'teams' and 'types' tables if compact is 'star'.
+        """
+        if self.output_format == 'relation':
+            return self._con.sql(sql, params=_object_size_parameters(sql, parameters))
+        result = self._execute(kind, sql, parameters)
+        start = time.perf_counter()
+        if self.compact == 'star':
+            tables = _star_schema(_arrow_table(result))
+            data = {name: self._from_arrow(_compact_table(table)) for name, table in tables.items()}
+        elif self.compact == 'categorical':
+            data = self._from_arrow(_compact_table(_arrow_table(result)))
+        elif self.output_format == 'arrow':
+            data = _arrow_table(result)
+        elif self.output_format == 'polars':
+            data = result.pl()
+        elif self.output_format == 'numpy':
+            data = result.fetchnumpy()
+        else:
+            data = result.df()
+        if self._stats is not None:
+            self._stats.add(materialize_seconds=time.perf_counter() - start)
+        self._add_profile(kind)
+        return data
+
+    def _from_arrow(self, table):
+        """Convert a pyarrow.Table or pyarrow.RecordBatch to the output_format.
+
+        Dictionary-encoded columns become pandas.Categorical (or polars.Categorical) columns,
+        and integer and boolean columns with nulls become pandas nullable columns so they aren't widened to objects.
         """
-        if kind not in self.valid_match_data:
-            raise ValueError(f'kind should be one of {self.valid_match_data}')
+        if self.output_format == 'arrow':
+            return table
+        if self.output_format == 'polars':
+            import polars
+
+            return polars.from_arrow(table)
+        if self.output_format == 'numpy':
+            return {
+                name: column.to_numpy(zero_copy_only=False)
+                for name, column in zip(table.schema.names, table.columns)
+            }
+        import pandas
+        import pyarrow
+
+        pandas_types = {
+            pyarrow.bool_(): pandas.BooleanDtype(),
+            pyarrow.int8(): pandas.Int8Dtype(),
+            pyarrow.int16(): pandas.Int16Dtype(),
+            pyarrow.int32(): pandas.Int32Dtype(),
+            pyarrow.int64(): pandas.Int64Dtype(),
+            pyarrow.uint8(): pandas.UInt8Dtype(),
+            pyarrow.uint16(): pandas.UInt16Dtype(),
+            pyarrow.uint32(): pandas.UInt32Dtype(),
+            pyarrow.uint64(): pandas.UInt64Dtype(),
+        }
+        return table.to_pandas(types_mapper=pandas_types.get)
+
+    def _fetch_batches(self, kind, sql, parameters=None, rows_per_batch=1000000):
+        """Execute a query on a new cursor and yield the result in chunks in the output_format.
+
+        Parameters
+        ----------
+        kind : str
+        sql : str
+        parameters : dict, default None
+            Parameters for the prepared statement.
+        rows_per_batch : int, default 1000000
+            The maximum number of rows in each chunk.
+
+        Yields
+        ------
+        pandas.DataFrame, pyarrow.RecordBatch, polars.DataFrame, dict of numpy.ndarray or duckdb.DuckDBPyRelation
+            A single lazy relation is yielded for the 'relation' output_format.
+        """
+        cursor = self.con.cursor()
+        try:
+            if self.output_format == 'relation':
+                yield cursor.sql(sql, params=_object_size_parameters(sql, parameters))
+                return
+            result = self._execute(kind, sql, parameters, con=cursor)
+            if self.compact is not None:
+                batches = iter(_arrow_reader(result, rows_per_batch))
+
+                def next_chunk():
+                    batch = next(batches, None)
+                    if batch is None:
+                        return None
+                    import pyarrow
+
+                    return self._from_arrow(_compact_table(pyarrow.Table.from_batches([batch])))
+
+            elif self.output_format == 'pandas':
+                # duckdb fetches pandas chunks in vectors of 2048 rows
+                vectors_per_chunk = max(rows_per_batch // 2048, 1)
+
+                def next_chunk():
+                    chunk = result.fetch_df_chunk(vectors_per_chunk)
+                    return chunk if len(chunk) > 0 else None
+
+            else:
+                batches = iter(_arrow_reader(result, rows_per_batch))
+
+                def next_chunk():
+                    batch = next(batches, None)
+                    return batch if batch is None else self._from_arrow(batch)
+
+            while True:
+                start = time.perf_counter()
+                chunk = next_chunk()
+                if self._stats is not None:
+                    self._stats.add(materialize_seconds=time.perf_counter() - start)
+                if chunk is None:
+                    break
+                yield chunk
+            self._add_profile(kind, cursor)
+        finally:
+            if self.output_format != 'relation':
+                cursor.close()
+
+    def _parse(self, kind, filenames, fetch=None, sql=None):
+        """Parse the files for one or more kinds of data.
+
+        If several kinds are parsed from the same file, e.g. 'events' and 'frames', the file is
+        decoded once into a temporary staging table and each kind is selected from it.
+
+        Parameters
+        ----------
+        kind : str or list of str
+        filenames : dict
+            The file paths for each kind.
+        fetch : callable, default None
+            A function fetch(kind, sql, parameters) that executes the query for a kind and
+            returns the result. The default returns the result in the output_format.
+        sql : str, default None
+            The query used if kind is a str. The default is the kind's query in self.sql.
+
+        Returns
+        -------
+        pandas.DataFrame or dict of pandas.DataFrame
+            A dictionary with the kinds as keys is returned if kind is a list.
+            The data type depends on the output_format.
+        """
+        # relations are lazy so there is nothing to share by staging the files
+        lazy = fetch is None and self.output_format == 'relation'
+        if fetch is None:
+            fetch = self._fetch
+        if isinstance(kind, str):
+            return fetch(kind, sql or self.sql[kind], self._parameters(kind, filenames))
+        groups = collections.defaultdict(list)
+        for k in dict.fromkeys(kind):
+            groups[self.staging_map.get(k, k)].append(k)
+        data = {}
+        for staging, kinds in groups.items():
+            if len(kinds) == 1 or lazy:
+                for k in kinds:
+                    data[k] = self._parse(k, filenames, fetch)
+                continue
+            table = f'_{staging}'
+            # a single file path or glob pattern (Sblocal) is a str rather than a list of paths
+            filename = list(
+                dict.fromkeys(
+                    f for k in kinds for f in ([filenames[k]] if isinstance(filenames[k], str) else filenames[k])
+                )
+            )
+            self._execute(
+                staging,
+                f'create or replace temp table {table} as {self.sql[staging]}',
+                {'filename': filename},
+            )
+            self._add_profile(staging)
+            try:
+                for k in kinds:
+                    sql = _replace_cte(self.sql[k], 'raw_json', f'select * from {table}')
+                    data[k] = fetch(k, sql)
+            finally:
+                self._con.execute(f'drop table if exists {table}')
+        return {k: data[k] for k in kind}
+
+    def _use_processes(self, filenames):
+        """Whether the files should be parsed by the worker processes.
+
+        Parameters
+        ----------
+        filenames : dict
+            The file paths for each kind.
+        """
+        files = next(iter(filenames.values()))
+        return (
+            self.process_workers is not None
+            and self._responses is None
+            and not any(k in self.combined_map for k in filenames)
+            and self.output_format != 'relation'
+            and not isinstance(files, str)
+            and len(files) > 1
+        )
+
+    def _parse_sharded(self, kind, filenames, sql=None):
+        """Parse the files for one or more kinds of data in the worker processes.
+
+        The files are split into shards in order, each worker parses a shard on its own duckdb
+        connection into a temporary Parquet file for each kind, and the Parquet files are read
+        in shard order to give the result.
+
+        Parameters
+        ----------
+        kind : str or list of str
+        filenames : dict
+            The file paths for each kind, in the same order (match order) for each kind.
+        sql : str, default None
+            The query used if kind is a str. The default is the kind's query in self.sql.
+
+        Returns
+        -------
+        pandas.DataFrame or dict of pandas.DataFrame
+        """
+        kinds = [kind] if isinstance(kind, str) else list(dict.fromkeys(kind))
+        n_files = len(filenames[kinds[0]])
+        # more shards than workers so a shard of large files doesn't hold up the rest
+        n_shards = min(n_files, self.process_workers * 2)
+        bounds = [round(i * n_files / n_shards) for i in range(n_shards + 1)]
+        groups = collections.defaultdict(list)
+        for k in kinds:
+            groups[self.staging_map.get(k, k)].append(k)
+        tmp_dir = tempfile.mkdtemp(prefix='duckstatsbomb_shards_')
+        try:
+            futures = []
+            for shard in range(n_shards):
+                files = {k: filenames[k][bounds[shard]:bounds[shard + 1]] for k in kinds}
+                statements = []
+                for staging, group in groups.items():
+                    if len(group) == 1:
+                        k = group[0]
+                        query = sql if isinstance(kind, str) and sql is not None else self.sql[k]
+                        statements.append((query, files[k], os.path.join(tmp_dir, f'{k}_{shard}.parquet')))
+                        continue
+                    # as in _parse, the shared files are decoded once into a staging table
+                    filename = list(dict.fromkeys(f for k in group for f in files[k]))
+                    statements.append(
+                        (f'create temp table _{staging} as {self.sql[staging]}', filename, None)
+                    )
+                    for k in group:
+                        query = _replace_cte(self.sql[k], 'raw_json', f'select * from _{staging}')
+                        statements.append((query, None, os.path.join(tmp_dir, f'{k}_{shard}.parquet')))
+                futures.append(
+                    self.process_pool.submit(
+                        _run_shard, statements, self.worker_memory_limit, self._worker_threads
+                    )
+                )
+            start = time.perf_counter()
+            for future in futures:
+                future.result()
+            if self._stats is not None:
+                self._stats.add(query_seconds=time.perf_counter() - start)
+            data = {
+                k: self._fetch(
+                    k,
+                    self._parquet_sql,
+                    {'filename': [os.path.join(tmp_dir, f'{k}_{shard}.parquet') for shard in range(n_shards)]},
+                )
+                for k in kinds
+            }
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        if isinstance(kind, str):
+            return data[kind]
+        return data
+
+    def _parse_matches(self, match_id, kind, partitions=None, columns=None, where=None, table=None):
+        """Request and parse the data for the given match identifiers.
+
+        Parameters
+        ----------
+        match_id : int or list of int
+        kind : str or list of str
+        partitions : dict, default None
+            The (competition_id, season_id) of each match identifier, used to partition the Parquet store.
+        columns : list of str, default None
+            The columns to return if kind is a str. The default returns all the columns.
+        where : str, default None
+            A SQL filter applied to the rows if kind is a str.
+        table : str, default None
+            If set, the data is written into this table of the duckdb database (see _parse_chunked).
+
+        Returns
+        -------
+        pandas.DataFrame or dict of pandas.DataFrame
+        """
+        if table is not None:
+            filenames = self._match_filenames(match_id, kind)
+            chunks = self._budget_chunks(filenames) or [slice(None)]
+            return self._parse_chunked(kind, filenames, chunks, self._pushdown(kind, columns, where), table)
+        # the combined kinds (e.g. 'events_360') depend on several files per match,
+        # so they aren't kept in the result cache or the Parquet store, which are keyed by file
+        combined = any(k in self.combined_map for k in ([kind] if isinstance(kind, str) else kind))
+        stored = self.parquet_dir is not None and not combined
+        if self._result_cache is not None and self.output_format != 'relation' and not combined:
+            return self._parse_cached(match_id, kind, partitions, columns, where)
+        if (
+            self.pipeline_chunk_size is not None
+            and not stored
+            and self.output_format != 'relation'
+            and isinstance(match_id, collections.abc.Iterable)
+        ):
+            return self._parse_pipelined(match_id, kind, self._pushdown(kind, columns, where))
+        filenames = self._match_filenames(match_id, kind)
+        if not stored and self._use_processes(filenames):
+            return self._parse_sharded(kind, filenames, self._pushdown(kind, columns, where))
+        if not stored:
+            # relations are lazy, so duckdb spills rather than holding the result
+            chunks = None if self.output_format == 'relation' else self._budget_chunks(filenames)
+            if chunks is not None:
+                return self._parse_chunked(kind, filenames, chunks, self._pushdown(kind, columns, where))
+            return self._parse(kind, filenames, sql=self._pushdown(kind, columns, where))
+        return self._parse_stored(
+            match_id,
+            kind,
+            filenames,
+            partitions or {},
+            self._pushdown(kind, columns, where, self._parquet_sql),
+        )
+
+    def _budget_chunks(self, filenames):
+        """Split the matches into chunks whose JSON files fit in the memory budget (a _json_budget_fraction
+        share of the memory_limit), so they can be parsed one chunk at a time.
+
+        Parameters
+        ----------
+        filenames : dict
+            The file paths for each kind, in match order.
+
+        Returns
+        -------
+        chunks : list of slice or None
+            None if memory_limit isn't set or all the files fit in the budget.
+        """
+        if self.memory_limit is None:
+            return None
+        budget = _size_bytes(self.memory_limit) * self._json_budget_fraction
+        # kinds parsed from the same file (e.g. 'events' and 'tactics') share a path
+        sizes = [sum(self._signature(path)[1] for path in set(paths)) for paths in zip(*filenames.values())]
+        if sum(sizes) <= budget:
+            return None
+        chunks = []
+        start = 0
+        total = 0
+        for i, size in enumerate(sizes):
+            if i > start and total + size > budget:
+                chunks.append(slice(start, i))
+                start = i
+                total = 0
+            total += size
+        chunks.append(slice(start, len(sizes)))
+        return chunks
+
+    def _parse_chunked(self, kind, filenames, chunks, sql=None, table=None):
+        """Parse the files a chunk of matches at a time into a table for each kind, so the JSON decoded by
+        each query stays within the memory budget and duckdb can spill the table to the temp_directory.
+
+        Parameters
+        ----------
+        kind : str or list of str
+        filenames : dict
+            The file paths for each kind, in match order.
+        chunks : list of slice
+            The matches in each chunk.
+        sql : str, default None
+            The query used if kind is a str. The default is the kind's query in self.sql.
+        table : str, default None
+            The table of the duckdb database to write the data into ('<table>_<kind>' for each kind if kind
+            is a list), which is replaced if it exists. The default uses temporary tables.
+
+        Returns
+        -------
+        pandas.DataFrame or dict of pandas.DataFrame
+            The temporary tables in the output_format, or duckdb relations of the tables if table is set.
+        """
+        kinds = [kind] if isinstance(kind, str) else list(dict.fromkeys(kind))
+        if table is None:
+            names = {k: f'_chunked_{k}' for k in kinds}
+        elif isinstance(kind, str):
+            names = {kind: _quote_identifier(table)}
+        else:
+            names = {k: _quote_identifier(f'{table}_{k}') for k in kinds}
+        created = set()
+
+        def insert(k, sql, parameters=None):
+            if k in created:
+                self._execute(k, f'insert into {names[k]} {sql}', parameters)
+            else:
+                temp = 'temp ' if table is None else ''
+                self._execute(k, f'create or replace {temp}table {names[k]} as {sql}', parameters)
+                created.add(k)
+            self._add_profile(k)
+
+        try:
+            for chunk in chunks:
+                self._parse(kind, {k: paths[chunk] for k, paths in filenames.items()}, fetch=insert, sql=sql)
+            if table is None:
+                data = {k: self._fetch(k, f'select * from {names[k]}') for k in kinds}
+            else:
+                data = {k: self.con.sql(f'select * from {names[k]}') for k in kinds}
+        finally:
+            if table is None:
+                for k in created:
+                    self._con.execute(f'drop table if exists {names[k]}')
+        if isinstance(kind, str):
+            return data[kind]
+        return data
+
+    def _parse_cached(self, match_id, kind, partitions=None, columns=None, where=None):
+        """Request and parse the data for the given match identifiers via the in-memory result cache.
+
+        The data for each kind is cached per match. Tables parsed from a cached response younger than
+        expire_after are used without requesting the url, otherwise the url is requested and the table is
+        used if the cached response hasn't changed. Only the remaining matches are parsed, and the result
+        is assembled from the tables in match order.
+
+        Parameters
+        ----------
+        match_id : int or list of int
+        kind : str or list of str
+        partitions : dict, default None
+            The (competition_id, season_id) of each match identifier, used to partition the Parquet store.
+        columns : list of str, default None
+            The columns to return if kind is a str. The default returns all the columns.
+        where : str, default None
+            A SQL filter applied to the rows if kind is a str.
+
+        Returns
+        -------
+        pandas.DataFrame or dict of pandas.DataFrame
+        """
+        import pyarrow
+        import pyarrow.compute
+
+        match_ids = list(match_id) if isinstance(match_id, collections.abc.Iterable) else [match_id]
+        kinds = [kind] if isinstance(kind, str) else list(dict.fromkeys(kind))
+        max_age = self._expire_seconds()
+        tables = {k: {} for k in kinds}
+        # the matches to request for each url, which is shared by kinds parsed from the same file
+        requests = collections.defaultdict(dict)
+        for k in kinds:
+            for matchid in match_ids:
+                table = self._result_cache.get((k, matchid, self.sql.paths[k]), max_age=max_age)
+                if table is None:
+                    requests[self.url_map[k]][matchid] = None
+                else:
+                    tables[k][matchid] = table
+        paths = {}
+        for url_slug, ids in requests.items():
+            ids = list(ids)
+            for matchid, path in zip(ids, self._request_get(self._urls(ids, url_slug))):
+                paths[url_slug, matchid] = path
+
+        # group the kinds with the same matches to parse so shared files are only parsed once
+        stale = collections.defaultdict(list)
+        signatures = {}
+        for k in kinds:
+            missing = []
+            for matchid in dict.fromkeys(match_ids):
+                if matchid in tables[k]:
+                    continue
+                path = paths[self.url_map[k], matchid]
+                if path not in signatures:
+                    signatures[path] = self._signature(path)
+                table = self._result_cache.get((k, matchid, self.sql.paths[k]), signatures[path])
+                if table is None:
+                    missing.append(matchid)
+                else:
+                    tables[k][matchid] = table
+            hits = len(dict.fromkeys(match_ids)) - len(missing)
+            self._result_cache.count(hits, len(missing))
+            if self._stats is not None:
+                self._stats.add(result_cache_hits=hits, result_cache_misses=len(missing))
+            if missing:
+                stale[tuple(missing)].append(k)
+
+        for missing, group in stale.items():
+            filenames = {k: [paths[self.url_map[k], matchid] for matchid in missing] for k in group}
+            parsed = self._parse_arrow(list(missing), group, filenames, partitions)
+            for k in group:
+                for matchid, filename in zip(missing, filenames[k]):
+                    table = parsed[k].filter(pyarrow.compute.equal(parsed[k]['match_id'], matchid))
+                    tables[k][matchid] = table
+                    self._result_cache.put((k, matchid, self.sql.paths[k]), signatures[filename], table)
+
+        data = {}
+        for k in kinds:
+            table = pyarrow.concat_tables([tables[k][matchid] for matchid in match_ids])
+            view = f'_result_cache_{k}'
+            self._con.register(view, table)
+            try:
+                data[k] = self._fetch(k, self._pushdown(k, columns, where, f'select * from {view}'))
+            finally:
+                self._con.unregister(view)
+        if isinstance(kind, str):
+            return data[kind]
+        return data
+
+    def _parse_arrow(self, match_ids, kinds, filenames, partitions=None):
+        """Parse the data for the given match identifiers into a pyarrow.Table for each kind,
+        via the Parquet store if it is used.
+
+        Parameters
+        ----------
+        match_ids : list of int
+        kinds : list of str
+        filenames : dict
+            The file paths of the cached responses for each kind, in the same order as match_ids.
+        partitions : dict, default None
+            The (competition_id, season_id) of each match identifier.
+
+        Returns
+        -------
+        dict of pyarrow.Table
+        """
+
+        def fetch(k, sql, parameters=None):
+            result = self._execute(k, sql, parameters)
+            start = time.perf_counter()
+            table = _arrow_table(result)
+            if self._stats is not None:
+                self._stats.add(materialize_seconds=time.perf_counter() - start)
+            self._add_profile(k)
+            return table
+
+        if self.parquet_dir is None:
+            return self._parse(kinds, filenames, fetch=fetch)
+        paths = self._store(match_ids, kinds, filenames, partitions or {})
+        return {k: fetch(k, self._parquet_sql, {'filename': paths[k]}) for k in kinds}
+
+    def _pushdown(self, kind, columns=None, where=None, sql=None):
+        """Return the query for a kind of data that only selects the given columns and rows.
+
+        For the kinds in _prunable_kinds, the columns that aren't needed for the selected columns
+        or the filter are removed from the query, and so are the keys they use from the JSON schema,
+        so the unused parts of the JSON are never decoded.
+
+        Parameters
+        ----------
+        kind : str or list of str
+        columns : list of str, default None
+            The columns to select. The default selects all the columns.
+        where : str, default None
+            A SQL filter for the rows.
+        sql : str, default None
+            The query to select from. The default is the kind's query in self.sql.
+
+        Returns
+        -------
+        sql : str or None
+            None if kind is a list.
+        """
+        if not isinstance(kind, str):
+            return None
+        if sql is None:
+            sql = self.sql[kind]
+            if columns is not None and kind in self._prunable_kinds:
+                needed = list(columns) + re.findall(r'\w+', where or '')
+                sql = _prune_select(sql, needed)
+        if columns is None and where is None:
+            return sql
+        select = '*' if columns is None else ', '.join(f'"{column}"' for column in columns)
+        sql = f'select {select} from ({sql.rstrip().rstrip(";")})'
+        if where is not None:
+            sql = f'{sql} where {where}'
+        return sql
+
+    def _where(self, kind, columns=None, where=None, event_types=None):
+        """Validate the column and row selection and combine the filter with the event types.
+
+        Parameters
+        ----------
+        kind : str or list of str
+        columns : list of str, default None
+        where : str, default None
+        event_types : str or list of str, default None
+
+        Returns
+        -------
+        where : str or None
+        """
+        if columns is None and where is None and event_types is None:
+            return None
+        if not isinstance(kind, str):
+            raise ValueError('columns, where and event_types can only be used with a single kind')
+        if event_types is None:
+            return where
+        if kind not in self._event_type_kinds:
+            raise ValueError(f'event_types can only be used with the kinds: {self._event_type_kinds}')
+        if isinstance(event_types, str):
+            event_types = [event_types]
+        types = ', '.join("'" + event_type.replace("'", "''") + "'" for event_type in event_types)
+        condition = f'type_name in ({types})'
+        if where is None:
+            return condition
+        return f'({where}) and {condition}'
+
+    def _parse_pipelined(self, match_id, kind, sql=None):
+        """Request and parse the data for the given match identifiers with the downloads and parsing overlapping.
+
+        All the urls are submitted to the ThreadPoolExecutor at once. As soon as the responses for the next
+        pipeline_chunk_size matches have arrived, they are parsed into a temporary staging table for each kind
+        while the remaining downloads continue. The staging tables are filled in match order.
+
+        Parameters
+        ----------
+        match_id : list of int
+        kind : str or list of str
+        sql : str, default None
+            The query used if kind is a str. The default is the kind's query in self.sql.
+
+        Returns
+        -------
+        pandas.DataFrame or dict of pandas.DataFrame
+        """
+        match_ids = list(match_id)
+        kinds = [kind] if isinstance(kind, str) else list(dict.fromkeys(kind))
+        file_kinds = self._file_kinds(kinds)
+        url_slugs = list(dict.fromkeys(self.url_map[k] for k in file_kinds))
+        staged = set()
+
+        def insert(k, sql, parameters=None):
+            if k in staged:
+                self._execute(k, f'insert into _pipeline_{k} {sql}', parameters)
+            else:
+                self._execute(k, f'create or replace temp table _pipeline_{k} as {sql}', parameters)
+                staged.add(k)
+            self._add_profile(k)
+
+        executor = ThreadPoolExecutor(max_workers=self.requests_max_workers)
+        request = self._bind(self._request)
+        futures = {}
+        try:
+            futures = {
+                url_slug: [executor.submit(request, url) for url in self._urls(match_ids, url_slug)]
+                for url_slug in url_slugs
+            }
+            for start in range(0, len(match_ids), self.pipeline_chunk_size):
+                chunk = slice(start, start + self.pipeline_chunk_size)
+                wait_start = time.perf_counter()
+                paths = {
+                    url_slug: [future.result() for future in futures[url_slug][chunk]]
+                    for url_slug in url_slugs
+                }
+                # only the time spent waiting for the downloads, as they overlap the parsing
+                if self._stats is not None:
+                    self._stats.add(request_seconds=time.perf_counter() - wait_start)
+                self._parse(kind, {k: paths[self.url_map[k]] for k in file_kinds}, fetch=insert, sql=sql)
+            data = {k: self._fetch(k, f'select * from _pipeline_{k}') for k in kinds}
+        finally:
+            # cancel the downloads that haven't started if the parsing failed
+            # (ThreadPoolExecutor.shutdown only has cancel_futures in python 3.9 or later)
+            for future in (future for url_futures in futures.values() for future in url_futures):
+                future.cancel()
+            executor.shutdown(wait=True)
+            for k in staged:
+                self._con.execute(f'drop table if exists _pipeline_{k}')
+        if isinstance(kind, str):
+            return data[kind]
+        return data
+
+    def _parquet_path(self, kind, match_id, filename, partition=None):
+        """Return the Parquet store path for a kind of data from one match.
+
+        The file name is a hash of the cached response's path and content (see _signature) and the SQL
+        used to parse it, so a changed response or data version gives a new path, but a response that is
+        stored again with the same content (e.g. after it expires or is revalidated) doesn't.
+
+        Parameters
+        ----------
+        kind : str
+        match_id : int
+        filename : str
+            The file path of the cached response.
+        partition : tuple of int, default None
+            The (competition_id, season_id) of the match. If None, an existing partition
+            for the match is used, otherwise the partition values are set to NULL.
+
+        Returns
+        -------
+        path : str
+        """
+        _, size, digest, _ = self._signature(filename)
+        key = f'{filename}|{size}|{digest}|{self.sql[kind]}'
+        name = f'{hashlib.md5(key.encode("utf-8")).hexdigest()}.parquet'
+        if partition is None:
+            existing = glob.glob(
+                os.path.join(
+                    glob.escape(os.path.join(self.parquet_dir, kind)),
+                    'competition_id=*',
+                    'season_id=*',
+                    f'match_id={match_id}',
+                )
+            )
+            if existing:
+                return os.path.join(existing[0], name)
+            partition = ('NULL', 'NULL')
+        return os.path.join(
+            self.parquet_dir,
+            kind,
+            f'competition_id={partition[0]}',
+            f'season_id={partition[1]}',
+            f'match_id={match_id}',
+            name,
+        )
+
+    def _parse_stored(self, match_id, kind, filenames, partitions, sql=None):
+        """Parse the data for the given match identifiers via the Parquet store.
+        Only the matches without an up-to-date Parquet file are parsed from JSON.
+
+        Parameters
+        ----------
+        match_id : int or list of int
+        kind : str or list of str
+        filenames : dict
+            The file paths of the cached responses for each kind, in the same order as match_id.
+        partitions : dict
+            The (competition_id, season_id) of each match identifier.
+        sql : str, default None
+            The query used to read the Parquet files if kind is a str. The default reads all the columns.
+
+        Returns
+        -------
+        pandas.DataFrame or dict of pandas.DataFrame
+        """
+        paths = self._store(match_id, kind, filenames, partitions)
+        data = {
+            k: self._fetch(k, sql or self._parquet_sql, {'filename': paths[k]}) for k in paths
+        }
+        if isinstance(kind, str):
+            return data[kind]
+        return data
+
+    def _store(self, match_id, kind, filenames, partitions):
+        """Write the Parquet files for the given match identifiers if they are missing or out of date.
+
+        Parameters
+        ----------
+        match_id : int or list of int
+        kind : str or list of str
+        filenames : dict
+            The file paths of the cached responses for each kind, in the same order as match_id.
+        partitions : dict
+            The (competition_id, season_id) of each match identifier.
+
+        Returns
+        -------
+        paths : dict
+            The Parquet file paths for each kind, in the same order as match_id.
+        """
+        match_ids = match_id if isinstance(match_id, collections.abc.Iterable) else [match_id]
+        kinds = [kind] if isinstance(kind, str) else list(dict.fromkeys(kind))
+        paths = {}
+        stale = {}
+        for k in kinds:
+            paths[k] = [
+                self._parquet_path(k, matchid, filename, partitions.get(matchid))
+                for matchid, filename in zip(match_ids, filenames[k])
+            ]
+            missing = [
+                (matchid, filename, path)
+                for matchid, filename, path in zip(match_ids, filenames[k], paths[k])
+                if not os.path.exists(path)
+            ]
+            if missing:
+                stale[k] = missing
+
+        def write(k, sql, parameters=None):
+            table = f'_store_{k}'
+            self._execute(k, f'create or replace temp table {table} as {sql}', parameters)
+            self._add_profile(k)
+            try:
+                for matchid, _, path in stale[k]:
+                    match_dir = os.path.dirname(path)
+                    # remove out of date files, including copies stored under another partition
+                    pattern = os.path.join(
+                        glob.escape(os.path.join(self.parquet_dir, k)),
+                        'competition_id=*',
+                        'season_id=*',
+                        f'match_id={matchid}',
+                    )
+                    for old_dir in glob.glob(pattern):
+                        if old_dir != match_dir:
+                            shutil.rmtree(old_dir, ignore_errors=True)
+                    os.makedirs(match_dir, exist_ok=True)
+                    for old_file in glob.glob(os.path.join(glob.escape(match_dir), '*.parquet')):
+                        os.remove(old_file)
+                    tmp_path = f'{path}.tmp'
+                    self._con.execute(
+                        f'copy (select * from {table} where match_id = {int(matchid)}) '
+                        f'to {_quote_string(tmp_path)} (format parquet)'
+                    )
+                    os.replace(tmp_path, path)
+            finally:
+                self._con.execute(f'drop table if exists {table}')
+
+        if stale:
+            self._parse(
+                list(stale),
+                {k: [filename for _, filename, _ in missing] for k, missing in stale.items()},
+                fetch=write,
+            )
+        return paths
 
     @abstractmethod
     def _match_url(self, competition_id, season_id):
@@ -302,13 +2680,17 @@ class SbBase(ABC):
         Returns
         -------
         matchids
-            A list of tuples. The tuples contain a single match identifier integer.
+            A list of tuples. The tuples contain the match, competition and season identifiers
+            and the last_updated and last_updated_360 strings.
         """
+        if self.match_index:
+            return self._indexed_matchids(competition_id, season_id)
         url = self._match_url(competition_id, season_id)
         filename = self._request_get(url)
-        return self.con.execute(
-            self.sql['match_ids'], {'filename': filename}
-        ).fetchall()
+        match_ids = self._execute('match_ids', self.sql['match_ids'], {'filename': filename}).fetchall()
+        self._add_profile('match_ids')
+        self._record_last_updated(match_ids)
+        return match_ids
 
     def _competition_matchids(self, competition_id):
         """Return a list of match identifiers for a given competition identifier.
@@ -321,26 +2703,256 @@ class SbBase(ABC):
         Returns
         -------
         matchids
-            A list of tuples. The tuples contain a single match identifier integer.
+            A list of tuples. The tuples contain the match, competition and season identifiers
+            and the last_updated and last_updated_360 strings.
         """
+        if self.match_index:
+            return self._indexed_matchids(competition_id)
         url = self._competition_url()
         filename = self._request_get(url)
-        seasonids = self.con.execute(
+        seasonids = self._execute(
+            'season_ids',
             self.sql['season_ids'],
             {'filename': filename, 'competition_id': competition_id},
         ).fetchall()
+        self._add_profile('season_ids')
         urls = [self._match_url(row[0], row[1]) for row in seasonids]
         filename = self._request_get(urls)
-        return self.con.execute(
-            self.sql['match_ids'], {'filename': filename}
+        match_ids = self._execute('match_ids', self.sql['match_ids'], {'filename': filename}).fetchall()
+        self._add_profile('match_ids')
+        self._record_last_updated(match_ids)
+        return match_ids
+
+    def _create_match_index(self):
+        """Create the match_index table, and the match_index_seasons table of the indexed seasons, if they don't exist."""
+        if self._match_index_created:
+            return
+        self._con.execute(
+            'create table if not exists match_index '
+            '(competition_id integer, season_id integer, match_id integer, match_date date, '
+            'home_team_id integer, home_team_name varchar, away_team_id integer, away_team_name varchar, '
+            'last_updated varchar, last_updated_360 varchar, has_360 boolean, match_order bigint)'
+        )
+        self._con.execute(
+            'create index if not exists match_index_season on match_index (competition_id, season_id)'
+        )
+        # the match_updated times of each season in the competitions data when the season was indexed
+        self._con.execute(
+            'create table if not exists match_index_seasons '
+            '(competition_id integer, season_id integer, match_updated varchar, match_updated_360 varchar, '
+            'season_order integer, indexed_at timestamp)'
+        )
+        self._match_index_created = True
+
+    def _indexed_matchids(self, competition_id, season_id=None):
+        """Return a list of match identifiers for a competition (and season) from the match_index table.
+        The competition is indexed first if the season (or none of its seasons) is in the table.
+
+        Parameters
+        ----------
+        competition_id : int
+        season_id : int, default None
+
+        Returns
+        -------
+        matchids
+            A list of tuples. The tuples contain the match, competition and season identifiers
+            and the last_updated and last_updated_360 strings.
+        """
+        self._create_match_index()
+        parameters = {'competition_id': competition_id}
+        condition = 'competition_id = $competition_id'
+        if season_id is not None:
+            parameters['season_id'] = season_id
+            condition = f'{condition} and season_id = $season_id'
+        indexed = self._con.execute(
+            f'select count(*) from match_index_seasons where {condition}', parameters
+        ).fetchone()[0]
+        if not indexed:
+            self._refresh_match_index(competition_id)
+        # the matches are in the order of the competitions and matches files, as if they were parsed
+        match_ids = self._execute(
+            'match_index',
+            'select match_id, competition_id, season_id, last_updated, last_updated_360 '
+            'from match_index join match_index_seasons using (competition_id, season_id) '
+            f'where {condition} order by season_order, match_order',
+            parameters,
         ).fetchall()
+        self._record_last_updated(match_ids)
+        return match_ids
+
+    def _refresh_match_index(self, competition_id):
+        """Index the seasons of a competition that are new or have a different match_updated
+        or match_updated_360 time in the competitions data, and remove the seasons that are no longer listed.
+
+        Parameters
+        ----------
+        competition_id : int
 
+        Returns
+        -------
+        int
+            The number of seasons that were indexed.
+        """
+        self._create_match_index()
+        filename = self._request_get(self._competition_url())
+        seasons = self._execute(
+            'season_ids',
+            self.sql['season_ids'],
+            {'filename': filename, 'competition_id': competition_id},
+        ).fetchall()
+        self._add_profile('season_ids')
+        indexed = {
+            (row[0], row[1]): (row[2], row[3])
+            for row in self._con.execute(
+                'select competition_id, season_id, match_updated, match_updated_360 '
+                'from match_index_seasons where competition_id = $competition_id',
+                {'competition_id': competition_id},
+            ).fetchall()
+        }
+        stale = [row for row in seasons if indexed.get((row[0], row[1])) != (row[2], row[3])]
+        removed = set(indexed) - {(row[0], row[1]) for row in seasons}
+        if not stale and not removed:
+            return 0
+        table = '_match_index'
+        if stale:
+            filename = self._request_get([self._match_url(row[0], row[1]) for row in stale])
+            sql = self.sql['match_index'].rstrip().rstrip(';')
+            self._execute(
+                'match_index',
+                f'create or replace temp table {table} as '
+                f'select *, row_number() over () as match_order from ({sql})',
+                {'filename': filename},
+            )
+            self._add_profile('match_index')
+        try:
+            self._con.begin()
+            try:
+                self._con.execute(
+                    'delete from match_index where competition_id = $competition_id '
+                    'and season_id in (select unnest($season_id))',
+                    {
+                        'competition_id': competition_id,
+                        'season_id': [row[1] for row in stale] + [key[1] for key in removed],
+                    },
+                )
+                if stale:
+                    self._con.execute(f'insert into match_index select * from {table}')
+                self._con.execute(
+                    'delete from match_index_seasons where competition_id = $competition_id',
+                    {'competition_id': competition_id},
+                )
+                self._con.executemany(
+                    'insert into match_index_seasons values (?, ?, ?, ?, ?, current_timestamp)',
+                    [[*row, order] for order, row in enumerate(seasons)],
+                )
+                self._con.commit()
+            except Exception:
+                self._con.rollback()
+                raise
+        finally:
+            self._con.execute(f'drop table if exists {table}')
+        return len(stale)
+
+    @_instrumented
+    def refresh_match_index(self, competition_id=None):
+        """Update the match_index table with the new and changed matches.
+
+        Only the seasons with a new match_updated or match_updated_360 time in the competitions data
+        have their matches files requested and parsed again.
+
+        Parameters
+        ----------
+        competition_id : int, default None
+            The competition to index. The default refreshes all the competitions in the index.
+
+        Returns
+        -------
+        int
+            The number of seasons that were indexed.
+
+        Examples
+        --------
+        >>> from duckstatsbomb import Sbopen
+        >>> parser = Sbopen(database='statsbomb.duckdb', match_index=True)
+        >>> parser.refresh_match_index(11)
+        """
+        self._create_match_index()
+        if competition_id is None:
+            competition_ids = [
+                row[0]
+                for row in self._con.execute(
+                    'select distinct competition_id from match_index_seasons order by competition_id'
+                ).fetchall()
+            ]
+        else:
+            competition_ids = [competition_id]
+        return sum(self._refresh_match_index(competition_id) for competition_id in competition_ids)
+
+    @_instrumented
+    def find_matches(self, competition_id=None, season_id=None, team=None, start_date=None, end_date=None):
+        """Find matches in the match_index table by competition, season, team or date.
+
+        If competition_id is given and the competition isn't indexed yet, it is indexed first.
+        The match identifiers can be passed to match_data.
+
+        Parameters
+        ----------
+        competition_id, season_id : int, default None
+        team : int or str, default None
+            The home or away team identifier (int) or name (str).
+        start_date, end_date : str or datetime.date, default None
+            The first and last match dates (inclusive), e.g. '2023-08-01'.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The competition_id, season_id, match_id, match_date, the home and away team identifiers and names,
+            last_updated, last_updated_360 and has_360 of each match, ordered by date.
+            The data type depends on the output_format.
+
+        Examples
+        --------
+        >>> from duckstatsbomb import Sbopen
+        >>> parser = Sbopen(database='statsbomb.duckdb', match_index=True)
+        >>> matches = parser.find_matches(competition_id=11, team='Barcelona', start_date='2015-01-01')
+        >>> events = parser.match_data(matches['match_id'].tolist(), kind='events')
+        """
+        if competition_id is not None:
+            self._indexed_matchids(competition_id, season_id)
+        self._create_match_index()
+        conditions = []
+        parameters = {}
+        if competition_id is not None:
+            conditions.append('competition_id = $competition_id')
+            parameters['competition_id'] = competition_id
+        if season_id is not None:
+            conditions.append('season_id = $season_id')
+            parameters['season_id'] = season_id
+        if isinstance(team, str):
+            conditions.append('(home_team_name = $team or away_team_name = $team)')
+            parameters['team'] = team
+        elif team is not None:
+            conditions.append('(home_team_id = $team or away_team_id = $team)')
+            parameters['team'] = team
+        if start_date is not None:
+            conditions.append('match_date >= cast($start_date as date)')
+            parameters['start_date'] = str(start_date)
+        if end_date is not None:
+            conditions.append('match_date <= cast($end_date as date)')
+            parameters['end_date'] = str(end_date)
+        where = f' where {" and ".join(conditions)}' if conditions else ''
+        sql = f'select * exclude (match_order) from match_index{where} order by match_date, match_id'
+        return self._fetch('match_index', sql, parameters or None)
+
+    @_instrumented
     def competitions(self):
         """StatsBomb competition data.
 
         Returns
         -------
         pandas.DataFrame
+            The data type depends on the output_format.
 
         Examples
         --------
@@ -350,8 +2962,9 @@ class SbBase(ABC):
         """
         url = self._competition_url()
         filename = self._request_get(url)
-        return self.con.execute(self.sql['competitions'], {'filename': filename}).df()
+        return self._fetch('competitions', self.sql['competitions'], {'filename': filename})
 
+    @_instrumented
     def matches(self, competition_id, season_id):
         """StatsBomb match data.
 
@@ -362,6 +2975,7 @@ class SbBase(ABC):
         Returns
         -------
         pandas.DataFrame
+            The data type depends on the output_format.
 
         Examples
         --------
@@ -382,7 +2996,7 @@ class SbBase(ABC):
         else:
             urls = self._match_url(competition_id, season_id)
         filename = self._request_get(urls)
-        return self.con.execute(self.sql['matches'], {'filename': filename}).df()
+        return self._fetch('matches', self.sql['matches'], {'filename': filename})
 
     def valid_data(self):
         """Returns a list of valid data types
@@ -393,74 +3007,480 @@ class SbBase(ABC):
         """
         return self.valid_match_data
 
-    def match_data(self, match_id, kind):
+    @_instrumented
+    def match_urls(self, competition_id, season_id=None, kind='events'):
+        """The urls of the files read by one or more kinds of data for each match in a competition,
+        e.g. the events and 360 files for 'events_360'. The files can be downloaded with prefetch.
+
+        Parameters
+        ----------
+        competition_id, season_id : int
+            If season_id is None, the urls for all the seasons of the competition are returned.
+        kind : str or list of str
+            A data type, e.g. 'events'. For a list of valid kind values use the valid_data method.
+
+        Returns
+        -------
+        dict
+            A list of urls for each match, keyed by season_id and then match_id. Matches without 360 data
+            (last_updated_360 is null) have no urls for the kinds that read the 360 files.
+
+        Examples
+        --------
+        >>> from duckstatsbomb import Sbopen
+        >>> parser = Sbopen()
+        >>> urls = parser.match_urls(11, 90, kind=['events', 'threesixty'])
+        >>> paths, failed = parser.prefetch([url for match_urls in urls[90].values() for url in match_urls])
+        """
+        self._validate_kind(kind)
+        if season_id is None:
+            rows = self._competition_matchids(competition_id)
+        else:
+            rows = self._competition_season_matchids(competition_id, season_id)
+        url_slugs = list(dict.fromkeys(self.url_map[k] for k in self._file_kinds(kind)))
+        reads_360 = self.url_map.get('threesixty') in url_slugs
+        urls = {}
+        for match_id, _, match_season_id, _, last_updated_360 in rows:
+            has_urls = not (reads_360 and last_updated_360 is None)
+            urls.setdefault(match_season_id, {})[match_id] = (
+                [self._urls(match_id, url_slug) for url_slug in url_slugs] if has_urls else []
+            )
+        return urls
+
+    @_instrumented
+    def prefetch(self, urls, max_workers=None):
+        """Download urls (e.g. from match_urls) into the cache without parsing them. The urls that fail
+        are collected rather than stopping the other downloads.
+
+        Parameters
+        ----------
+        urls : list of str
+        max_workers : int, default None
+            The number of download threads. The default uses requests_max_workers.
+
+        Returns
+        -------
+        paths : dict
+            The file path of each url that was downloaded or found in the cache.
+        failed : dict
+            The exception raised for each url that failed.
+        """
+
+        def request(url):
+            try:
+                return url, self._request(url), None
+            except Exception as err:
+                return url, None, err
+
+        paths = {}
+        failed = {}
+        with ThreadPoolExecutor(max_workers=max_workers or self.requests_max_workers) as executor:
+            for url, path, err in executor.map(self._bind(request), dict.fromkeys(urls)):
+                if err is None:
+                    paths[url] = path
+                else:
+                    failed[url] = err
+        return paths, failed
+
+    @_instrumented
+    def match_data(self, match_id, kind, columns=None, where=None, event_types=None):
         """StatsBomb match event data for the given match_id.
 
         Parameters
         ----------
         match_id : int or list of int
-        kind : str
+        kind : str or list of str
             A data type, e.g. 'events'. For a list of valid kind values use the valid_data method.
+            If a list of kinds is given, each file is only parsed once and a dictionary of data is returned.
+        columns : list of str, default None
+            Only return these columns, e.g. ['match_id', 'type_name', 'shot_statsbomb_xg'].
+            For 'events', the unused parts of the JSON are not decoded. Only valid with a single kind.
+        where : str, default None
+            A SQL filter for the rows, e.g. 'shot_statsbomb_xg > 0.1'. Only valid with a single kind.
+        event_types : str or list of str, default None
+            Only return these event types (type_name), e.g. ['Shot']. Only valid with 'events',
+            'related_events' and 'tactics'.
 
         Returns
         -------
-        pandas.DataFrame
+        pandas.DataFrame or dict of pandas.DataFrame
+            The data type depends on the output_format.
 
         Examples
         --------
         >>> from duckstatsbomb import Sbopen
         >>> parser = Sbopen()
         >>> events = parser.match_data([3788741, 3788742], kind='events')
+        >>> data = parser.match_data(3788741, kind=['events', 'frames', 'tactics'])
+        >>> events, frames, tactics = data['events'], data['frames'], data['tactics']
+        >>> shots = parser.match_data(3788741, kind='events', columns=['player_name', 'shot_statsbomb_xg'],
+        ...                           event_types='Shot')
         """
         self._validate_kind(kind)
-        urls = self._urls(match_id, url_slug=self.url_map[kind])
-        filename = self._request_get(urls)
-        return self.con.execute(self.sql[kind], {'filename': filename}).df()
+        where = self._where(kind, columns, where, event_types)
+        return self._parse_matches(match_id, kind, columns=columns, where=where)
 
-    def competition_data(self, competition_id, season_id=None, kind='events'):
+    @_instrumented
+    def competition_data(
+        self, competition_id, season_id=None, kind='events', columns=None, where=None, event_types=None, table=None
+    ):
         """StatsBomb match event for all matches in a competitition.
 
         Parameters
         ----------
         competition, season_id : int
             If season_id is None, the method will return matches over multiple seasons (if available).
-        kind : str
+        kind : str or list of str
             A data type, e.g. 'events'. For a list of valid kind values use the valid_data method.
+            If a list of kinds is given, each file is only parsed once and a dictionary of data is returned.
+        columns : list of str, default None
+            Only return these columns, e.g. ['match_id', 'type_name', 'shot_statsbomb_xg'].
+            For 'events', the unused parts of the JSON are not decoded. Only valid with a single kind.
+        where : str, default None
+            A SQL filter for the rows, e.g. 'shot_statsbomb_xg > 0.1'. Only valid with a single kind.
+        event_types : str or list of str, default None
+            Only return these event types (type_name), e.g. ['Shot']. Only valid with 'events',
+            'related_events' and 'tactics'.
+        table : str, default None
+            If set, the data is written into this table of the duckdb database (or a '<table>_<kind>' table for
+            each kind if kind is a list), which is replaced if it exists, and a duckdb relation of the table is
+            returned rather than loading the data into memory. With a memory_limit, the matches are parsed into
+            the table a chunk at a time. Use a file path for the database argument to keep the table.
 
         Returns
         -------
-        pandas.DataFrame
+        pandas.DataFrame or dict of pandas.DataFrame
+            The data type depends on the output_format, or a duckdb.DuckDBPyRelation if table is set.
 
         Examples
         --------
         >>> from duckstatsbomb import Sbopen
         >>> parser = Sbopen()
         >>> events = parser.competition_data(2, 44, kind='events') # the invincibles
+        >>> parser = Sbopen(database='statsbomb.duckdb', memory_limit='2GB')
+        >>> events = parser.competition_data(11, kind='events', table='la_liga_events')
+        """
+        self._validate_kind(kind)
+        where = self._where(kind, columns, where, event_types)
+        partitions = self._competition_partitions(competition_id, season_id)
+        return self._parse_matches(list(partitions), kind, partitions, columns, where, table)
+
+    @_instrumented
+    def iter_competition_data(
+        self,
+        competition_id,
+        season_id=None,
+        kind='events',
+        batch_size=10,
+        rows_per_batch=1000000,
+        columns=None,
+        where=None,
+        event_types=None,
+    ):
+        """Iterate over the StatsBomb data for all matches in a competition in batches.
+
+        The matches are requested and parsed batch_size matches at a time, and the results are
+        streamed from duckdb, so the memory used doesn't grow with the number of matches.
+
+        Parameters
+        ----------
+        competition, season_id : int
+            If season_id is None, the method will return matches over multiple seasons (if available).
+        kind : str
+            A data type, e.g. 'events'. For a list of valid kind values use the valid_data method.
+        batch_size : int, default 10
+            The number of matches to parse at a time.
+        rows_per_batch : int, default 1000000
+            The maximum number of rows in each chunk of data.
+        columns : list of str, default None
+            Only return these columns, e.g. ['match_id', 'type_name', 'shot_statsbomb_xg'].
+            For 'events', the unused parts of the JSON are not decoded.
+        where : str, default None
+            A SQL filter for the rows, e.g. 'shot_statsbomb_xg > 0.1'.
+        event_types : str or list of str, default None
+            Only return these event types (type_name), e.g. ['Shot']. Only valid with 'events',
+            'related_events' and 'tactics'.
+
+        Yields
+        ------
+        pandas.DataFrame
+            The data type depends on the output_format, e.g. pyarrow.RecordBatch for 'arrow'.
+
+        Examples
+        --------
+        >>> from duckstatsbomb import Sbopen
+        >>> parser = Sbopen(output_format='arrow')
+        >>> for batch in parser.iter_competition_data(2, 44, kind='events'):
+        ...     print(batch.num_rows)
         """
+        if not isinstance(kind, str):
+            raise ValueError('iter_competition_data takes a single kind')
         self._validate_kind(kind)
+        where = self._where(kind, columns, where, event_types)
+        partitions = self._competition_partitions(competition_id, season_id)
+        match_ids = list(partitions)
+        for start in range(0, len(match_ids), batch_size):
+            batch_ids = match_ids[start:start + batch_size]
+            filenames = self._match_filenames(batch_ids, kind)
+            if self.parquet_dir is None or kind in self.combined_map:
+                sql = self._pushdown(kind, columns, where)
+                parameters = self._parameters(kind, filenames)
+            else:
+                paths = self._store(batch_ids, kind, filenames, partitions)
+                sql = self._pushdown(kind, columns, where, self._parquet_sql)
+                parameters = {'filename': paths[kind]}
+            yield from self._fetch_batches(kind, sql, parameters, rows_per_batch)
+
+    def _competition_partitions(self, competition_id, season_id=None):
+        """Return the competition and season identifiers for each match in a competition.
+
+        Parameters
+        ----------
+        competition_id, season_id : int
+            If season_id is None, the matches over all seasons are returned.
+
+        Returns
+        -------
+        partitions : dict
+            A dictionary of match identifiers to (competition_id, season_id) tuples.
+        """
         if season_id is None:
             match_id = self._competition_matchids(competition_id)
         else:
             match_id = self._competition_season_matchids(competition_id, season_id)
-        urls = [
-            f'{self.url_map[kind]}/{matchid[0]}{self.url_ending}'
-            for matchid in match_id
-        ]
-        filename = self._request_get(urls)
-        return self.con.execute(self.sql[kind], {'filename': filename}).df()
+        return {row[0]: (row[1], row[2]) for row in match_id}
+
+    @_instrumented
+    def sync(self, competition_id, season_id, kinds=None):
+        """Incrementally load the data for a competition and season into tables in the duckdb database.
+
+        A table is kept for each kind of data (e.g. 'events') and the sync_matches table records the
+        last_updated timestamp (last_updated_360 for the 360 kinds) of each loaded match.
+        Only new or changed matches are requested and parsed, and their rows are replaced in the tables.
+        Use a file path for the database argument to keep the tables between sessions.
+
+        Parameters
+        ----------
+        competition_id, season_id : int
+        kinds : list of str, default None
+            The kinds of data to sync. The default syncs all kinds from the valid_data method.
+
+        Returns
+        -------
+        dict
+            The number of new or changed matches loaded for each kind.
+
+        Examples
+        --------
+        >>> from duckstatsbomb import Sbopen
+        >>> parser = Sbopen(database='statsbomb.duckdb')
+        >>> parser.sync(2, 44, kinds=['events', 'lineup_players'])
+        >>> events = parser.con.execute('select * from events').df()
+        """
+        kinds = list(dict.fromkeys(self.valid_match_data if kinds is None else kinds))
+        self._validate_kind(kinds)
+        self._con.execute(
+            'create table if not exists sync_matches '
+            '(kind varchar, match_id integer, competition_id integer, season_id integer, '
+            'last_updated varchar, synced_at timestamp, primary key (kind, match_id))'
+        )
+        if self.match_index:
+            # pick up the new and changed matches before comparing them with the synced matches
+            self._refresh_match_index(competition_id)
+        matches = self._competition_season_matchids(competition_id, season_id)
+        synced = {
+            (row[0], row[1]): row[2]
+            for row in self._con.execute(
+                'select kind, match_id, last_updated from sync_matches '
+                'where competition_id = $competition_id and season_id = $season_id',
+                {'competition_id': competition_id, 'season_id': season_id},
+            ).fetchall()
+        }
+        # group the kinds with the same matches to update so shared files are only parsed once
+        updates = collections.defaultdict(list)
+        for kind in kinds:
+            if kind in self.combined_map:
+                # the combined kinds (e.g. 'events_360') change with both the events and the 360 data
+                versions = [
+                    None if row[4] is None else f'{row[3]},{row[4]}' for row in matches
+                ]
+            else:
+                column = 4 if kind.startswith('threesixty') else 3
+                versions = [row[column] for row in matches]
+            stale = tuple(
+                (row[0], row[1], row[2], version)
+                for row, version in zip(matches, versions)
+                if version is not None and synced.get((kind, row[0])) != version
+            )
+            updates[stale].append(kind)
+
+        for stale, group in updates.items():
+            if not stale:
+                continue
+            match_ids = [row[0] for row in stale]
+
+            def upsert(kind, sql, parameters=None):
+                table = f'_sync_{kind}'
+                self._execute(kind, f'create or replace temp table {table} as {sql}', parameters)
+                self._add_profile(kind)
+                try:
+                    self._con.execute(
+                        f'create table if not exists {kind} as select * from {table} limit 0'
+                    )
+                    self._con.begin()
+                    try:
+                        self._con.execute(
+                            f'delete from {kind} where match_id in (select unnest($match_id))',
+                            {'match_id': match_ids},
+                        )
+                        self._con.execute(f'insert into {kind} select * from {table}')
+                        self._con.executemany(
+                            # a conflict target rather than 'insert or replace', which duckdb 0.9 rejects
+                            # for the composite primary key
+                            'insert into sync_matches values (?, ?, ?, ?, ?, current_timestamp) '
+                            'on conflict (kind, match_id) do update set '
+                            'last_updated = excluded.last_updated, synced_at = excluded.synced_at',
+                            [[kind, *row] for row in stale],
+                        )
+                        self._con.commit()
+                    except Exception:
+                        self._con.rollback()
+                        raise
+                finally:
+                    self._con.execute(f'drop table if exists {table}')
+
+            self._parse(group, self._match_filenames(match_ids, group), fetch=upsert)
+        return {kind: len(stale) for stale, group in updates.items() for kind in group}
 
     def close_connection(self):
-        """Close the duckdb connection."""
+        """Close the duckdb connection (and shut down the worker processes if they were started)."""
+        if self._process_pool is not None:
+            self._process_pool.shutdown()
+            self._process_pool = None
+        if self._refresh_executor is not None:
+            self._refresh_executor.shutdown()
+            self._refresh_executor = None
+        if self._sweeper is not None:
+            self._stop_sweep.set()
+            self._sweeper.join()
+            self._sweeper = None
+        if self._responses is not None:
+            self._responses_con.close()
         self.con.close()
 
     def remove_expired_responses(self):
         """Remove expired responses from the cache."""
-        self.session.cache.remove_expired_responses()
+        self._remove_expired_responses(self.session)
+
+    def _remove_expired_responses(self, session, throttle=False):
+        """Remove expired responses (and their saved payloads) from the cache.
+
+        A response is expired if the expiry time stored with it has passed, so responses cached with
+        expire_after=-1 are never removed. For the filesystem backend, only the metadata at the start of
+        each response file is read rather than deserializing every cached response (see _response_metadata).
+        Each expired response is removed straight after its metadata is read rather than after the scan, as the
+        scan runs in the background while other threads may store the response again, and the scan stops early
+        if the connection is closed. For the 'duckdb' backend, the expired rows are deleted from the responses
+        table. Otherwise, requests-cache removes the expired responses.
+
+        Parameters
+        ----------
+        session : requests_cache.CachedSession
+        throttle : bool, default False
+            If True, the cache is only cleaned if it hasn't been cleaned in the last expire_after seconds,
+            and it isn't cleaned if expire_after is negative (the responses never expire).
+        """
+        if self._responses is not None:
+            with self._responses_lock:
+                self._responses_con.execute(f'delete from {self._responses} where expires <= ?', [_utcnow()])
+            return
+        if self._session_kws['backend'] != 'filesystem':
+            session.cache.delete(expired=True)
+            return
+        expire_after = self._expire_seconds()
+        cache_dir = str(session.cache.cache_dir)
+        marker = os.path.join(cache_dir, '.last_cleaned')
+        now = time.time()
+        if throttle and expire_after is not None:
+            if expire_after < 0:
+                return
+            try:
+                if now - os.path.getmtime(marker) < expire_after:
+                    return
+            except OSError:
+                pass
+        now = datetime.now(timezone.utc)
+        try:
+            entries = [entry for entry in os.scandir(cache_dir) if entry.name.endswith('.json') and entry.is_file()]
+        except OSError:
+            entries = []
+        for entry in entries:
+            if self._stop_sweep.is_set():
+                # the cache isn't marked as cleaned, so the next session scans it again
+                return
+            key = entry.name[: -len('.json')]
+            try:
+                metadata = _response_metadata(entry.path)
+            except OSError:
+                continue
+            if metadata is None:
+                # fall back to deserializing the response
+                response = session.cache.responses.get(key)
+                if response is None or response.expires is None:
+                    continue
+                metadata = {'expires': response.expires.isoformat(), 'url': response.url}
+            if metadata.get('expires') is None:
+                continue
+            expires = datetime.fromisoformat(metadata['expires'])
+            if (expires if expires.tzinfo else expires.replace(tzinfo=timezone.utc)) > now:
+                continue
+            session.cache.delete(key)
+            if self.cache_payload:
+                try:
+                    os.remove(self._payload_path(metadata['url'], session))
+                except OSError:
+                    pass
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(marker, 'w'):
+            pass
 
     def clear_cache(self):
         """Clear the cache."""
+        if self._responses is not None:
+            with self._responses_lock:
+                self._responses_con.execute(f'delete from {self._responses}')
+            return
         self.session.cache.clear()
 
+    def result_cache_info(self):
+        """Return the hits, misses, number of tables and size in bytes of the in-memory result cache.
+
+        Returns
+        -------
+        dict or None
+            None if result_cache_bytes isn't set.
+        """
+        if self._result_cache is None:
+            return None
+        with self._result_cache.lock:
+            return {
+                'hits': self._result_cache.hits,
+                'misses': self._result_cache.misses,
+                'tables': len(self._result_cache.entries),
+                'nbytes': self._result_cache.nbytes,
+                'max_bytes': self._result_cache.max_bytes,
+            }
+
+    def clear_result_cache(self):
+        """Remove the parsed data from the in-memory result cache."""
+        if self._result_cache is not None:
+            self._result_cache.clear()
+
+    def clear_parquet_store(self):
+        """Remove the Parquet store of parsed match data."""
+        if self.parquet_dir is not None:
+            shutil.rmtree(self.parquet_dir, ignore_errors=True)
+
 
 class Sbopen(SbBase):
     """A class for loading data from the StatsBomb open-data.
@@ -471,29 +3491,8 @@ class Sbopen(SbBase):
     ----------
     competitions_version, matches_version, events_version, lineup_version, threesixty_version : int, defaults 4, 3, 4, 2, 1
         The StatsBomb data version.
-    database : str, default ':default:'
-        The name of the duckdb database. By default it creates an unnamed in-memory database that lives
-        inside the duckdb module. If the database is a file path, a connection to a persistent database is
-        established, which will be created if it doesn't already exist.
-    duckdb_threads, int, default None
-        The number of threads used by duckdb. The default uses the duckdb default
-    output_format : str, default 'pandas'
-        The format of data that is returned by match_data, competition_data, competitions, and match_data.
-    cache_name : str, default 'statsbomb_cache'
-        Base directory for cache files
-    cache_backend : str, default 'filesystem'
-        The requests-cache backend.
-    removed_expired_responses : bool, default True
-        If True, removes the expired cached responses when instantiating the class.
-    expire_after : int, default 360
-        The number of seconds to store cached responses.
-    requests_max_workers : default None
-        The number of threads to use for requests. The default uses the
-        concurrent.futures.ThreadPoolExecutor default.
-    session_kws : dict, default None
-        Additional keywords are passed to requests_cache.CachedSession.
-    connection_kws : dict, default None
-        Additional keywords are passed to duckdb.connect.
+
+    The other parameters (database, output_format, cache_name, expire_after, etc.) are documented in SbBase.
     """
 
     def __init__(
@@ -505,15 +3504,45 @@ class Sbopen(SbBase):
         threesixty_version=1,
         database=':default:',
         duckdb_threads=None,
+        match_index=False,
+        memory_limit=None,
+        temp_directory=None,
         output_format='pandas',
+        compact=None,
         cache_name='statsbomb_cache',
         cache_backend='filesystem',
         remove_expired_responses=True,
         expire_after=360,
+        revalidate=False,
+        stale_while_revalidate=False,
         requests_max_workers=None,
+        cache_payload=False,
+        parquet_store=False,
+        pipeline_chunk_size=None,
+        result_cache_bytes=None,
+        process_workers=None,
+        worker_memory_limit=None,
+        max_retries=3,
+        backoff_factor=0.5,
+        rate_limit=None,
+        thread_safe=False,
+        stats_callback=None,
+        profile=False,
         session_kws=None,
         connection_kws=None,
     ):
+        self.url_ending = '.json'
+        self.url = 'https://raw.githubusercontent.com/statsbomb/open-data/master/data'
+        self.url_map = {
+            'lineup_players': f'{self.url}/lineups',
+            'events': f'{self.url}/events',
+            'frames': f'{self.url}/events',
+            'tactics': f'{self.url}/events',
+            'related_events': f'{self.url}/events',
+            'threesixty_frames': f'{self.url}/three-sixty',
+            'threesixty': f'{self.url}/three-sixty',
+        }
+
         super().__init__(
             competitions_version=competitions_version,
             matches_version=matches_version,
@@ -522,27 +3551,34 @@ class Sbopen(SbBase):
             threesixty_version=threesixty_version,
             database=database,
             output_format=output_format,
+            compact=compact,
             cache_name=cache_name,
             cache_backend=cache_backend,
             remove_expired_responses=remove_expired_responses,
             expire_after=expire_after,
+            revalidate=revalidate,
+            stale_while_revalidate=stale_while_revalidate,
             requests_max_workers=requests_max_workers,
             duckdb_threads=duckdb_threads,
-            sql_dir='sql/cache',
+            match_index=match_index,
+            memory_limit=memory_limit,
+            temp_directory=temp_directory,
+            cache_payload=cache_payload,
+            parquet_store=parquet_store,
+            pipeline_chunk_size=pipeline_chunk_size,
+            result_cache_bytes=result_cache_bytes,
+            process_workers=process_workers,
+            worker_memory_limit=worker_memory_limit,
+            max_retries=max_retries,
+            backoff_factor=backoff_factor,
+            rate_limit=rate_limit,
+            thread_safe=thread_safe,
+            stats_callback=stats_callback,
+            profile=profile,
+            sql_dir='sql/original' if cache_payload else 'sql/cache',
             session_kws=session_kws,
             connection_kws=connection_kws,
         )
-        self.url_ending = '.json'
-        self.url = 'https://raw.githubusercontent.com/statsbomb/open-data/master/data'
-        self.url_map = {
-            'lineup_players': f'{self.url}/lineups',
-            'events': f'{self.url}/events',
-            'frames': f'{self.url}/events',
-            'tactics': f'{self.url}/events',
-            'related_events': f'{self.url}/events',
-            'threesixty_frames': f'{self.url}/three-sixty',
-            'threesixty': f'{self.url}/three-sixty',
-        }
 
     def _match_url(self, competition_id, season_id):
         """Creates a matches url string for a given competition and season.
@@ -580,29 +3616,8 @@ class Sbapi(SbBase):
         Otherwise the credentials are set from the sb_username and sb_password arguments.
     competitions_version, matches_version, events_version, lineup_version, threesixty_version : int, defaults 4, 6, 8, 4, 2
         The StatsBomb data version.
-    database : str, default ':default:'
-        The name of the duckdb database. By default it creates an unnamed in-memory database that lives
-        inside the duckdb module. If the database is a file path, a connection to a persistent database is
-        established, which will be created if it doesn't already exist.
-    duckdb_threads, int, default None
-        The number of threads used by duckdb. The default uses the duckdb default
-    output_format : str, default 'pandas'
-        The format of data that is returned by the methods: match_data, competition_data, competitions, and match_data.
-    cache_name : str, default 'statsbomb_cache'
-        Base directory for cache files
-    cache_backend : str, default 'filesystem'
-        The requests-cache backend.
-    removed_expired_responses : bool, default True
-        If True, removes the expired cached responses when instantiating the class.
-    expire_after : int, default 360
-        The number of seconds to store cached responses.
-    requests_max_workers : default None
-        The number of threads to use for requests. The default uses the
-        concurrent.futures.ThreadPoolExecutor default.
-    session_kws : dict, default None
-        Additional keywords are passed to requests_cache.CachedSession.
-    connection_kws : dict, default None
-        Additional keywords are passed to duckdb.connect.
+
+    The other parameters (database, output_format, cache_name, expire_after, etc.) are documented in SbBase.
     """
 
     def __init__(
@@ -616,15 +3631,49 @@ class Sbapi(SbBase):
         threesixty_version=2,
         database=':default:',
         duckdb_threads=None,
+        match_index=False,
+        memory_limit=None,
+        temp_directory=None,
         output_format='pandas',
+        compact=None,
         cache_name='statsbomb_cache',
         cache_backend='filesystem',
         remove_expired_responses=True,
         expire_after=360,
+        revalidate=False,
+        stale_while_revalidate=False,
         requests_max_workers=None,
+        cache_payload=False,
+        parquet_store=False,
+        pipeline_chunk_size=None,
+        result_cache_bytes=None,
+        process_workers=None,
+        worker_memory_limit=None,
+        max_retries=3,
+        backoff_factor=0.5,
+        rate_limit=None,
+        thread_safe=False,
+        stats_callback=None,
+        profile=False,
         session_kws=None,
         connection_kws=None,
     ):
+        self.session_auth = (
+            os.environ.get('SB_USERNAME', sb_username),
+            os.environ.get('SB_PASSWORD', sb_password),
+        )
+        self.url_ending = ''
+        self.url = 'https://data.statsbombservices.com/api'
+        self.url_map = {
+            'lineup_players': f'{self.url}/v{lineup_version}/lineups',
+            'events': f'{self.url}/v{events_version}/events',
+            'frames': f'{self.url}/v{events_version}/events',
+            'tactics': f'{self.url}/v{events_version}/events',
+            'related_events': f'{self.url}/v{events_version}/events',
+            'threesixty_frames': f'{self.url}/v{threesixty_version}/360-frames',
+            'threesixty': f'{self.url}/v{threesixty_version}/360-frames',
+        }
+
         super().__init__(
             competitions_version=competitions_version,
             matches_version=matches_version,
@@ -633,31 +3682,34 @@ class Sbapi(SbBase):
             threesixty_version=threesixty_version,
             database=database,
             output_format=output_format,
+            compact=compact,
             cache_name=cache_name,
             cache_backend=cache_backend,
             remove_expired_responses=remove_expired_responses,
             expire_after=expire_after,
+            revalidate=revalidate,
+            stale_while_revalidate=stale_while_revalidate,
             requests_max_workers=requests_max_workers,
             duckdb_threads=duckdb_threads,
-            sql_dir='sql/cache',
+            match_index=match_index,
+            memory_limit=memory_limit,
+            temp_directory=temp_directory,
+            cache_payload=cache_payload,
+            parquet_store=parquet_store,
+            pipeline_chunk_size=pipeline_chunk_size,
+            result_cache_bytes=result_cache_bytes,
+            process_workers=process_workers,
+            worker_memory_limit=worker_memory_limit,
+            max_retries=max_retries,
+            backoff_factor=backoff_factor,
+            rate_limit=rate_limit,
+            thread_safe=thread_safe,
+            stats_callback=stats_callback,
+            profile=profile,
+            sql_dir='sql/original' if cache_payload else 'sql/cache',
             session_kws=session_kws,
             connection_kws=connection_kws,
         )
-        self.url_ending = ''
-        self.session.auth = (
-            os.environ.get('SB_USERNAME', sb_username),
-            os.environ.get('SB_PASSWORD', sb_password),
-        )
-        self.url = 'https://data.statsbombservices.com/api'
-        self.url_map = {
-            'lineup_players': f'{self.url}/v{lineup_version}/lineups',
-            'events': f'{self.url}/v{events_version}/events',
-            'frames': f'{self.url}/v{events_version}/events',
-            'tactics': f'{self.url}/v{events_version}/events',
-            'related_events': f'{self.url}/v{events_version}/events',
-            'threesixty_frames': f'{self.url}/v{threesixty_version}/360-frames',
-            'threesixty': f'{self.url}/v{threesixty_version}/360-frames',
-        }
 
     def _match_url(self, competition_id, season_id):
         """Creates a matches url string for a given competition and season.
@@ -688,22 +3740,24 @@ class Sblocal(SbBase):
 
     Parameters
     ----------
+    data_dir : str, default None
+        The data folder of a local copy of the open-data, e.g. 'open-data/data', containing competitions.json
+        and the matches, events, lineups and three-sixty folders. If set, the competitions and matches files
+        are used by default, match_data also accepts match identifiers, and the data for a competition
+        can be loaded with competition_data, iter_competition_data and sync.
+        The match index is built from all the matches files the first time it's needed.
     competitions_version, matches_version, events_version, lineup_version, threesixty_version : int, defaults 4, 3, 4, 2, 1
         The StatsBomb data version.
-    database : str, default ':default:'
-        The name of the duckdb database. By default it creates an unnamed in-memory database that lives
-        inside the duckdb module. If the database is a file path, a connection to a persistent database is
-        established, which will be created if it doesn't already exist.
-    duckdb_threads, int, default None
-        The number of threads used by duckdb. The default uses the duckdb default
-    output_format : str, default 'pandas'
-        The format of data that is returned by match_data, competition_data, competitions, and match_data.
-    connection_kws : dict, default None
-        Additional keywords are passed to duckdb.connect.
+    process_workers : int, default None
+        As in SbBase, but a list of files given to match_data is also split between the worker processes.
+
+    The other parameters (database, output_format, compact, etc.) are documented in SbBase. The files are read
+    directly, so there are no cache or request parameters.
     """
 
     def __init__(
         self,
+        data_dir=None,
         competitions_version=4,
         matches_version=3,
         events_version=4,
@@ -711,9 +3765,23 @@ class Sblocal(SbBase):
         threesixty_version=1,
         database=':default:',
         duckdb_threads=None,
+        match_index=False,
+        memory_limit=None,
+        temp_directory=None,
         output_format='pandas',
+        compact=None,
+        process_workers=None,
+        worker_memory_limit=None,
+        thread_safe=False,
+        stats_callback=None,
+        profile=False,
         connection_kws=None,
     ):
+        self.data_dir = data_dir
+        self.url = data_dir
+        self.url_ending = '.json'
+        self.url_map = {}
+        self._match_rows_cache = None
         super().__init__(
             competitions_version=competitions_version,
             matches_version=matches_version,
@@ -722,21 +3790,40 @@ class Sblocal(SbBase):
             threesixty_version=threesixty_version,
             database=database,
             output_format=output_format,
+            compact=compact,
             duckdb_threads=duckdb_threads,
+            match_index=match_index,
+            memory_limit=memory_limit,
+            temp_directory=temp_directory,
+            process_workers=process_workers,
+            worker_memory_limit=worker_memory_limit,
+            thread_safe=thread_safe,
+            stats_callback=stats_callback,
+            profile=profile,
             sql_dir='sql/original',
             connection_kws=connection_kws,
         )
-
-    def competitions(self, filename):
+        if data_dir is not None:
+            # the folders in the open-data, each kind is parsed from the file for the match in the folder
+            folders = {'lineup': 'lineups', 'threesixty': 'three-sixty'}
+            self.url_map = {
+                kind: f'{data_dir}/{folders.get(kind.split("_")[0], "events")}'
+                for kind in self.valid_match_data
+            }
+
+    @_instrumented
+    def competitions(self, filename=None):
         """StatsBomb competition data.
 
         Parameters
         ----------
-        filename : path or list of paths
+        filename : path or list of paths, default None
+            The default is competitions.json in the data_dir.
 
         Returns
         -------
         pandas.DataFrame
+            The data type depends on the output_format.
 
         Examples
         --------
@@ -744,18 +3831,23 @@ class Sblocal(SbBase):
         >>> parser = Sblocal()
         >>> competitions = parser.competitions('competitions.json')
         """
-        return self.con.execute(self.sql['competitions'], {'filename': filename}).df()
+        filename = filename or self._competition_url()
+        self._record_files(filename)
+        return self._fetch('competitions', self.sql['competitions'], {'filename': filename})
 
-    def matches(self, filename):
+    @_instrumented
+    def matches(self, filename=None):
         """StatsBomb match data.
 
         Parameters
         ----------
-        filename : path or list of paths
+        filename : path or list of paths, default None
+            The default is all the matches files in the data_dir.
 
         Returns
         -------
         pandas.DataFrame
+            The data type depends on the output_format.
 
         Examples
         --------
@@ -763,38 +3855,162 @@ class Sblocal(SbBase):
         >>> parser = Sblocal()
         >>> matches = parser.matches('27.json')
         """
-        return self.con.execute(self.sql['matches'], {'filename': filename}).df()
+        filename = filename or self._matches_pattern()
+        self._record_files(filename)
+        return self._fetch('matches', self.sql['matches'], {'filename': filename})
 
-    def match_data(self, filename, kind):
+    @_instrumented
+    def match_data(self, filename, kind, columns=None, where=None, event_types=None):
         """StatsBomb match event data for the given match_id.
 
         Parameters
         ----------
-        filename : path or list of paths
-        kind : str
+        filename : path, list of paths, int or list of int
+            The files, or if data_dir is set, the match identifiers.
+        kind : str or list of str
             A data type, e.g. 'events'. For a list of valid kind values use the valid_data method.
+            If a list of kinds is given, each file is only parsed once and a dictionary of data is returned.
+            The kinds should share the same files, e.g. ['events', 'frames', 'tactics', 'related_events'],
+            unless match identifiers are given.
+        columns : list of str, default None
+            Only return these columns, e.g. ['match_id', 'type_name', 'shot_statsbomb_xg'].
+            For 'events', the unused parts of the JSON are not decoded. Only valid with a single kind.
+        where : str, default None
+            A SQL filter for the rows, e.g. 'shot_statsbomb_xg > 0.1'. Only valid with a single kind.
+        event_types : str or list of str, default None
+            Only return these event types (type_name), e.g. ['Shot']. Only valid with 'events',
+            'related_events' and 'tactics'.
 
         Returns
         -------
-        pandas.DataFrame
+        pandas.DataFrame or dict of pandas.DataFrame
+            The data type depends on the output_format.
 
         Examples
         --------
         >>> from duckstatsbomb import Sblocal
         >>> parser = Sblocal()
         >>> events = parser.match_data(['3788741.json', '3788742.json'], kind='events')
+        >>> parser = Sblocal(data_dir='open-data/data')
+        >>> events = parser.match_data([3788741, 3788742], kind='events')
         """
         self._validate_kind(kind)
-        return self.con.execute(self.sql[kind], {'filename': filename}).df()
+        where = self._where(kind, columns, where, event_types)
+        match_ids = [filename] if isinstance(filename, numbers.Integral) else filename
+        if self.data_dir is not None and all(isinstance(m, numbers.Integral) for m in match_ids):
+            return self._parse_matches(filename, kind, columns=columns, where=where)
+        kinds = [kind] if isinstance(kind, str) else kind
+        combined = [k for k in kinds if k in self.combined_map]
+        if combined:
+            raise ValueError(f'{combined} read several files for each match, so needs data_dir and match identifiers')
+        self._record_files(filename)
+        filenames = {k: filename for k in kinds}
+        if self._use_processes(filenames):
+            return self._parse_sharded(kind, filenames, self._pushdown(kind, columns, where))
+        return self._parse(kind, filenames, sql=self._pushdown(kind, columns, where))
 
     def _match_url(self, competition_id, season_id):
-        """No URLs for local data."""
-        pass
+        """Creates a matches file path for a given competition and season.
+
+        Parameters
+        ----------
+        competition_id, season_id : int
+            The StatsBomb competition and season identifiers
+
+        Returns
+        -------
+        path : str
+        """
+        return f'{self._data_dir()}/matches/{competition_id}/{season_id}{self.url_ending}'
 
     def _competition_url(self):
-        """No URLs for local data."""
-        pass
+        """Creates the competitions file path.
+
+        Returns
+        -------
+        path : str
+        """
+        return f'{self._data_dir()}/competitions{self.url_ending}'
+
+    def _matches_pattern(self):
+        """Return the glob pattern for all the matches files."""
+        return f'{self._data_dir()}/matches/*/*{self.url_ending}'
+
+    def _data_dir(self):
+        """Return the data_dir, raising a ValueError if it isn't set."""
+        if self.data_dir is None:
+            raise ValueError('Sblocal needs the data_dir argument to find the files for a competition or match')
+        return self.data_dir
+
+    def _request_get(self, urls):
+        """Return the file paths. The local files are read directly, so nothing is requested.
+
+        Parameters
+        ----------
+        urls : str or list of str
+
+        Returns
+        -------
+        paths : list of str
+        """
+        paths = [urls] if isinstance(urls, str) else list(urls)
+        self._record_files(paths)
+        return paths
+
+    def prefetch(self, urls, max_workers=None):
+        """Return the file paths (see SbBase.prefetch). The local files are read directly, so nothing is downloaded.
+
+        Returns
+        -------
+        paths : dict
+        failed : dict
+            Always empty.
+        """
+        return {url: url for url in urls}, {}
+
+    def _match_rows(self):
+        """Return the match index: a list of (match_id, competition_id, season_id, last_updated,
+        last_updated_360) tuples read from all the matches files in one scan the first time it's used.
+        """
+        if self._match_rows_cache is None:
+            self._match_rows_cache = self._execute(
+                'match_ids', self.sql['match_ids'], {'filename': self._matches_pattern()}
+            ).fetchall()
+            self._add_profile('match_ids')
+        return self._match_rows_cache
+
+    def _competition_season_matchids(self, competition_id=None, season_id=None):
+        """Return a list of match identifiers for a given competition and season identifier from the match index.
+
+        Parameters
+        ----------
+        competition_id, season_id : int
+            A StatsBomb competition or season identifier.
 
-    def competition_data(self, competition_id, season_id=None, kind='events'):
-        """Not implemented for Sblocal."""
-        raise NotImplementedError('competition_data has not been implemented for Sblocal')
+        Returns
+        -------
+        matchids
+            A list of tuples. The tuples contain the match, competition and season identifiers
+            and the last_updated and last_updated_360 strings.
+        """
+        if self.match_index:
+            return super()._competition_season_matchids(competition_id, season_id)
+        return [row for row in self._match_rows() if row[1] == competition_id and row[2] == season_id]
+
+    def _competition_matchids(self, competition_id):
+        """Return a list of match identifiers for a given competition identifier from the match index.
+
+        Parameters
+        ----------
+        competition_id : int
+            A StatsBomb competition identifier.
+
+        Returns
+        -------
+        matchids
+            A list of tuples. The tuples contain the match, competition and season identifiers
+            and the last_updated and last_updated_360 strings.
+        """
+        if self.match_index:
+            return super()._competition_matchids(competition_id)
+        return [row for row in self._match_rows() if row[1] == competition_id]
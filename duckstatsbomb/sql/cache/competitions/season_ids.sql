@@ -5,6 +5,8 @@ with raw_json as (
                 json(_decoded_content),
                 '[{"competition_id": "integer",
                    "season_id": "integer",
+                   "match_updated": "varchar",
+                   "match_updated_360": "varchar"
                    }]'
             )
         ) as json
@@ -13,12 +15,14 @@ with raw_json as (
             select
                 *
             from
-                read_json($filename)
+                read_json($filename, format = 'auto', columns = {url: 'varchar', _decoded_content: 'json'})
         )
 )
 select
     json.competition_id,
-    json.season_id
+    json.season_id,
+    json.match_updated,
+    json.match_updated_360
 from
     raw_json
 where
@@ -23,7 +23,7 @@ with raw_json as (
             select
                 *
             from
-                read_json($filename)
+                read_json($filename, format = 'auto', columns = {url: 'varchar', _decoded_content: 'json'})
         )
 ),
 parsed_json as (
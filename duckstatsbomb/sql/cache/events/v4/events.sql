@@ -71,7 +71,7 @@ with raw_json as (
             select
                 *
             from
-                read_json($filename)
+                read_json($filename, format = 'auto', columns = {url: 'varchar', _decoded_content: 'json'})
         )
 ),
 final as (
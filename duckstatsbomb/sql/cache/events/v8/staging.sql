@@ -0,0 +1,68 @@
+-- the union of the events, freeze_frames, tactics and related_events schemas
+-- used to decode each events file once when several of these kinds are requested together
+select
+    url,
+    unnest(
+        from_json(
+            json(_decoded_content),
+            '[{"id": "varchar",
+               "index": "integer",
+               "period": "integer",
+               "timestamp": "time",
+               "minute": "integer",
+               "second": "integer",
+               "type": "struct(id ubigint, name varchar)",
+               "possession": "integer",
+               "possession_team": "struct(id ubigint, name varchar)",
+               "play_pattern": "struct(id ubigint, name varchar)",
+               "team": "struct(id ubigint, name varchar)",
+               "player": "struct(id ubigint, name varchar)",
+               "position": "struct(id ubigint, name varchar)",
+               "location": "double[]",
+               "duration": "double",
+               "under_pressure": "boolean",
+               "off_camera": "boolean",
+               "out": "boolean",
+               "tactics": "struct(formation varchar, lineup struct(jersey_number integer, player struct(id integer, name varchar), position struct(id integer, name varchar))[])",
+               "obv_for_after": "double",
+               "obv_for_before": "double",
+               "obv_for_net": "double",
+               "obv_against_after": "double",
+               "obv_against_before": "double",
+               "obv_against_net": "double",
+               "obv_total_net": "double",
+               "counterpress": "boolean",
+               "50_50": "struct(outcome struct(id ubigint, name varchar), counterpress boolean)",
+               "bad_behaviour": "struct(card struct(id ubigint, name varchar))",
+               "ball_receipt": "struct(outcome struct(id ubigint, name varchar))",
+               "ball_recovery": "struct(offensive boolean, recovery_failure boolean)",
+               "block": "struct(deflection boolean, offensive boolean, save_block boolean, counterpress boolean)",
+               "carry": "struct(end_location double[])",
+               "clearance": "struct(aerial_won boolean, body_part struct(id ubigint, name varchar))",
+               "dribble": "struct(overrun boolean, nutmeg boolean, outcome struct(id ubigint, name varchar), no_touch boolean)",
+               "dribbled_past": "struct(counterpress boolean)",
+               "duel": "struct(counterpress boolean, type struct(id ubigint, name varchar), outcome struct(id ubigint, name varchar))",
+               "foul_committed": "struct(counterpress boolean, offensive boolean, type struct(id ubigint, name varchar), advantage boolean, penalty boolean, card struct(id ubigint, name varchar))",
+               "foul_won": "struct(defensive boolean, advantage boolean, penalty boolean)",
+               "goalkeeper": "struct(position struct(id ubigint, name varchar), technique struct(id ubigint, name varchar), body_part struct(id ubigint, name varchar), type struct(id ubigint, name varchar), outcome struct(id ubigint, name varchar), end_location double[])",
+               "half_end": "struct(early_video_end boolean, match_suspended boolean)",
+               "half_start": "struct(late_video_start boolean)",
+               "injury_stoppage": "struct(in_chain boolean)",
+               "interception": "struct(outcome struct(id ubigint, name varchar))",
+               "miscontrol": "struct(aerial_won boolean)",
+               "pass": "struct(recipient struct(id ubigint, name varchar), length double, angle double, height struct(id ubigint, name varchar), end_location double[], assisted_shot_id varchar, backheel boolean, deflected boolean, miscommunication boolean, \"cross\" boolean, xclaim double, cut_back boolean, switch boolean, shot_assist boolean, goal_assist boolean, body_part struct(id ubigint, name varchar), type struct(id ubigint, name varchar), outcome struct(id ubigint, name varchar), technique struct(id ubigint, name varchar), pass_cluster_id ubigint, pass_cluster_label varchar, pass_cluster_probability double, pass_success_probability double, aerial_won boolean, no_touch boolean)",
+               "player_off": "struct(permanent boolean)",
+               "pressure": "struct(counterpress boolean)",
+               "shot": "struct(key_pass_id varchar, end_location double[], aerial_won boolean, follows_dribble boolean, first_time boolean, open_goal boolean, one_on_one boolean, statsbomb_xg double, gk_save_difficulty_xg double, shot_execution_xg double, shot_execution_xg_uplift double, gk_positioning_xg_suppression double, gk_shot_stopping_xg_suppression double, deflected boolean, technique struct(id ubigint, name varchar), shot_shot_assist boolean, shot_goal_assist boolean, body_part struct(id ubigint, name varchar), type struct(id ubigint, name varchar), outcome struct(id ubigint, name varchar), redirect boolean, freeze_frame struct(location double[], player struct(id integer, name varchar), position struct(id integer, name varchar), teammate boolean)[])",
+               "substitution": "struct(replacement struct(id ubigint, name varchar), outcome struct(id ubigint, name varchar))",
+               "related_events": "VARCHAR[]"
+              }]'
+        )
+    ) as json
+from
+    (
+        select
+            *
+        from
+            read_json($filename, format = 'auto', columns = {url: 'varchar', _decoded_content: 'json'})
+    )
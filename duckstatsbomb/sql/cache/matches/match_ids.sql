@@ -3,7 +3,12 @@ with raw_json as (
         unnest(
             from_json(
                 json(_decoded_content),
-                '[{"match_id": "integer"}]'
+                '[{"match_id": "integer",
+                   "competition": "struct(competition_id integer)",
+                   "season": "struct(season_id integer)",
+                   "last_updated": "varchar",
+                   "last_updated_360": "varchar"
+                   }]'
             )
         ) as json
     from
@@ -11,10 +16,14 @@ with raw_json as (
             select
                 *
             from
-                read_json($filename)
+                read_json($filename, format = 'auto', columns = {url: 'varchar', _decoded_content: 'json'})
         )
 )
 select
-    json.match_id
+    json.match_id,
+    json.competition.competition_id,
+    json.season.season_id,
+    json.last_updated,
+    json.last_updated_360
 from
     raw_json
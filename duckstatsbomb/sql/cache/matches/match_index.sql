@@ -0,0 +1,38 @@
+with raw_json as (
+    select
+        unnest(
+            from_json(
+                json(_decoded_content),
+                '[{"match_id": "integer",
+                   "match_date": "date",
+                   "competition": "struct(competition_id integer)",
+                   "season": "struct(season_id integer)",
+                   "home_team": "struct(home_team_id integer, home_team_name varchar)",
+                   "away_team": "struct(away_team_id integer, away_team_name varchar)",
+                   "last_updated": "varchar",
+                   "last_updated_360": "varchar"
+                   }]'
+            )
+        ) as json
+    from
+        (
+            select
+                *
+            from
+                read_json($filename, format = 'auto', columns = {url: 'varchar', _decoded_content: 'json'})
+        )
+)
+select
+    json.competition.competition_id,
+    json.season.season_id,
+    json.match_id,
+    json.match_date,
+    json.home_team.home_team_id,
+    json.home_team.home_team_name,
+    json.away_team.away_team_id,
+    json.away_team.away_team_name,
+    json.last_updated,
+    json.last_updated_360,
+    json.last_updated_360 is not null as has_360
+from
+    raw_json
@@ -0,0 +1,20 @@
+-- the union of the threesixty and freeze_frames schemas
+-- used to decode each 360 file once when several of these kinds are requested together
+select
+    url,
+    unnest(
+        from_json(
+            json(_decoded_content),
+            '[{"event_uuid": "varchar",
+               "visible_area": "double[]",
+               "freeze_frame": "struct(teammate boolean, actor boolean, keeper boolean, location double[])[]"
+               }]'
+        )
+    ) as json
+from
+    (
+        select
+            *
+        from
+            read_json($filename, format = 'auto', columns = {url: 'varchar', _decoded_content: 'json'}, maximum_object_size = $maximum_object_size)
+    )
@@ -0,0 +1,27 @@
+-- the union of the threesixty, freeze_frames, visible_count and visible_distance schemas
+-- used to decode each 360 file once when several of these kinds are requested together
+select
+    url,
+    unnest(
+        from_json(
+            json(_decoded_content),
+            '[{"event_uuid": "varchar",
+               "visible_area": "double[]",
+               "line_breaking_pass": "boolean",
+               "num_defenders_on_goal_side_of_actor": "ubigint",
+               "distance_to_nearest_defender": "double",
+               "ball_receipt_in_space": "boolean",
+               "ball_receipt_exceeds_distance": "ubigint",
+               "freeze_frame": "struct(teammate boolean, actor boolean, keeper boolean, location double[])[]",
+               "visible_player_counts": "struct(team_id ubigint, count ubigint)[]",
+               "distances_from_edge_of_visible_area": "struct(point_id ubigint, distance double)[]"
+               }]'
+        )
+    ) as json
+from
+    (
+        select
+            *
+        from
+            read_json($filename, format = 'auto', columns = {url: 'varchar', _decoded_content: 'json'}, maximum_object_size = $maximum_object_size)
+    )
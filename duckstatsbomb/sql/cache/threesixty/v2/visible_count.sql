@@ -14,7 +14,7 @@ with raw_json as (
             select
                 *
             from
-                read_json($filename, maximum_object_size=25000000)
+                read_json($filename, format = 'auto', columns = {url: 'varchar', _decoded_content: 'json'}, maximum_object_size = $maximum_object_size)
         )
 )
 select
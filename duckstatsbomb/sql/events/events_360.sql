@@ -0,0 +1,66 @@
+-- the events joined with the 360 data of each event: the visible area and the freeze frame as a list of players
+-- the threesixty_json, threesixty_rows, freeze_frame_rows and event_rows bodies are replaced with the
+-- 360 staging query and the threesixty, threesixty_frames and events queries for the data versions
+with threesixty_json as materialized (
+    select
+        *
+    from
+        threesixty_staging
+),
+threesixty_rows as (
+    select
+        *
+    from
+        threesixty
+),
+freeze_frame_rows as (
+    select
+        *
+    from
+        threesixty_frames
+),
+numbered_frames as (
+    -- the players are numbered in the order of the freeze frame in the file
+    select
+        *,
+        row_number() over () as frame_row
+    from
+        freeze_frame_rows
+),
+event_rows as (
+    select
+        *
+    from
+        events
+),
+freeze_frames as (
+    select
+        match_id,
+        event_uuid,
+        list(
+            struct_pack(x := x, y := y, teammate := teammate, actor := actor, keeper := keeper)
+            order by frame_row
+        ) as freeze_frame
+    from
+        numbered_frames
+    group by
+        match_id,
+        event_uuid
+),
+numbered_events as (
+    select
+        *,
+        row_number() over () as event_row
+    from
+        event_rows
+)
+select
+    numbered_events.* exclude (event_row),
+    threesixty_rows.* exclude (match_id, event_uuid),
+    freeze_frames.freeze_frame
+from
+    numbered_events
+    left join threesixty_rows using (match_id, event_uuid)
+    left join freeze_frames using (match_id, event_uuid)
+order by
+    numbered_events.event_row
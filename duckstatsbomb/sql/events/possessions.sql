@@ -0,0 +1,48 @@
+-- one row per possession, aggregated from the events of each match
+-- the event_rows body is replaced with the events query for the data version, which only selects the columns used here
+with event_rows as (
+    select
+        *
+    from
+        events
+),
+numbered_events as (
+    select
+        *,
+        row_number() over () as event_row
+    from
+        event_rows
+)
+select
+    match_id,
+    possession,
+    -- the possession team, period and play pattern are the same for all the events in a possession
+    arg_min(possession_team_id, "index") as possession_team_id,
+    arg_min(possession_team_name, "index") as possession_team_name,
+    arg_min(period, "index") as period,
+    arg_min(play_pattern_id, "index") as play_pattern_id,
+    arg_min(play_pattern_name, "index") as play_pattern_name,
+    arg_min(minute, "index") as start_minute,
+    arg_min(second, "index") as start_second,
+    min(timestamp) as start_timestamp,
+    max(timestamp) as end_timestamp,
+    -- the seconds from the start of the first event to the end of the last event (its timestamp plus its
+    -- duration), as the timestamps restart each period
+    arg_max(epoch(timestamp) + coalesce(duration, 0), "index") - epoch(min(timestamp)) as duration,
+    count(*) as event_count,
+    count(*) filter (where type_name = 'Pass') as pass_count,
+    count(*) filter (where type_name = 'Shot') as shot_count,
+    -- the first location and the last end location (or location) of the possession
+    arg_min(x, "index") filter (where x is not null) as start_x,
+    arg_max(coalesce(end_x, x), "index") filter (where coalesce(end_x, x) is not null) as end_x,
+    arg_max(coalesce(end_x, x), "index") filter (where coalesce(end_x, x) is not null)
+        - arg_min(x, "index") filter (where x is not null) as x_progression,
+    coalesce(sum(shot_statsbomb_xg), 0) as shot_statsbomb_xg,
+    arg_max(type_name, "index") as end_type_name
+from
+    numbered_events
+group by
+    match_id,
+    possession
+order by
+    min(event_row)
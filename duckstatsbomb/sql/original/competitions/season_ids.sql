@@ -7,12 +7,16 @@ with raw_json as (
             format = 'array',
             columns = {"competition_id": "integer",
                    "season_id": "integer",
+                   "match_updated": "varchar",
+                   "match_updated_360": "varchar"
                    }
             )
 )
 select
     competition_id,
-    season_id
+    season_id,
+    match_updated,
+    match_updated_360
 from
     raw_json
 where
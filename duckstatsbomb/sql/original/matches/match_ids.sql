@@ -5,10 +5,19 @@ with raw_json as (
         read_json(
             $filename,
             format = 'array',
-            columns = {"match_id": "integer"}
+            columns = {"match_id": "integer",
+                   "competition": "struct(competition_id integer)",
+                   "season": "struct(season_id integer)",
+                   "last_updated": "varchar",
+                   "last_updated_360": "varchar"
+                   }
             )
 )
 select
-    match_id
+    match_id,
+    competition.competition_id,
+    season.season_id,
+    last_updated,
+    last_updated_360
 from
     raw_json
@@ -0,0 +1,32 @@
+with raw_json as (
+    select
+        *
+    from
+        read_json(
+            $filename,
+            format = 'array',
+            columns = {"match_id": "integer",
+                   "match_date": "date",
+                   "competition": "struct(competition_id integer)",
+                   "season": "struct(season_id integer)",
+                   "home_team": "struct(home_team_id integer, home_team_name varchar)",
+                   "away_team": "struct(away_team_id integer, away_team_name varchar)",
+                   "last_updated": "varchar",
+                   "last_updated_360": "varchar"
+                   }
+            )
+)
+select
+    competition.competition_id,
+    season.season_id,
+    match_id,
+    match_date,
+    home_team.home_team_id,
+    home_team.home_team_name,
+    away_team.away_team_id,
+    away_team.away_team_name,
+    last_updated,
+    last_updated_360,
+    last_updated_360 is not null as has_360
+from
+    raw_json
@@ -0,0 +1,14 @@
+-- the union of the threesixty and freeze_frames schemas
+-- used to decode each 360 file once when several of these kinds are requested together
+select
+    *
+from
+    read_json(
+        $filename,
+        filename = true,
+        format = 'array',
+        columns = {"event_uuid": "varchar",
+               "visible_area": "double[]",
+               "freeze_frame": "struct(teammate boolean, actor boolean, keeper boolean, location double[])[]"
+               }
+        )
@@ -0,0 +1,86 @@
+"""Fixtures that serve synthetic StatsBomb data from a local stand-in server (see the benchmarks folder)."""
+
+import collections
+import functools
+import http.server
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from duckstatsbomb import Sbopen  # noqa: E402
+from generate import generate  # noqa: E402
+from server import StatsBombHandler, point_parser, serve  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def data_dir(tmp_path_factory):
+    """A directory of synthetic data for four matches in the open-data layout."""
+    directory = str(tmp_path_factory.mktemp('statsbomb'))
+    generate(directory, n_matches=4, n_events=300)
+    return directory
+
+
+@pytest.fixture(scope='session')
+def url(data_dir):
+    """The base url of the local server for data_dir."""
+    server, url = serve(data_dir)
+    yield url
+    server.shutdown()
+
+
+@pytest.fixture
+def sbopen(url, tmp_path):
+    """Return a function that creates a Sbopen parser pointed at the local server,
+    with its own cache and in-memory database unless they are given.
+    """
+    parsers = []
+
+    def make(url=url, **kws):
+        kws.setdefault('cache_name', str(tmp_path / 'cache'))
+        kws.setdefault('database', ':memory:')
+        parser = point_parser(Sbopen(**kws), url)
+        parsers.append(parser)
+        return parser
+
+    yield make
+    for parser in parsers:
+        parser.close_connection()
+
+
+@pytest.fixture
+def flaky_server():
+    """Return a function that serves a directory with a handler that first answers each path with the statuses
+    in handler.failures, and returns the base url and the handler class, whose hits count the requests for each path.
+    """
+    servers = []
+
+    def serve_flaky(directory):
+        class FlakyHandler(StatsBombHandler):
+            failures = collections.defaultdict(list)
+            hits = collections.Counter()
+
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                self.hits[path] += 1
+                if self.failures[path]:
+                    status, headers = self.failures[path].pop(0)
+                    self.send_response(status)
+                    for key, value in headers.items():
+                        self.send_header(key, value)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                super().do_GET()
+
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(FlakyHandler, directory=directory))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f'http://127.0.0.1:{server.server_port}', FlakyHandler
+
+    yield serve_flaky
+    for server in servers:
+        server.shutdown()
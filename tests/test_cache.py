@@ -0,0 +1,44 @@
+"""Tests of removing the expired responses from the filesystem cache."""
+
+import glob
+import os
+import time
+
+from generate import COMPETITION_ID, SEASON_ID
+
+
+def cached_files(cache_name):
+    return sorted(glob.glob(os.path.join(cache_name, '**', '*.json'), recursive=True))
+
+
+def test_responses_that_never_expire_are_kept(sbopen, tmp_path):
+    cache_name = str(tmp_path / 'cache')
+    sbopen(cache_name=cache_name, expire_after=-1).competition_data(COMPETITION_ID, SEASON_ID, kind='events')
+    files = cached_files(cache_name)
+    old = time.time() - 600
+    for path in files:
+        os.utime(path, (old, old))
+    # a default parser cleans the cache in the background when its session is first used
+    parser = sbopen(cache_name=cache_name)
+    parser.session
+    parser._sweeper.join()
+    assert cached_files(cache_name) == files
+
+
+def test_expired_responses_are_removed(sbopen, tmp_path):
+    cache_name = str(tmp_path / 'cache')
+    sbopen(cache_name=cache_name, expire_after=1, cache_payload=True).competition_data(
+        COMPETITION_ID, SEASON_ID, kind='events'
+    )
+    assert cached_files(cache_name)
+    # files that aren't requests-cache responses are left alone
+    os.makedirs(os.path.join(cache_name, 'notes'))
+    unrelated = [os.path.join(cache_name, 'notes', 'keep.json'), os.path.join(cache_name, 'keep.json')]
+    for path in unrelated:
+        with open(path, 'w') as f:
+            f.write('{"keep": true}')
+    time.sleep(1.5)
+    parser = sbopen(cache_name=cache_name, expire_after=1, cache_payload=True)
+    parser.session
+    parser._sweeper.join()
+    assert cached_files(cache_name) == sorted(unrelated)
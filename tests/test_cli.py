@@ -0,0 +1,55 @@
+"""Tests of the export command with a url that fails and a match without 360 data."""
+
+import json
+import os
+import shutil
+
+import pyarrow.parquet as pq
+import pytest
+from generate import COMPETITION_ID, SEASON_ID
+from server import point_parser
+
+from duckstatsbomb import cli
+
+
+@pytest.fixture
+def no_360_dir(data_dir, tmp_path):
+    """A copy of data_dir where the first match has no 360 data. Returns the directory and the match ids."""
+    directory = str(tmp_path / 'statsbomb')
+    shutil.copytree(data_dir, directory)
+    matches_path = os.path.join(directory, 'data', 'matches', str(COMPETITION_ID), f'{SEASON_ID}.json')
+    with open(matches_path) as f:
+        matches = json.load(f)
+    matches[0]['last_updated_360'] = None
+    with open(matches_path, 'w') as f:
+        json.dump(matches, f)
+    return directory, [match['match_id'] for match in matches]
+
+
+def test_export_counts_each_failure_once_and_skips_matches_without_360(
+    flaky_server, no_360_dir, tmp_path, capsys
+):
+    directory, match_ids = no_360_dir
+    url, handler = flaky_server(directory)
+    failed_url = f'/data/events/{match_ids[1]}.json'
+    handler.failures[failed_url] = [(404, {})] * 5
+    output = str(tmp_path / 'export')
+    args = cli._argument_parser().parse_args(
+        [
+            'export', '--competition-id', str(COMPETITION_ID), '--season-id', str(SEASON_ID),
+            '--kinds', 'events', 'events_360', '--cache-name', str(tmp_path / 'cache'), '--output', output,
+        ]
+    )
+    assert cli.export(point_parser(cli._parser(args), url), args) == 1
+    # the events file is read by both kinds, but it's only requested and reported once
+    assert handler.hits[failed_url] == 1
+    with open(os.path.join(output, 'manifest.json')) as f:
+        manifest = json.load(f)
+    assert [key for key in manifest['failed'] if key.endswith('.json')] == [f'{url}{failed_url}']
+    assert manifest['skipped'] == {f'events_360/{COMPETITION_ID}/{SEASON_ID}': [match_ids[0]]}
+    assert 'without 360 data' in capsys.readouterr().err
+    partition = os.path.join(f'competition_id={COMPETITION_ID}', f'season_id={SEASON_ID}', 'data.parquet')
+    events = pq.read_table(os.path.join(output, 'events', partition))
+    assert sorted(set(events['match_id'].to_pylist())) == sorted(match_ids[:1] + match_ids[2:])
+    events_360 = pq.read_table(os.path.join(output, 'events_360', partition))
+    assert sorted(set(events_360['match_id'].to_pylist())) == sorted(match_ids[2:])
@@ -0,0 +1,15 @@
+"""Tests of the compact output types."""
+
+import pyarrow
+import pytest
+from generate import COMPETITION_ID, SEASON_ID
+
+
+@pytest.mark.parametrize('kind', ['events', 'lineup_players', 'possessions'])
+def test_compact_batches_share_a_schema(sbopen, kind):
+    parser = sbopen(output_format='arrow', compact='categorical')
+    batches = list(parser.iter_competition_data(COMPETITION_ID, SEASON_ID, kind=kind, batch_size=1))
+    assert len(batches) == 4
+    assert len({batch.schema for batch in batches}) == 1
+    table = pyarrow.concat_tables(batches)
+    assert table.num_rows == parser.competition_data(COMPETITION_ID, SEASON_ID, kind=kind).num_rows
@@ -0,0 +1,68 @@
+"""Tests of loading a competition whose JSON files are bigger than the duckdb memory_limit."""
+
+import glob
+import json
+import os
+import shutil
+
+import pytest
+from generate import COMPETITION_ID, SEASON_ID, generate
+from server import serve
+
+from duckstatsbomb.parser import _size_bytes
+
+MEMORY_LIMIT = '64MB'
+COPIES = 50
+
+
+@pytest.fixture(scope='module')
+def big_url(tmp_path_factory):
+    """Serve a competition of copies of one generated match, whose events files are bigger than MEMORY_LIMIT."""
+    directory = str(tmp_path_factory.mktemp('big'))
+    (match_id,) = generate(directory, n_matches=1, n_events=1500)
+    data = os.path.join(directory, 'data')
+    matches_path = os.path.join(data, 'matches', str(COMPETITION_ID), f'{SEASON_ID}.json')
+    with open(matches_path) as f:
+        (match,) = json.load(f)
+    events_path = os.path.join(data, 'events', f'{match_id}.json')
+    for i in range(1, COPIES):
+        shutil.copyfile(events_path, os.path.join(data, 'events', f'{match_id + i}.json'))
+    with open(matches_path, 'w') as f:
+        json.dump([dict(match, match_id=match_id + i) for i in range(COPIES)], f)
+    assert sum(map(os.path.getsize, glob.glob(os.path.join(data, 'events', '*.json')))) > _size_bytes(MEMORY_LIMIT)
+    server, url = serve(directory)
+    yield url
+    server.shutdown()
+
+
+def test_competition_bigger_than_the_memory_limit(sbopen, big_url, tmp_path):
+    # the saved payloads are read with less memory than the requests-cache files (see cache_payload)
+    unbounded = sbopen(url=big_url, cache_payload=True, output_format='arrow')
+    expected = unbounded.competition_data(COMPETITION_ID, SEASON_ID, kind='events').num_rows
+    assert expected == 1500 * COPIES
+    parser = sbopen(
+        url=big_url,
+        database=str(tmp_path / 'statsbomb.duckdb'),
+        cache_payload=True,
+        output_format='arrow',
+        memory_limit=MEMORY_LIMIT,
+        temp_directory=str(tmp_path / 'spill'),
+        duckdb_threads=1,
+    )
+    match_ids = [match_id for match_id, *_ in parser._competition_season_matchids(COMPETITION_ID, SEASON_ID)]
+    assert len(parser._budget_chunks(parser._match_filenames(match_ids, 'events'))) > 1
+    # the whole result doesn't fit in the memory_limit, but a few of its columns do
+    columns = ['match_id', 'type_name']
+    assert parser.competition_data(COMPETITION_ID, SEASON_ID, kind='events', columns=columns).equals(
+        unbounded.competition_data(COMPETITION_ID, SEASON_ID, kind='events', columns=columns)
+    )
+    # the columns are also written into a table of the database file, with a name that needs quoting
+    events = parser.competition_data(COMPETITION_ID, SEASON_ID, kind='events', columns=columns, table='order')
+    assert events.aggregate('count(*)').fetchone()[0] == expected
+    assert parser.con.table('order').aggregate('count(*)').fetchone()[0] == expected
+
+
+def test_settings_with_quotes(sbopen, tmp_path):
+    temp_directory = str(tmp_path / "o'brien")
+    parser = sbopen(memory_limit='64MB', temp_directory=temp_directory)
+    assert parser.con.execute("select current_setting('temp_directory')").fetchone()[0] == temp_directory
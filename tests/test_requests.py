@@ -0,0 +1,62 @@
+"""Tests of the retries and rate limiting of uncached requests against a local server that fails on purpose."""
+
+import time
+
+import pytest
+import requests
+from generate import COMPETITION_ID, SEASON_ID
+
+
+@pytest.fixture
+def flaky(flaky_server, data_dir):
+    """Serve data_dir with a handler that fails on purpose (see flaky_server)."""
+    return flaky_server(data_dir)
+
+
+def test_retries_429_and_503_then_caches(sbopen, flaky):
+    url, handler = flaky
+    handler.failures['/data/competitions.json'] = [(429, {'Retry-After': '0'}), (503, {})]
+    parser = sbopen(url=url, backoff_factor=0)
+    assert len(parser.competitions()) == 1
+    assert handler.hits['/data/competitions.json'] == 3
+    assert parser.session.cache.contains(url=parser._competition_url())
+    # the second call is answered from the cache
+    assert len(parser.competitions()) == 1
+    assert handler.hits['/data/competitions.json'] == 3
+
+
+def test_retry_after_is_respected(sbopen, flaky):
+    url, handler = flaky
+    handler.failures['/data/competitions.json'] = [(429, {'Retry-After': '1'})]
+    parser = sbopen(url=url, backoff_factor=0)
+    start = time.perf_counter()
+    parser.competitions()
+    assert time.perf_counter() - start >= 1
+    assert handler.hits['/data/competitions.json'] == 2
+
+
+def test_gives_up_after_max_retries(sbopen, flaky):
+    url, handler = flaky
+    handler.failures['/data/competitions.json'] = [(503, {})] * 5
+    parser = sbopen(url=url, backoff_factor=0.01, max_retries=2)
+    with pytest.raises(requests.HTTPError):
+        parser.competitions()
+    assert handler.hits['/data/competitions.json'] == 3
+    assert not parser.session.cache.contains(url=parser._competition_url())
+
+
+def test_rate_limit(sbopen, flaky):
+    url, handler = flaky
+    parser = sbopen(url=url, rate_limit=2)
+    match_ids = [match_id for match_id, *_ in parser._competition_season_matchids(COMPETITION_ID, SEASON_ID)]
+    start = time.perf_counter()
+    parser.match_data(match_ids, kind='lineup_players')
+    # up to two requests in the first burst, then one every half a second
+    assert time.perf_counter() - start >= 0.5 * (len(match_ids) - 2) - 0.1
+    assert sum(hits for path, hits in handler.hits.items() if '/lineups/' in path) == len(match_ids)
+
+
+@pytest.mark.parametrize('rate_limit', [0, -1])
+def test_rate_limit_must_be_positive(sbopen, rate_limit):
+    with pytest.raises(ValueError):
+        sbopen(rate_limit=rate_limit)
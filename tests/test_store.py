@@ -0,0 +1,37 @@
+"""Tests of reusing the Parquet store and the result cache when a response is stored again with the same content."""
+
+import glob
+import os
+import time
+
+import pytest
+from generate import COMPETITION_ID, SEASON_ID
+
+
+def stored_files(parquet_dir):
+    return {path: os.stat(path).st_mtime_ns for path in glob.glob(os.path.join(parquet_dir, '**', '*.parquet'), recursive=True)}
+
+
+@pytest.mark.parametrize('revalidate', [False, True])
+def test_parquet_store_is_kept_for_unchanged_responses(sbopen, revalidate):
+    parser = sbopen(parquet_store=True, revalidate=revalidate, expire_after=1)
+    parser.competition_data(COMPETITION_ID, SEASON_ID, kind='events')
+    stored = stored_files(parser.parquet_dir)
+    assert stored
+    time.sleep(1.5)
+    # the expired responses are downloaded again (or revalidated), but their content is the same
+    parser.competition_data(COMPETITION_ID, SEASON_ID, kind='events')
+    assert parser.last_stats.cache_misses + parser.last_stats.revalidated > 0
+    assert stored_files(parser.parquet_dir) == stored
+
+
+def test_result_cache_is_kept_for_revalidated_responses(sbopen):
+    parser = sbopen(result_cache_bytes=10**9, revalidate=True, expire_after=1)
+    match_ids = list(parser.match_urls(COMPETITION_ID, SEASON_ID)[SEASON_ID])
+    parser.match_data(match_ids, kind='events')
+    assert parser.last_stats.result_cache_misses == len(match_ids)
+    time.sleep(1.5)
+    parser.match_data(match_ids, kind='events')
+    assert parser.last_stats.revalidated == len(match_ids)
+    assert parser.last_stats.result_cache_hits == len(match_ids)
+    assert parser.last_stats.result_cache_misses == 0
@@ -0,0 +1,20 @@
+"""Tests of one thread_safe parser used from several threads at once."""
+
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from generate import COMPETITION_ID, SEASON_ID
+
+
+@pytest.mark.parametrize('kind', ['events', 'lineup_players', 'threesixty_frames'])
+def test_thread_safe_results_match_single_threaded(sbopen, kind):
+    parser = sbopen(thread_safe=True, output_format='arrow')
+    match_ids = [match_id for match_id, *_ in parser._competition_season_matchids(COMPETITION_ID, SEASON_ID)]
+    expected = {match_id: parser.match_data(match_id, kind) for match_id in match_ids}
+    rng = random.Random(0)
+    calls = [rng.choice(match_ids) for _ in range(32)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda match_id: parser.match_data(match_id, kind), calls))
+    for match_id, result in zip(calls, results):
+        assert result.equals(expected[match_id])
@@ -0,0 +1,32 @@
+"""Tests of reading the cached 360 responses, which are each read as one JSON object."""
+
+import glob
+import os
+
+import pytest
+from generate import COMPETITION_ID, SEASON_ID, generate
+from server import serve
+
+from duckstatsbomb.parser import _MINIMUM_OBJECT_SIZE
+
+
+@pytest.fixture(scope='module')
+def big_360_url(tmp_path_factory):
+    """Serve one match whose 360 file is bigger than the duckdb default maximum_object_size."""
+    directory = str(tmp_path_factory.mktemp('big_360'))
+    generate(directory, n_matches=1, n_events=8000)
+    server, url = serve(directory)
+    yield url
+    server.shutdown()
+
+
+@pytest.mark.parametrize(
+    'kind', ['threesixty', 'threesixty_frames', 'events_360', ['threesixty', 'threesixty_frames']]
+)
+def test_cached_360_bigger_than_the_default_object_size(sbopen, big_360_url, tmp_path, kind):
+    parser = sbopen(url=big_360_url, cache_name=str(tmp_path / 'cache'), output_format='arrow')
+    data = parser.competition_data(COMPETITION_ID, SEASON_ID, kind=kind)
+    for table in data.values() if isinstance(data, dict) else [data]:
+        assert table.num_rows > 0
+    sizes = [os.path.getsize(path) for path in glob.glob(str(tmp_path / 'cache' / '*.json'))]
+    assert max(sizes) > _MINIMUM_OBJECT_SIZE